@@ -1,10 +1,10 @@
+from typing import TYPE_CHECKING
+
 from backend.config_manager import ConfigManager
 from backend.providers import (
     Capability,
     MusicProvider,
-    NeteaseProvider,
     ProviderManager,
-    QQMusicProvider,
 )
 from backend.update_checker import check_for_update, download_update
 from backend.util import (
@@ -16,6 +16,19 @@ from backend.util import (
     require_provider,
 )
 
+if TYPE_CHECKING:
+    from backend.providers import NeteaseProvider, QQMusicProvider
+
+
+def __getattr__(name: str) -> object:
+    # provider 实现按需导入，避免导入 backend 时加载 SDK
+    if name in ("NeteaseProvider", "QQMusicProvider"):
+        from backend import providers
+
+        return getattr(providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "Capability",
     "MusicProvider",
@@ -0,0 +1,96 @@
+"""
+歌词解析基准测试
+
+在合成的长 QRC / YRC / LRC 歌词（含翻译）上测量 parse_lyric 的耗时。
+传入旧版 lyric_parser.py 的路径时同时测量旧版并校验两者输出一致，例如:
+
+    git show <旧版本>:backend/lyric_parser.py > /tmp/lyric_parser_old.py
+    python backend/bench_lyric_parser.py 50 /tmp/lyric_parser_old.py
+
+用法: python backend/bench_lyric_parser.py [轮数] [旧版 lyric_parser.py 路径]
+"""
+
+import os
+import sys
+
+# Avoid backend/types.py shadowing the stdlib module (os is already loaded at startup)
+cwd = os.getcwd()
+backend_path = os.path.dirname(os.path.abspath(__file__))
+for path in (backend_path, cwd, ""):
+    while path in sys.path:
+        sys.path.remove(path)
+
+# Load the stdlib modules lyric_parser depends on before backend is on sys.path
+import bisect  # noqa: E402, F401
+import importlib.util  # noqa: E402
+import re  # noqa: E402, F401
+import time  # noqa: E402
+import typing  # noqa: E402, F401
+
+sys.path.insert(0, backend_path)
+import lyric_parser  # noqa: E402
+
+# 每首歌词的行数与每行字数
+LINES = 400
+WORDS_PER_LINE = 12
+TEXT = "在那遥远的地方有位好姑娘人们走过了她的帐房都要回头留恋地张望"
+
+
+def make_qrc(yrc=False):
+    """生成逐字歌词；yrc 为 True 时使用网易云的三参数标记"""
+    suffix = ",0" if yrc else ""
+    lines = ["[0,3000]歌名 - 歌手", "[3000,2000]作词：某人"]
+    for i in range(LINES):
+        start = 5000 + i * 4000
+        words = []
+        for j in range(WORDS_PER_LINE):
+            char = TEXT[(i * WORDS_PER_LINE + j) % len(TEXT)]
+            words.append(f"{char}({start + j * 300},300{suffix})")
+        lines.append(f"[{start},{WORDS_PER_LINE * 300}{suffix}]" + "".join(words))
+    return "\n".join(lines)
+
+
+def make_lrc():
+    lines = ["[ti:测试]", "[ar:歌手]"]
+    for i in range(LINES):
+        ms = 5000 + i * 4000
+        text = TEXT[i % len(TEXT) :] + TEXT[: i % len(TEXT)]
+        lines.append(f"[{ms // 60000:02d}:{ms // 1000 % 60:02d}.{ms % 1000 // 10:02d}]{text[:WORDS_PER_LINE]}")
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    spec = importlib.util.spec_from_file_location("lyric_parser_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(parse, lyric, trans, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse(lyric, trans)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    baseline = load_baseline(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    trans = make_lrc()
+    corpora = [("QRC", make_qrc(), trans), ("YRC", make_qrc(yrc=True), trans), ("LRC", make_lrc(), trans)]
+    print(f"语料: 每首 {LINES} 行，逐字歌词每行 {WORDS_PER_LINE} 字，均带翻译；{rounds} 轮")
+    for name, lyric, lyric_trans in corpora:
+        current_ms = measure(lyric_parser.parse_lyric, lyric, lyric_trans, rounds)
+        if baseline is None:
+            print(f"{name}: {current_ms:.2f} ms/首")
+            continue
+        if baseline.parse_lyric(lyric, lyric_trans) != lyric_parser.parse_lyric(lyric, lyric_trans):
+            print(f"{name}: 输出与旧版不一致")
+            continue
+        baseline_ms = measure(baseline.parse_lyric, lyric, lyric_trans, rounds)
+        print(f"{name}: 旧版 {baseline_ms:.2f} ms/首，当前 {current_ms:.2f} ms/首，{baseline_ms / current_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+歌曲匹配基准测试
+
+对比旧的精确匹配（歌名完全相同）与打分匹配在真实标题变体语料上的命中率和耗时。
+
+用法: python backend/bench_matching.py [轮数]
+"""
+
+import os
+import sys
+
+# Avoid backend/types.py shadowing the stdlib module (os is already loaded at startup)
+cwd = os.getcwd()
+backend_path = os.path.dirname(os.path.abspath(__file__))
+for path in (backend_path, cwd, ""):
+    while path in sys.path:
+        sys.path.remove(path)
+
+# Load the stdlib modules matching depends on before backend is on sys.path
+import difflib  # noqa: E402, F401
+import re  # noqa: E402, F401
+import time  # noqa: E402
+import typing  # noqa: E402, F401
+import unicodedata  # noqa: E402, F401
+
+sys.path.insert(0, backend_path)
+from matching import make_match_key, pick_best_match  # noqa: E402
+
+
+def song(name, singer, duration=0):
+    return {"mid": name, "name": name, "singer": singer, "duration": duration}
+
+
+# 目标歌曲 -> 另一平台搜索结果中该歌曲的常见写法
+VARIANTS = [
+    (("晴天", "周杰伦", 269), ("晴天", "周杰倫", 269)),
+    (("後來", "劉若英", 340), ("后来", "刘若英", 341)),
+    (("Yesterday", "The Beatles", 125), ("Yesterday - Remastered 2009", "The Beatles", 126)),
+    (("Bohemian Rhapsody", "Queen", 355), ("Bohemian Rhapsody (Remastered 2011)", "Queen", 354)),
+    (("Shape of You", "Ed Sheeran", 233), ("Shape of You (feat. Stormzy)", "Ed Sheeran, Stormzy", 233)),
+    (("Stay", "The Kid LAROI & Justin Bieber", 141), ("STAY", "The Kid LAROI/Justin Bieber", 142)),
+    (("Hello", "Adele", 295), ("ＨＥＬＬＯ", "Ａｄｅｌｅ", 295)),
+    (("Love Story (Taylor's Version)", "Taylor Swift", 235), ("Love Story（Taylor’s Version）", "Taylor Swift", 235)),
+    (("说好不哭", "周杰伦/五月天阿信", 222), ("说好不哭 (with 五月天阿信)", "周杰伦", 222)),
+    (("爱你", "王心凌", 214), ("愛你", "王心凌", 214)),
+    (("光年之外", "G.E.M.邓紫棋", 235), ("光年之外", "G.E.M. 邓紫棋", 235)),
+    (("Despacito", "Luis Fonsi, Daddy Yankee", 229), ("Despacito (feat. Daddy Yankee)", "Luis Fonsi", 229)),
+    (("夜曲", "周杰伦", 226), ("夜曲", "Jay Chou", 226)),
+    (("Let It Go", "Idina Menzel", 224), ('Let It Go - From "Frozen"/Soundtrack Version', "Idina Menzel", 224)),
+]
+# 搜索结果中混入的干扰项
+DISTRACTORS = [
+    song("七里香", "周杰伦", 299),
+    song("演员 (伴奏)", "薛之谦", 261),
+    song("Hello (Cover)", "某歌手", 300),
+    song("晴天 (Live)", "周杰伦", 280),
+    song("Yesterday Once More", "Carpenters", 230),
+]
+
+
+def legacy_match(name, singer, candidates):
+    """旧实现：歌名完全相同，优先歌手包含"""
+    for s in candidates:
+        if s["name"] == name and singer in s["singer"]:
+            return s
+    for s in candidates:
+        if s["name"] == name:
+            return s
+    return None
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cases = []
+    for (name, singer, duration), variant in VARIANTS:
+        expected = song(*variant)
+        cases.append((name, singer, duration, DISTRACTORS + [expected], expected))
+
+    legacy_hits = sum(legacy_match(n, s, c) is e for n, s, _, c, e in cases)
+    scored_hits = 0
+    for name, singer, duration, candidates, expected in cases:
+        best = pick_best_match(make_match_key(name, singer, duration), candidates)
+        scored_hits += best is not None and best[0] is expected
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name, singer, duration, candidates, _ in cases:
+            pick_best_match(make_match_key(name, singer, duration), candidates)
+    elapsed = time.perf_counter() - start
+    lookups = rounds * len(cases)
+
+    print(f"语料: {len(cases)} 首歌曲，每次 {len(DISTRACTORS) + 1} 个候选")
+    print(f"精确匹配命中: {legacy_hits}/{len(cases)}")
+    print(f"打分匹配命中: {scored_hits}/{len(cases)}")
+    print(f"打分匹配耗时: {elapsed / lookups * 1e6:.1f} µs/次（{lookups} 次）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""内存缓存
+
+提供带容量上限和可选过期时间的 LRU 缓存，以及所有 provider 共用的歌曲元数据缓存。
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar, cast
+
+from backend.types import CacheStats, SongInfo
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """容量受限的 LRU 缓存，条目可单独设置过期时间"""
+
+    def __init__(self, max_size: int, default_ttl: float | None = None) -> None:
+        """
+        Args:
+            max_size: 最大条目数，超出时淘汰最久未使用的条目
+            default_ttl: 默认过期时间（秒），None 表示不过期
+        """
+        self._max_size = max_size
+        self._default_ttl = default_ttl
+        self._entries: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        return entry is not None and not self._is_expired(entry[1])
+
+    @staticmethod
+    def _is_expired(expires_at: float | None) -> bool:
+        return expires_at is not None and time.monotonic() >= expires_at
+
+    def get(self, key: K) -> V | None:
+        """读取条目，命中时将其标记为最近使用"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if self._is_expired(expires_at):
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """写入条目
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 过期时间（秒），未指定时使用默认过期时间
+        """
+        effective_ttl = ttl if ttl is not None else self._default_ttl
+        expires_at = time.monotonic() + effective_ttl if effective_ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def keys(self) -> list[K]:
+        """获取当前所有键（包含尚未清理的过期条目）"""
+        return list(self._entries)
+
+    def pop(self, key: K) -> V | None:
+        """移除并返回条目"""
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """获取命中/未命中/淘汰计数"""
+        return {
+            "size": len(self._entries),
+            "maxSize": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SongMetadataCache:
+    """按 (provider, mid) 缓存统一结构的歌曲信息
+
+    各 provider 格式化歌曲时写入，批量补全歌曲详情时先读缓存，只请求未命中的部分。
+    写入和读取时都复制一份，调用方修改返回的歌曲不会影响缓存中的条目。
+    """
+
+    def __init__(self, max_size: int = 5000) -> None:
+        self._cache: LRUCache[tuple[str, str], SongInfo] = LRUCache(max_size)
+
+    def get(self, provider_id: str, mid: str) -> SongInfo | None:
+        song = self._cache.get((provider_id, mid))
+        return cast(SongInfo, dict(song)) if song is not None else None
+
+    def get_many(self, provider_id: str, mids: list[str]) -> tuple[dict[str, SongInfo], list[str]]:
+        """批量读取
+
+        Returns:
+            (命中的 mid -> 歌曲信息, 未命中的 mid 列表)
+        """
+        found: dict[str, SongInfo] = {}
+        missing: list[str] = []
+        for mid in mids:
+            song = self._cache.get((provider_id, mid))
+            if song is None:
+                missing.append(mid)
+            else:
+                found[mid] = cast(SongInfo, dict(song))
+        return found, missing
+
+    def put(self, song: SongInfo) -> SongInfo:
+        """写入一首歌曲，返回原对象便于链式使用"""
+        provider_id = song.get("provider")
+        mid = song.get("mid")
+        if provider_id and mid:
+            self._cache.set((provider_id, str(mid)), cast(SongInfo, dict(song)))
+        return song
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+
+# 全局歌曲元数据缓存
+song_metadata = SongMetadataCache()
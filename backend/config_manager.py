@@ -1,16 +1,46 @@
 """配置管理模块
 
 提供用于加载、更新、删除并保存插件配置的单例类。
+
+配置按命名空间分片保存在 config/ 目录下（界面偏好、播放状态、provider 选择、各 provider 凭证等），
+每个分片在首次访问时才读取，修改后只重写内容发生变化的分片。
+修改先作用于内存，在 WRITE_BEHIND_DELAY 秒内合并后于线程中原子写入（write-behind），
+卸载插件时通过 flush() 确保写入。transaction() 内的多项修改只触发一次写入。旧版的 settings.json / data.json 在首次启动时自动迁移。
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
-from collections.abc import Mapping
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
 from pathlib import Path
 
 import decky
-from backend.types import FrontendSettings
+from backend.types import ConfigWriteStats, FrontendSettings
+from backend.util import atomic_write_text
+
+# 合并写入的等待时间（秒），期间的多次修改只写一次文件
+WRITE_BEHIND_DELAY = 1.0
+
+# 分片名 -> 相对 config/ 目录的文件路径
+SHARD_FILES = {
+    "ui": "ui.json",  # 界面偏好（音质等）
+    "playback": "playback.json",  # 播放状态（播放模式、音量、上次使用的 provider）
+    "providers": "providers.json",  # provider 选择及其他设置
+    "data": "data.json",  # 其他数据
+    "credential.qqmusic": "credentials/qqmusic.json",
+    "credential.netease": "credentials/netease.json",
+}
+# 前端设置中属于播放状态分片的键，其余归入界面偏好分片
+PLAYBACK_KEYS = frozenset({"playMode", "volume", "lastProviderId"})
+# 数据键 -> 所在的凭证分片，其余数据归入 data 分片
+CREDENTIAL_SHARDS = {
+    "qqmusic_credential": "credential.qqmusic",
+    "netease_session": "credential.netease",
+}
+FRONTEND_SETTINGS_KEY = "frontend_settings"
 
 
 class ConfigManager:
@@ -28,127 +58,316 @@ class ConfigManager:
             return
 
         self._initialized = True
-        self._settings_path = Path(decky.DECKY_PLUGIN_SETTINGS_DIR) / "settings.json"
-        self._data_path = Path(decky.DECKY_PLUGIN_SETTINGS_DIR) / "data.json"
-        self._settings: dict[str, object] = {}
-        self._data: dict[str, object] = {}
-        self._load()
-
-    def _load(self) -> None:
-        """读取配置文件，未找到则初始化为空"""
+        settings_dir = Path(decky.DECKY_PLUGIN_SETTINGS_DIR)
+        self._dir = settings_dir / "config"
+        # 旧版单文件配置，仅用于迁移
+        self._settings_path = settings_dir / "settings.json"
+        self._data_path = settings_dir / "data.json"
+        # 已加载的分片
+        self._shards: dict[str, dict[str, object]] = {}
+        self._load_ms: dict[str, float] = {}
+        # 待写入的分片及延迟写入状态
+        self._dirty: set[str] = set()
+        self._write_behind = True
+        self._save_handle: asyncio.TimerHandle | None = None
+        self._save_task: asyncio.Task[None] | None = None
+        self._writes_requested = 0
+        self._writes_done = 0
+        # transaction() 的嵌套层数，大于 0 时只记录待写入的分片，退出最外层时统一写入
+        self._transaction_depth = 0
+        # clear_all 时递增，使清空前已序列化的写入作废
+        self._generation = 0
+        self._migrate_legacy()
+
+    # ==================== 分片读写 ====================
+
+    def _shard_path(self, name: str) -> Path:
+        return self._dir / SHARD_FILES[name]
+
+    def _shard(self, name: str) -> dict[str, object]:
+        """获取分片内容，首次访问时从文件读取"""
+        shard = self._shards.get(name)
+        if shard is not None:
+            return shard
+        start = time.perf_counter()
+        path = self._shard_path(name)
+        shard = {}
         try:
-            self._settings_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Load settings
-            if self._settings_path.exists():
-                with open(self._settings_path, encoding="utf-8") as f:
-                    self._settings = json.load(f)
-            else:
-                self._settings = {}
-                self._save_settings()
-
-            # Load data (credentials etc)
-            if self._data_path.exists():
-                with open(self._data_path, encoding="utf-8") as f:
-                    self._data = json.load(f)
-            else:
-                self._data = {}
-                self._save_data()
-                
+            if path.exists():
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+                if isinstance(loaded, dict):
+                    shard = loaded
         except Exception as e:
-            decky.logger.error(f"加载配置失败: {e}")
-            self._settings = {}
-            self._data = {}
-
-    def reload(self) -> dict[str, object]:
-        """重新读取配置"""
-        self._load()
-        return {**self._settings, **self._data}
-
-    def _save_settings(self) -> bool:
+            decky.logger.error(f"加载配置分片 {name} 失败: {e}")
+        self._shards[name] = shard
+        self._load_ms[name] = (time.perf_counter() - start) * 1000
+        return shard
+
+    def _replace_shard(self, name: str, content: dict[str, object]) -> bool:
+        """替换分片内容，内容未变化时不写入
+
+        Returns:
+            分片是否发生变化
+        """
+        if self._shard(name) == content:
+            return False
+        self._shards[name] = content
+        self._mark_dirty(name)
+        return True
+
+    def _migrate_legacy(self) -> None:
+        """将旧版 settings.json / data.json 拆分到各分片"""
+        legacy = [path for path in (self._settings_path, self._data_path) if path.exists()]
+        if not legacy:
+            return
         try:
-            with open(self._settings_path, "w", encoding="utf-8") as f:
-                json.dump(self._settings, f, ensure_ascii=False, indent=2)
-            return True
+            settings, data = (
+                json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+                for path in (self._settings_path, self._data_path)
+            )
         except Exception as e:
-            decky.logger.error(f"保存设置失败: {e}")
-            return False
+            decky.logger.error(f"读取旧版配置失败，跳过迁移: {e}")
+            return
 
-    def _save_data(self) -> bool:
+        with self.transaction():
+            for key, value in (settings if isinstance(settings, dict) else {}).items():
+                self.set_setting(key, value)
+            for key, value in (data if isinstance(data, dict) else {}).items():
+                self.set_data(key, value)
+            # 写入成功后才备份旧文件，因此在事务内同步写入
+            if not self.flush_sync():
+                return
+        for path in legacy:
+            try:
+                path.replace(path.with_name(path.name + ".bak"))
+            except OSError as e:
+                decky.logger.warning(f"备份旧版配置 {path} 失败: {e}")
+        decky.logger.info(f"已将旧版配置迁移到分片: {', '.join(sorted(self._shards))}")
+
+    def reload(self) -> dict[str, object]:
+        """丢弃内存中的分片并重新读取配置"""
+        self.flush_sync()
+        self._shards.clear()
+        merged = dict(self._shard("providers"))
+        frontend = self.get_setting(FRONTEND_SETTINGS_KEY)
+        if frontend is not None:
+            merged[FRONTEND_SETTINGS_KEY] = frontend
+        for name in ("data", *CREDENTIAL_SHARDS.values()):
+            merged.update(self._shard(name))
+        return merged
+
+    # ==================== 合并写入 ====================
+
+    def set_write_behind(self, enabled: bool) -> None:
+        """设置是否合并延迟写入，关闭时每次修改立即写入文件"""
+        self._write_behind = enabled
+        if not enabled:
+            self.flush_sync()
+
+    def _snapshot(self, names: set[str]) -> list[tuple[str, Path, str]]:
+        """在事件循环中序列化待写入的分片，保证写入内容与内存一致"""
+        return [
+            (name, self._shard_path(name), json.dumps(self._shards.get(name, {}), ensure_ascii=False, indent=2))
+            for name in sorted(names)
+        ]
+
+    def _write(self, snapshot: list[tuple[str, Path, str]], generation: int | None = None) -> bool:
+        ok = True
+        for name, path, text in snapshot:
+            if generation is not None and generation != self._generation:
+                return ok
+            try:
+                atomic_write_text(path, text)
+                self._writes_done += 1
+            except Exception as e:
+                decky.logger.error(f"保存配置分片 {name} 失败: {e}")
+                ok = False
+        return ok
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """合并多项修改，退出时只安排一次写入
+
+        可嵌套，仅在最外层退出时写入；发生异常时已应用的修改不会回滚。
+        事务状态属于整个实例而非单个任务，事务内不能有 await，否则其他 RPC 的写入也会被推迟。
+
+        Example:
+            with config.transaction():
+                config.set_main_provider_id("netease")
+                config.update_frontend_settings({"lastProviderId": "netease"})
+        """
+        self._transaction_depth += 1
         try:
-            with open(self._data_path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            yield
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0 and self._dirty:
+                self._schedule_save()
+
+    def _mark_dirty(self, name: str) -> bool:
+        """记录分片待写入；事务中延后到事务结束，否则安排写入"""
+        self._writes_requested += 1
+        self._dirty.add(name)
+        if self._transaction_depth:
             return True
-        except Exception as e:
-            decky.logger.error(f"保存数据失败: {e}")
-            return False
+        return self._schedule_save()
+
+    def _schedule_save(self) -> bool:
+        """安排写入待写入的分片；没有运行中的事件循环或关闭了合并写入时立即写入"""
+        if self._write_behind:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                if self._save_handle is None:
+                    self._save_handle = loop.call_later(WRITE_BEHIND_DELAY, self._start_save)
+                return True
+        return self.flush_sync()
+
+    def _start_save(self) -> None:
+        self._save_handle = None
+        if self._save_task is not None and not self._save_task.done():
+            # 上一次写入尚未完成，等其完成后再写
+            self._save_handle = asyncio.get_running_loop().call_later(WRITE_BEHIND_DELAY, self._start_save)
+            return
+        self._save_task = asyncio.get_running_loop().create_task(self._save())
+
+    async def _save(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        if dirty:
+            await asyncio.to_thread(self._write, self._snapshot(dirty), self._generation)
+
+    def _cancel_pending(self) -> None:
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+
+    async def flush(self) -> None:
+        """立即写入尚未保存的修改（插件卸载时调用）"""
+        self._cancel_pending()
+        if self._save_task is not None and not self._save_task.done():
+            await self._save_task
+        await self._save()
+
+    def flush_sync(self) -> bool:
+        """在当前线程中立即写入尚未保存的修改"""
+        self._cancel_pending()
+        dirty, self._dirty = self._dirty, set()
+        return self._write(self._snapshot(dirty)) if dirty else True
+
+    def write_stats(self) -> ConfigWriteStats:
+        return {
+            "requested": self._writes_requested,
+            "written": self._writes_done,
+            "saved": max(0, self._writes_requested - self._writes_done - len(self._dirty)),
+            "pending": len(self._dirty),
+            "loadedShards": {name: round(ms, 2) for name, ms in self._load_ms.items()},
+        }
 
     def save(self) -> bool:
-        """保存所有配置"""
-        return self._save_settings() and self._save_data()
+        """立即保存所有已加载的配置"""
+        self._dirty.update(self._shards)
+        return self.flush_sync()
+
+    # ==================== 通用键值接口 ====================
+
+    @staticmethod
+    def _data_shard(key: str) -> str:
+        return CREDENTIAL_SHARDS.get(key, "data")
 
     def get_setting(self, key: str, default: object | None = None) -> object | None:
-        return self._settings.get(key, default)
+        if key == FRONTEND_SETTINGS_KEY:
+            ui, playback = self._shard("ui"), self._shard("playback")
+            return {**ui, **playback} if ui or playback else default
+        return self._shard("providers").get(key, default)
 
     def set_setting(self, key: str, value: object) -> object:
-        self._settings[key] = value
-        self._save_settings()
+        if key == FRONTEND_SETTINGS_KEY:
+            settings = value if isinstance(value, dict) else {}
+            self._replace_shard("playback", {k: v for k, v in settings.items() if k in PLAYBACK_KEYS})
+            self._replace_shard("ui", {k: v for k, v in settings.items() if k not in PLAYBACK_KEYS})
+            return value
+        shard = self._shard("providers")
+        if key not in shard or shard[key] != value:
+            self._replace_shard("providers", {**shard, key: value})
         return value
 
     def get_data(self, key: str, default: object | None = None) -> object | None:
-        return self._data.get(key, default)
+        return self._shard(self._data_shard(key)).get(key, default)
 
     def set_data(self, key: str, value: object) -> object:
-        self._data[key] = value
-        self._save_data()
+        name = self._data_shard(key)
+        shard = self._shard(name)
+        if key not in shard or shard[key] != value:
+            self._replace_shard(name, {**shard, key: value})
         return value
 
     def merge_data_dict(self, key: str, value: Mapping[str, object]) -> dict[str, object]:
-        existing = self._data.get(key, {})
+        existing = self.get_data(key, {})
         merged = {**existing, **dict(value)} if isinstance(existing, dict) else dict(value)
-        self._data[key] = merged
-        self._save_data()
+        self.set_data(key, merged)
         return merged
 
     def delete_setting(self, key: str) -> bool:
-        if key in self._settings:
-            del self._settings[key]
-            self._save_settings()
+        if key == FRONTEND_SETTINGS_KEY:
+            existed = bool(self._shard("ui") or self._shard("playback"))
+            self._replace_shard("ui", {})
+            self._replace_shard("playback", {})
+            return existed
+        shard = self._shard("providers")
+        if key in shard:
+            self._replace_shard("providers", {k: v for k, v in shard.items() if k != key})
             return True
         return False
 
     def delete_data(self, key: str) -> bool:
-        if key in self._data:
-            del self._data[key]
-            self._save_data()
+        name = self._data_shard(key)
+        shard = self._shard(name)
+        if key in shard:
+            self._replace_shard(name, {k: v for k, v in shard.items() if k != key})
             return True
         return False
 
     def clear_all(self) -> None:
         """清空所有配置并删除配置文件"""
-        self._settings = {}
-        self._data = {}
-        for path in [self._settings_path, self._data_path]:
+        self._cancel_pending()
+        self._dirty.clear()
+        self._generation += 1
+        self._shards = {name: {} for name in SHARD_FILES}
+        paths = [self._shard_path(name) for name in SHARD_FILES]
+        paths += [self._settings_path, self._data_path]
+        paths += [path.with_name(path.name + ".bak") for path in (self._settings_path, self._data_path)]
+        for path in paths:
             if path.exists():
                 try:
                     path.unlink()
                 except Exception as e:
                     decky.logger.warning(f"删除配置文件失败 {path}: {e}")
-        self._settings_path.parent.mkdir(parents=True, exist_ok=True)
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    # ==================== 具体配置项 ====================
 
     def get_frontend_settings(self) -> FrontendSettings:
-        settings = self.get_setting("frontend_settings", {})
+        settings = self.get_setting(FRONTEND_SETTINGS_KEY, {})
         # 强制转换为 FrontendSettings，实际运行时依赖字典结构兼容
         return settings if isinstance(settings, dict) else {}  # type: ignore
 
+    def get_frontend_setting(self, key: str, default: object | None = None) -> object | None:
+        """读取单个前端设置，只访问其所在分片，不合并整个设置字典"""
+        return self._shard("playback" if key in PLAYBACK_KEYS else "ui").get(key, default)
+
     def update_frontend_settings(self, updates: FrontendSettings) -> FrontendSettings:
-        current = self.get_frontend_settings()
-        merged = {**current, **(updates or {})}  # type: ignore
-        self.set_setting("frontend_settings", merged)
-        return merged  # type: ignore
+        """合并更新前端设置，只重写涉及且内容变化的分片"""
+        with self.transaction():
+            for name, in_shard in (("playback", True), ("ui", False)):
+                patch = {k: v for k, v in (updates or {}).items() if (k in PLAYBACK_KEYS) == in_shard}
+                if patch:
+                    self._replace_shard(name, {**self._shard(name), **patch})
+        return self.get_frontend_settings()
 
     def delete_frontend_settings(self) -> bool:
-        return self.delete_setting("frontend_settings")
+        return self.delete_setting(FRONTEND_SETTINGS_KEY)
 
     def get_qqmusic_credential(self) -> dict[str, object] | None:
         cred = self.get_data("qqmusic_credential")
@@ -0,0 +1,137 @@
+"""阻塞 I/O 执行器
+
+为 pyncm 等基于 requests 的同步 SDK 提供独立、有上限的线程池，
+避免阻塞调用冻结 Decky 的插件事件循环，并记录每次调用的排队和执行耗时。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+import decky
+from backend.types import ExecutorStats
+
+R = TypeVar("R")
+P = ParamSpec("P")
+
+# 慢调用阈值（秒），超过时输出警告日志
+SLOW_CALL_THRESHOLD = 3.0
+
+
+class BlockingExecutor:
+    """有上限的阻塞调用线程池，附带排队/执行耗时统计"""
+
+    def __init__(self, name: str, max_workers: int = 4) -> None:
+        self._name = name
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+        self._max_run = 0.0
+        self._last_wait = 0.0
+        self._last_run = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=self._name)
+        return self._executor
+
+    def _record(self, wait: float, run: float, failed: bool) -> None:
+        with self._lock:
+            self._calls += 1
+            self._errors += int(failed)
+            self._total_wait += wait
+            self._total_run += run
+            self._max_wait = max(self._max_wait, wait)
+            self._max_run = max(self._max_run, run)
+            self._last_wait = wait
+            self._last_run = run
+
+    async def run(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """在线程池中执行阻塞函数并等待结果
+
+        Args:
+            func: 阻塞函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        call_name = getattr(func, "__name__", repr(func))
+
+        def _timed_call() -> R:
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            failed = True
+            with self._lock:
+                self._in_flight += 1
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                run = time.perf_counter() - started_at
+                with self._lock:
+                    self._in_flight -= 1
+                self._record(wait, run, failed)
+                if run >= SLOW_CALL_THRESHOLD:
+                    decky.logger.warning(f"[{self._name}] {call_name} 耗时 {run:.2f}s（排队 {wait * 1000:.0f}ms）")
+                else:
+                    decky.logger.debug(f"[{self._name}] {call_name} 排队 {wait * 1000:.0f}ms, 执行 {run * 1000:.0f}ms")
+
+        return await loop.run_in_executor(self._get_executor(), _timed_call)
+
+    def get_stats(self) -> ExecutorStats:
+        """获取执行器统计信息"""
+        with self._lock:
+            calls = self._calls
+            return {
+                "name": self._name,
+                "maxWorkers": self._max_workers,
+                "calls": calls,
+                "errors": self._errors,
+                "inFlight": self._in_flight,
+                "avgWaitMs": round(self._total_wait / calls * 1000, 2) if calls else 0.0,
+                "maxWaitMs": round(self._max_wait * 1000, 2),
+                "lastWaitMs": round(self._last_wait * 1000, 2),
+                "avgRunMs": round(self._total_run / calls * 1000, 2) if calls else 0.0,
+                "maxRunMs": round(self._max_run * 1000, 2),
+                "lastRunMs": round(self._last_run * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        """关闭线程池，不等待正在执行的调用"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Provider 阻塞 I/O 专用执行器
+provider_executor = BlockingExecutor("provider-io", max_workers=4)
+
+
+async def run_blocking(func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    """在 provider 专用线程池中执行阻塞调用
+
+    Args:
+        func: 阻塞函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    Returns:
+        函数返回值
+    """
+    return await provider_executor.run(func, *args, **kwargs)
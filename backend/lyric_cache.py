@@ -0,0 +1,156 @@
+"""歌词磁盘缓存
+
+按 (provider, mid, qrc) 将解析后的歌词持久化到插件设置目录，
+重复播放时无需请求网络和重新解析，插件重启后依然有效。
+来自 fallback provider 模糊匹配的歌词可能不准确，只缓存 FALLBACK_LYRIC_TTL 秒。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+import decky
+from backend.types import LyricCacheStats, SongLyricResponse
+from backend.util import atomic_write_text
+
+# 缓存目录默认容量上限（字节）
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+# fallback provider 歌词的缓存有效期（秒），过期后重新请求，以便主 provider 补上歌词后能显示
+FALLBACK_LYRIC_TTL = 24 * 3600
+# 缓存文件中记录过期时间（Unix 时间戳）的字段，读取时移除
+EXPIRES_AT_KEY = "_expiresAt"
+
+
+class LyricCache:
+    """容量受限的歌词磁盘缓存，超出上限时按最近访问时间淘汰"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._dir = cache_dir
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, provider_id: str, mid: str, qrc: bool) -> Path:
+        digest = hashlib.sha1(f"{provider_id}:{mid}:{int(qrc)}".encode()).hexdigest()
+        return self._dir / f"{digest}.json"
+
+    def _scan_total_bytes(self) -> int:
+        if not self._dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self._dir.glob("*.json"))
+
+    def get(self, provider_id: str, mid: str, qrc: bool) -> SongLyricResponse | None:
+        """读取缓存的歌词响应，未命中返回 None"""
+        path = self._path(provider_id, mid, qrc)
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            # 更新访问时间，供淘汰时判断最近使用
+            path.touch()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            decky.logger.warning(f"读取歌词缓存失败 {path.name}: {e}")
+            with contextlib.suppress(OSError):
+                path.unlink()
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if not isinstance(cached, dict):
+            return None
+        expires_at = cached.pop(EXPIRES_AT_KEY, None)
+        if isinstance(expires_at, (int, float)) and expires_at <= time.time():
+            with contextlib.suppress(OSError):
+                path.unlink()
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return cached  # type: ignore[return-value]
+
+    def put(
+        self, provider_id: str, mid: str, qrc: bool, response: SongLyricResponse, ttl: float | None = None
+    ) -> None:
+        """写入歌词响应，并在超出容量上限时淘汰最久未访问的条目
+
+        Args:
+            provider_id: provider ID
+            mid: 歌曲 mid
+            qrc: 是否为逐字歌词
+            response: 歌词响应
+            ttl: 有效期（秒），None 表示只受容量淘汰
+        """
+        path = self._path(provider_id, mid, qrc)
+        payload = {**response, EXPIRES_AT_KEY: time.time() + ttl} if ttl is not None else response
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        try:
+            old_size = path.stat().st_size if path.exists() else 0
+            atomic_write_text(path, text)
+            new_size = path.stat().st_size
+        except Exception as e:
+            decky.logger.warning(f"写入歌词缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            else:
+                self._total_bytes += new_size - old_size
+            if self._total_bytes > self._max_bytes:
+                self._evict_locked(keep=path)
+
+    def _evict_locked(self, keep: Path) -> None:
+        # 淘汰到容量上限的 90%，避免每次写入都触发淘汰
+        target = int(self._max_bytes * 0.9)
+        entries = []
+        for p in self._dir.glob("*.json"):
+            with contextlib.suppress(OSError):
+                stat = p.stat()
+                entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort(key=lambda e: e[0])
+
+        total = sum(e[1] for e in entries)
+        for _, size, p in entries:
+            if total <= target:
+                break
+            if p == keep:
+                continue
+            with contextlib.suppress(OSError):
+                p.unlink()
+                total -= size
+                self.evictions += 1
+        self._total_bytes = total
+
+    def clear(self) -> None:
+        """删除所有缓存文件"""
+        with self._lock:
+            if self._dir.exists():
+                for p in self._dir.glob("*.json"):
+                    with contextlib.suppress(OSError):
+                        p.unlink()
+            self._total_bytes = 0
+
+    def stats(self) -> LyricCacheStats:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            return {
+                "bytes": self._total_bytes,
+                "maxBytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
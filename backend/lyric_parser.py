@@ -1,9 +1,13 @@
 """
 歌词解析器 - 支持 LRC 和 QRC (卡拉OK) 格式
 从 TypeScript src/utils/lyricParser.ts 迁移而来
+
+所有正则在模块加载时预编译；每行只扫描一遍：逐字时间标记由 split 一次切分为文本和时间，
+LRC 时间标签从行首逐个匹配，不生成中间的标记列表。
 """
 
 import re
+from bisect import bisect_left, bisect_right
 from typing import TypedDict, NotRequired
 
 
@@ -42,6 +46,41 @@ class ParsedLyric(TypedDict):
 
 # 清理非标准时间标记的正则
 CLEANUP_TIME_MARKER_REGEX = re.compile(r"\(\d+(?:,\d+)*\)")
+# LRC 时间标签 [mm:ss.xx] / [mm:ss:xx] / [mm:ss]
+TIME_REGEX = re.compile(r"(\d+):(\d+)(?:[.:](\d+))?")
+TIME_TAG_REGEX = re.compile(r"\[(\d+):(\d+)(?:[.:](\d+))?\]")
+# QRC 行首 [数字,数字] 或 [数字,数字,其他]
+QRC_LINE_REGEX = re.compile(r"^\[(\d+),(\d+)(?:,.*?)?\](.+)$")
+QRC_LINE_PREFIX_REGEX = re.compile(r"^\[\d+,\d+")
+# 逐字时间标记：QQ 音乐 (数字,数字) 和 网易云 YRC (数字,数字,数字)
+WORD_MARKER_REGEX = re.compile(r"\((\d+),(\d+)(?:,\d+)?\)")
+# 无效文本：纯符号、纯坐标/时间标记
+INVALID_TEXT_REGEX = re.compile(r"^[/\-*~\s\\：:.。，,]+$")
+COORDINATE_TEXT_REGEX = re.compile(r"^\(\d+(?:,\d+)*\)$")
+# QRC 过滤：间奏、元信息、纯符号的逐字
+INTERLUDE_REGEX = re.compile(r"^[/\-*~\s\\：:]+$")
+META_PREFIX_REGEX = re.compile(
+    r"^(Writtenby|Composedby|Producedby|Arrangedby|作词|作曲|词|曲|编曲|制作|演唱|原唱|翻唱)[\s：:]", re.IGNORECASE
+)
+META_CREDIT_REGEX = re.compile(r"[-–]\s*(Artist|Singer|Band|作词|作曲|编曲)", re.IGNORECASE)
+SYMBOL_WORD_REGEX = re.compile(r"^[/\-*~\s\\：:.。，,()（）]+$")
+
+# 无效逐字时间（duration 为 0）或行尾残留文本使用的默认持续时间（秒）
+DEFAULT_WORD_DURATION = 0.1
+# 翻译与 QRC 行匹配的最大时间差（毫秒）
+TRANS_MATCH_WINDOW_MS = 500
+# 检测 QRC 格式时检查的行数
+QRC_DETECT_LINES = 30
+
+
+def _time_to_ms(minutes: str, seconds: str, fraction: str | None) -> int:
+    milliseconds = 0
+    if fraction:
+        milliseconds = int(fraction)
+        # 如果是两位数，补齐到三位（10 -> 100）
+        if len(fraction) == 2:
+            milliseconds *= 10
+    return int(minutes) * 60 * 1000 + int(seconds) * 1000 + milliseconds
 
 
 def parse_time(time_str: str) -> int:
@@ -49,34 +88,20 @@ def parse_time(time_str: str) -> int:
     解析时间标签 [mm:ss.xx] 或 [mm:ss:xx] 或 [mm:ss]
     返回毫秒数，解析失败返回 -1
     """
-    match = re.match(r"(\d+):(\d+)(?:[.:](\d+))?", time_str)
+    match = TIME_REGEX.match(time_str)
     if not match:
         return -1
-
-    minutes = int(match.group(1))
-    seconds = int(match.group(2))
-    milliseconds = 0
-
-    if match.group(3):
-        ms_str = match.group(3)
-        milliseconds = int(ms_str)
-        # 如果是两位数，补齐到三位（10 -> 100）
-        if len(ms_str) == 2:
-            milliseconds *= 10
-
-    return minutes * 60 * 1000 + seconds * 1000 + milliseconds
+    return _time_to_ms(*match.groups())
 
 
 def is_invalid_lyric_text(text: str) -> bool:
     """检查是否是无效的歌词文本（纯符号、间奏标记等）"""
     trimmed = text.strip()
     # 过滤纯符号、空行
-    if not trimmed or re.match(r"^[/\-*~\s\\：:.。，,]+$", trimmed):
+    if not trimmed or INVALID_TEXT_REGEX.match(trimmed):
         return True
     # 过滤纯坐标/时间标记行，如 (1062,531)
-    if re.match(r"^\(\d+(?:,\d+)*\)$", trimmed):
-        return True
-    return False
+    return COORDINATE_TEXT_REGEX.match(trimmed) is not None
 
 
 def parse_lrc(lrc: str) -> dict[int, str]:
@@ -87,22 +112,26 @@ def parse_lrc(lrc: str) -> dict[int, str]:
 
     # 清理 BOM 和回车符
     cleaned = lrc.replace("\ufeff", "").replace("\r", "")
-    time_tag_regex = re.compile(r"\[(\d+:\d+(?:[.:]\d+)?)\]")
 
     for line in cleaned.split("\n"):
         trimmed_line = line.rstrip()
-        if not trimmed_line:
+        if "[" not in trimmed_line:
             continue
 
-        # 提取所有时间标签
+        # 时间标签通常都在行首，逐个匹配即可得到文本；行中还有标签时才整行扫描
         times: list[int] = []
-        for match in time_tag_regex.finditer(trimmed_line):
-            time_ms = parse_time(match.group(1))
-            if time_ms >= 0:
-                times.append(time_ms)
+        pos = 0
+        while match := TIME_TAG_REGEX.match(trimmed_line, pos):
+            times.append(_time_to_ms(*match.groups()))
+            pos = match.end()
+        text = trimmed_line[pos:]
+        if "[" in text:
+            times += [_time_to_ms(*match.groups()) for match in TIME_TAG_REGEX.finditer(text)]
+            text = TIME_TAG_REGEX.sub("", text)
+        if not times:
+            continue
 
-        # 移除时间标签，获取文本
-        text = re.sub(r"\[\d+:\d+(?:[.:]\d+)?\]", "", trimmed_line).strip()
+        text = text.strip()
         if text and not is_invalid_lyric_text(text):
             for time in times:
                 result[time] = text
@@ -112,11 +141,8 @@ def parse_lrc(lrc: str) -> dict[int, str]:
 
 def build_lrc_lines(lyric_map: dict[int, str], trans_map: dict[int, str]) -> list[LyricLine]:
     """将 LRC Map 转换为 LyricLine 数组"""
-    all_times = set(lyric_map.keys()) | set(trans_map.keys())
-    sorted_times = sorted(all_times)
-
     lines: list[LyricLine] = []
-    for time in sorted_times:
+    for time in sorted(lyric_map.keys() | trans_map.keys()):
         text = lyric_map.get(time, "")
         if text:
             line: LyricLine = {"time": time, "text": text}
@@ -137,9 +163,58 @@ def is_qrc_format(lyric: str) -> bool:
     if not trimmed:
         return False
 
-    # 检查前30行是否有 QRC 格式的行首 [数字,数字]
-    lines = trimmed.split("\n")[:30]
-    return any(re.match(r"^\[\d+,\d+", line.strip()) for line in lines)
+    # 检查前30行是否有 QRC 格式的行首 [数字,数字]，不切分整首歌词
+    lines = trimmed.split("\n", QRC_DETECT_LINES)[:QRC_DETECT_LINES]
+    return any(QRC_LINE_PREFIX_REGEX.match(line.strip()) for line in lines)
+
+
+def _parse_qrc_words(content: str, line_start_sec: float) -> tuple[list[LyricWord], str]:
+    """扫描一行 QRC 内容，按逐字时间标记切分文本
+
+    Args:
+        content: 行首时间之后的内容
+        line_start_sec: 行开始时间（秒）
+
+    Returns:
+        (逐字数组, 完整文本)
+    """
+    words: list[LyricWord] = []
+    texts: list[str] = []
+    # 上一个有效标记的结束时间，无效标记（duration 为 0）的文本从这里开始
+    valid_end: float | None = None
+
+    # split 按标记切分为 [文本, 开始, 持续, 文本, 开始, 持续, ..., 剩余文本]
+    tokens = WORD_MARKER_REGEX.split(content)
+    token_iter = iter(tokens)
+    for text, start_ms, duration_ms in zip(token_iter, token_iter, token_iter):
+        start = int(start_ms) / 1000
+        duration = int(duration_ms) / 1000
+        if text:
+            if duration > 0:
+                words.append({"text": text, "start": start, "duration": duration})
+            else:
+                word_start = valid_end if valid_end is not None else line_start_sec
+                words.append({"text": text, "start": word_start, "duration": DEFAULT_WORD_DURATION})
+            texts.append(text)
+        if duration > 0:
+            valid_end = start + duration
+
+    # 处理最后一个时间标记后的文本
+    if tokens[-1]:
+        remaining = CLEANUP_TIME_MARKER_REGEX.sub("", tokens[-1])
+        if remaining.strip():
+            start_time = valid_end if valid_end is not None else line_start_sec
+            words.append({"text": remaining, "start": start_time, "duration": DEFAULT_WORD_DURATION})
+            texts.append(remaining)
+
+    # 如果没有时间标记但有内容，整行作为一个词
+    if not words and content.strip():
+        cleaned_content = CLEANUP_TIME_MARKER_REGEX.sub("", content).strip()
+        if cleaned_content:
+            word: LyricWord = {"text": cleaned_content, "start": line_start_sec, "duration": DEFAULT_WORD_DURATION}
+            return [word], cleaned_content
+
+    return words, "".join(texts)
 
 
 def parse_qrc(qrc: str) -> list[QrcLyricLine]:
@@ -152,107 +227,53 @@ def parse_qrc(qrc: str) -> list[QrcLyricLine]:
         return result
 
     cleaned = qrc.replace("\ufeff", "").replace("\r", "")
-    # 支持 QQ 音乐 (数字,数字) 和 网易云 YRC (数字,数字,数字)
-    time_marker_regex = re.compile(r"\((\d+),(\d+)(?:,\d+)?\)")
 
     for line in cleaned.split("\n"):
         trimmed_line = line.rstrip()
-        if not trimmed_line:
-            continue
-
         # 匹配行首格式：[数字,数字] 或 [数字,数字,其他]
-        line_match = re.match(r"^\[(\d+),(\d+)(?:,.*?)?\](.+)$", trimmed_line)
+        line_match = QRC_LINE_REGEX.match(trimmed_line) if trimmed_line else None
         if not line_match:
             continue
 
         line_start = int(line_match.group(1))
-        if line_start < 0:
-            continue
-
-        content = line_match.group(3)
-        words: list[LyricWord] = []
-        full_text = ""
-
-        # 收集所有时间标记
-        markers: list[dict] = []
-        for time_match in time_marker_regex.finditer(content):
-            start = int(time_match.group(1))
-            duration = int(time_match.group(2))
-            if start >= 0:
-                markers.append(
-                    {
-                        "index": time_match.start(),
-                        "length": len(time_match.group(0)),
-                        "start": start / 1000,
-                        "duration": duration / 1000,
-                        "is_valid": duration > 0,
-                    }
-                )
-
-        # 提取文本并构建 words 数组
-        last_end = 0
-        last_valid_marker = None
-
-        for marker in markers:
-            text = content[last_end : marker["index"]]
-            if text:
-                word_start = (
-                    marker["start"]
-                    if marker["is_valid"]
-                    else (
-                        last_valid_marker["start"] + last_valid_marker["duration"]
-                        if last_valid_marker
-                        else line_start / 1000
-                    )
-                )
-                word_duration = marker["duration"] if marker["is_valid"] else 0.1
-                words.append({"text": text, "start": word_start, "duration": word_duration})
-                full_text += text
-
-            last_end = marker["index"] + marker["length"]
-            if marker["is_valid"]:
-                last_valid_marker = marker
-
-        # 处理最后一个时间标记后的文本
-        if last_end < len(content):
-            remaining = CLEANUP_TIME_MARKER_REGEX.sub("", content[last_end:])
-            if remaining.strip():
-                start_time = (
-                    last_valid_marker["start"] + last_valid_marker["duration"]
-                    if last_valid_marker
-                    else line_start / 1000
-                )
-                words.append({"text": remaining, "start": start_time, "duration": 0.1})
-                full_text += remaining
-
-        # 如果没有时间标记但有内容，整行作为一个词
-        if not words and content.strip():
-            cleaned_content = CLEANUP_TIME_MARKER_REGEX.sub("", content).strip()
-            if cleaned_content:
-                words.append({"text": cleaned_content, "start": line_start / 1000, "duration": 0.1})
-                full_text = cleaned_content
+        words, full_text = _parse_qrc_words(line_match.group(3), line_start / 1000)
 
         # 过滤无效行
-        if words:
-            clean_text = full_text.strip()
-            is_interlude = re.match(r"^[/\-*~\s\\：:]+$", clean_text) or not clean_text
-            is_meta_info = (
-                re.match(
-                    r"^(Writtenby|Composedby|Producedby|Arrangedby|作词|作曲|词|曲|编曲|制作|演唱|原唱|翻唱)[\s：:]",
-                    clean_text,
-                    re.IGNORECASE,
-                )
-                or re.search(r"[-–]\s*(Artist|Singer|Band|作词|作曲|编曲)", clean_text, re.IGNORECASE)
-            )
-            all_symbols = all(re.match(r"^[/\-*~\s\\：:.。，,()（）]+$", w["text"].strip()) for w in words)
-            is_title_line = not result and " - " in clean_text and line_start < 60000
-
-            if not is_interlude and not is_meta_info and not all_symbols and not is_title_line:
-                result.append({"time": line_start / 1000, "words": words, "text": full_text})
+        if not words:
+            continue
+        clean_text = full_text.strip()
+        if not clean_text or INTERLUDE_REGEX.match(clean_text):
+            continue
+        if META_PREFIX_REGEX.match(clean_text) or META_CREDIT_REGEX.search(clean_text):
+            continue
+        if all(SYMBOL_WORD_REGEX.match(w["text"].strip()) for w in words):
+            continue
+        # 第一行的 "歌名 - 歌手" 标题
+        if not result and " - " in clean_text and line_start < 60000:
+            continue
+        result.append({"time": line_start / 1000, "words": words, "text": full_text})
 
     return sorted(result, key=lambda x: x["time"])
 
 
+def _match_translations(qrc_lines: list[QrcLyricLine], trans_map: dict[int, str]) -> None:
+    """为 QRC 行添加翻译（时间差在 TRANS_MATCH_WINDOW_MS 内匹配）
+
+    窗口内有多条翻译时取翻译歌词中最先出现的一条。
+    """
+    if not trans_map:
+        return
+    order = {time: index for index, time in enumerate(trans_map)}
+    times = sorted(trans_map)
+    for qrc_line in qrc_lines:
+        line_time_ms = qrc_line["time"] * 1000
+        lo = bisect_right(times, line_time_ms - TRANS_MATCH_WINDOW_MS)
+        hi = bisect_left(times, line_time_ms + TRANS_MATCH_WINDOW_MS)
+        candidates = [time for time in times[lo:hi] if not is_invalid_lyric_text(trans_map[time])]
+        if candidates:
+            qrc_line["trans"] = trans_map[min(candidates, key=order.__getitem__)]
+
+
 def parse_lyric(lyric: str, trans: str = "") -> ParsedLyric:
     """
     解析歌词（原文 + 翻译）
@@ -268,13 +289,7 @@ def parse_lyric(lyric: str, trans: str = "") -> ParsedLyric:
         qrc_lines = parse_qrc(lyric)
 
         if qrc_lines:
-            # 为 QRC 行添加翻译（时间差在 500ms 内匹配）
-            for qrc_line in qrc_lines:
-                line_time_ms = qrc_line["time"] * 1000
-                for trans_time, trans_text in trans_map.items():
-                    if abs(trans_time - line_time_ms) < 500 and not is_invalid_lyric_text(trans_text):
-                        qrc_line["trans"] = trans_text
-                        break
+            _match_translations(qrc_lines, trans_map)
 
             # 同时生成 LRC 格式的 lines（用于回退）
             lines: list[LyricLine] = []
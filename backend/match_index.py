@@ -0,0 +1,228 @@
+"""跨 Provider 歌曲匹配索引
+
+将 (歌名, 歌手, 时长) 归一化后的键映射到各 provider 中对应的歌曲 ID，
+并记录最近一次成功提供播放链接的 provider。fallback 时命中索引即可跳过搜索，
+直接在已知可用的 provider 中解析播放链接。索引持久化到插件设置目录。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import decky
+from backend.matching import make_match_key
+from backend.types import CacheStats, MatchEntry
+from backend.util import atomic_write_text
+
+# 索引最多保存的歌曲数，超出时淘汰最久未使用的条目
+MATCH_INDEX_MAX_ENTRIES = 5000
+# 时长分桶宽度（秒），键中只保存桶号
+DURATION_BUCKET = 10
+# 时长差在该范围内（秒）视为同一首歌
+DURATION_TOLERANCE = 3
+# 修改后延迟写盘的时间（秒），合并短时间内的多次修改
+SAVE_DELAY = 5.0
+
+
+class MatchIndex:
+    """持久化的跨 provider 歌曲匹配索引"""
+
+    def __init__(self, path: Path, max_entries: int = MATCH_INDEX_MAX_ENTRIES) -> None:
+        self._path = path
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, MatchEntry] | None = None
+        self._save_handle: asyncio.TimerHandle | None = None
+        self._save_task: asyncio.Task[None] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _base_key(name: str, singer: str) -> str:
+        key = make_match_key(name, singer)
+        versions = "+".join(sorted(key.versions))
+        return f"{key.title}|{','.join(sorted(key.artists))}|{versions}"
+
+    @classmethod
+    def make_key(cls, name: str, singer: str, duration: float | None = None) -> str:
+        """生成归一化的索引键
+
+        Args:
+            name: 歌名
+            singer: 歌手
+            duration: 时长（秒），未知时为 None 或 0
+
+        Returns:
+            索引键
+        """
+        bucket = int(duration) // DURATION_BUCKET if duration else ""
+        return f"{cls._base_key(name, singer)}|{bucket}"
+
+    def _load(self) -> OrderedDict[str, MatchEntry]:
+        if self._entries is not None:
+            return self._entries
+        entries: OrderedDict[str, MatchEntry] = OrderedDict()
+        try:
+            if self._path.exists():
+                with open(self._path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    items = sorted(data.items(), key=lambda kv: kv[1].get("updated_at", 0))
+                    entries.update(items)
+        except Exception as e:
+            decky.logger.warning(f"读取匹配索引失败: {e}")
+        self._entries = entries
+        return entries
+
+    def load(self) -> None:
+        """预先从磁盘加载索引（阻塞 I/O，应在线程中调用）"""
+        self._load()
+
+    def _candidate_keys(self, name: str, singer: str, duration: float | None) -> list[str]:
+        base = self._base_key(name, singer)
+        if not duration:
+            return [f"{base}|"]
+        bucket = int(duration) // DURATION_BUCKET
+        return [f"{base}|{b}" for b in (bucket, bucket - 1, bucket + 1)]
+
+    def lookup(self, name: str, singer: str, duration: float | None = None) -> tuple[str, MatchEntry] | None:
+        """查找歌曲的索引条目
+
+        时长已知时同时检查相邻时长桶，并要求时长差不超过容差。
+
+        Args:
+            name: 歌名
+            singer: 歌手
+            duration: 时长（秒）
+
+        Returns:
+            (索引键, 条目)，未命中返回 None
+        """
+        entries = self._load()
+        for key in self._candidate_keys(name, singer, duration):
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            if duration and entry.get("duration") and abs(entry["duration"] - int(duration)) > DURATION_TOLERANCE:
+                continue
+            entries.move_to_end(key)
+            self.hits += 1
+            return key, entry
+        self.misses += 1
+        return None
+
+    def record(self, key: str, provider_id: str, mid: str, duration: float | None = None, served: bool = True) -> None:
+        """记录歌曲在某个 provider 中的 ID
+
+        Args:
+            key: 索引键（make_key 或 lookup 返回）
+            provider_id: provider ID
+            mid: 该 provider 中的歌曲 ID
+            duration: 时长（秒）
+            served: 该 provider 是否成功提供了播放链接
+        """
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None:
+            entry = {"mids": {}, "last_provider": "", "duration": int(duration or 0), "updated_at": 0.0}
+            entries[key] = entry
+        changed = entry["mids"].get(provider_id) != mid
+        entry["mids"][provider_id] = mid
+        if served and entry["last_provider"] != provider_id:
+            entry["last_provider"] = provider_id
+            changed = True
+        if duration and not entry["duration"]:
+            entry["duration"] = int(duration)
+        entry["updated_at"] = time.time()
+        entries.move_to_end(key)
+        while len(entries) > self._max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        if changed:
+            self._schedule_save()
+
+    def forget(self, key: str, provider_id: str) -> None:
+        """移除失效的映射（如该 ID 已无法解析播放链接）"""
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None or provider_id not in entry["mids"]:
+            return
+        del entry["mids"][provider_id]
+        if entry["last_provider"] == provider_id:
+            entry["last_provider"] = ""
+        if not entry["mids"]:
+            del entries[key]
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._snapshot())
+            return
+        self._save_handle = loop.call_later(SAVE_DELAY, self._start_save)
+
+    def _start_save(self) -> None:
+        self._save_handle = None
+        self._save_task = asyncio.get_running_loop().create_task(self._save())
+
+    def _snapshot(self) -> str:
+        return json.dumps(self._entries or {}, ensure_ascii=False, separators=(",", ":"))
+
+    def _write(self, text: str) -> None:
+        try:
+            atomic_write_text(self._path, text)
+        except Exception as e:
+            decky.logger.warning(f"保存匹配索引失败: {e}")
+
+    async def _save(self) -> None:
+        await asyncio.to_thread(self._write, self._snapshot())
+
+    async def flush(self) -> None:
+        """立即写入尚未保存的修改"""
+        pending = self._save_handle is not None
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._save_task is not None and not self._save_task.done():
+            await self._save_task
+        if pending:
+            await self._save()
+
+    async def clear(self) -> None:
+        """清空索引并删除索引文件
+
+        取消尚未开始的延迟写入，并等待进行中的写入完成后再删除文件，避免旧索引被重新写回。
+        """
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._entries = OrderedDict()
+        if self._save_task is not None and not self._save_task.done():
+            # 线程中的写入无法中途取消，只能等它完成
+            await self._save_task
+        await asyncio.to_thread(self._delete_file)
+
+    def _delete_file(self) -> None:
+        try:
+            self._path.unlink(missing_ok=True)
+        except OSError as e:
+            decky.logger.warning(f"删除匹配索引失败: {e}")
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def stats(self) -> CacheStats:
+        return {
+            "size": len(self._load()),
+            "maxSize": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
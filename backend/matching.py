@@ -0,0 +1,279 @@
+"""跨 Provider 歌曲匹配
+
+将歌名、歌手归一化为可比较的键（去除括号注释、feat.、版本后缀、全角字符，繁体转简体），
+并按歌名相似度、歌手集合重合度和时长差为候选歌曲打分，从一页搜索结果中选出最佳匹配。
+
+本模块只依赖标准库，可单独测试和做基准测试。
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections.abc import Iterable, Mapping
+from difflib import SequenceMatcher
+from typing import NamedTuple, TypeVar
+
+# 候选歌曲的最低综合得分，低于该值视为无匹配
+MIN_MATCH_SCORE = 0.62
+# 歌名相似度下限，避免仅凭歌手和时长匹配到其他歌曲
+MIN_TITLE_SIMILARITY = 0.75
+# 时长差在该范围内（秒）视为完全一致，超过 DURATION_MAX_DELTA 得分为 0
+DURATION_EXACT_DELTA = 2
+DURATION_MAX_DELTA = 15
+# 各维度权重
+TITLE_WEIGHT = 0.55
+ARTIST_WEIGHT = 0.3
+DURATION_WEIGHT = 0.15
+# 版本标签（live、伴奏等）不一致时的扣分
+VERSION_MISMATCH_PENALTY = 0.4
+# 去重时视为同一首歌的最低歌手重合度和时长接近程度
+DEDUPE_MIN_ARTIST_OVERLAP = 0.7
+DEDUPE_MIN_DURATION_SCORE = 0.5
+
+# 常见的繁体 -> 简体字对照（覆盖歌名、歌手名中的高频字）
+_TRAD_TO_SIMP = str.maketrans(
+    (
+        "愛們個時說這風夢聽樂歲後離與無見過還戀憶讓願淚傷歡麗臉裡開關門間來會話東長為萬華龍國當紅號點塵變難邊雙從對緣陽雲飛燈鐘遠"
+        "學寫鄉聲隻覺經業實兒親氣錯陳張劉楊趙黃吳鄧蘇許謝韓傑倫蕭齊鳳嗎麼寶獨戰歸舊憂輕靜藍綠習夠懷壞擁滿漢燒燦爺環頭題體驚驗靈衛"
+        "鍾鏡鐵錢銀電圓園語誰謊請讀認識詩記計憐慣態總戲場熱煙隨際隊陰陸網緊絕給結絲紛練續纏線紙約級紀細終羅義聖腦脫藝蘭衝術裝複譜"
+        "貓負貝賴趕跡蹤軌輪輩農連進運遲適遺郵鋼錄鎖閃閱隱雖雞霧響順須頁飄飯養餘馬駕騎髮鬧魚鳥鹽麥齡"
+    ),
+    (
+        "爱们个时说这风梦听乐岁后离与无见过还恋忆让愿泪伤欢丽脸里开关门间来会话东长为万华龙国当红号点尘变难边双从对缘阳云飞灯钟远"
+        "学写乡声只觉经业实儿亲气错陈张刘杨赵黄吴邓苏许谢韩杰伦萧齐凤吗么宝独战归旧忧轻静蓝绿习够怀坏拥满汉烧灿爷环头题体惊验灵卫"
+        "钟镜铁钱银电圆园语谁谎请读认识诗记计怜惯态总戏场热烟随际队阴陆网紧绝给结丝纷练续缠线纸约级纪细终罗义圣脑脱艺兰冲术装复谱"
+        "猫负贝赖赶迹踪轨轮辈农连进运迟适遗邮钢录锁闪阅隐虽鸡雾响顺须页飘饭养余马驾骑发闹鱼鸟盐麦龄"
+    ),
+)
+
+# 区分不同录音版本的标签，候选与目标不一致时扣分
+_VERSION_PATTERNS: dict[str, re.Pattern[str]] = {
+    "live": re.compile(r"\blive\b|现场|演唱会|音乐会"),
+    "remix": re.compile(r"\bremix\b|混音"),
+    "instrumental": re.compile(r"\binstrumental\b|\bkaraoke\b|\boff ?vocal\b|伴奏|纯音乐"),
+    "acoustic": re.compile(r"\bacoustic\b|\bunplugged\b|不插电"),
+    "cover": re.compile(r"\bcover\b|翻唱|翻自"),
+}
+# 不影响匹配的注释（重制、单曲版等），直接丢弃
+_NOISE_PATTERN = re.compile(
+    r"\bremaster(?:ed)?\b|\b\d{4}\s*remaster|\bradio edit\b|\bsingle version\b|\balbum version\b"
+    r"|\boriginal mix\b|重制版?|修复版|单曲版"
+)
+# 括号注释：(...)、[...]、{...}，以及 NFKC 后仍保留的中文括号
+_BRACKET_PATTERN = re.compile(r"\([^()]*\)|\[[^\[\]]*\]|\{[^{}]*\}|【[^【】]*】|〔[^〔〕]*〕|「[^「」]*」|『[^『』]*』")
+# 歌名中的合作歌手：feat. X、ft. X、featuring X
+_FEAT_PATTERN = re.compile(r"\s*(?:\bfeat\b\.?|\bft\b\.?|\bfeaturing\b)\s+.*$")
+_FEAT_ARTISTS_PATTERN = re.compile(r"(?:\bfeat\b\.?|\bft\b\.?|\bfeaturing\b)\s+([^()\[\]]+)")
+# 歌名中 " - " 之后的版本说明，如 "Song - Live"、"Song - 2011 Remaster"
+_DASH_SUFFIX_PATTERN = re.compile(r"\s+[-–—]\s+.*$")
+# 歌手分隔符
+_ARTIST_SPLIT_PATTERN = re.compile(r"\s*(?:,|/|&|、|;|×|(?<=\s)x(?=\s)|\band\b|\bfeat\b\.?|\bft\b\.?|\bwith\b)\s*")
+# 比较时忽略的字符（标点、空白）
+_STRIP_PATTERN = re.compile(r"[\W_]+")
+
+T = TypeVar("T", bound=Mapping[str, object])
+
+
+class MatchKey(NamedTuple):
+    """预先计算的歌曲匹配键"""
+
+    title: str  # 归一化歌名（不含括号注释、feat. 和版本说明）
+    artists: frozenset[str]  # 归一化歌手集合
+    versions: frozenset[str]  # 版本标签，如 live、remix
+    duration: int  # 时长（秒），0 表示未知
+
+
+def _fold(text: str) -> str:
+    """全角转半角、统一大小写、繁体转简体"""
+    return unicodedata.normalize("NFKC", text).casefold().translate(_TRAD_TO_SIMP)
+
+
+def _compact(text: str) -> str:
+    return _STRIP_PATTERN.sub("", text)
+
+
+def extract_versions(name: str) -> frozenset[str]:
+    """提取歌名中的版本标签"""
+    folded = _fold(name)
+    return frozenset(tag for tag, pattern in _VERSION_PATTERNS.items() if pattern.search(folded))
+
+
+def clean_title(name: str) -> str:
+    """去除括号注释、feat. 和 " - " 版本说明，保留可读的歌名（用于搜索）"""
+    text = unicodedata.normalize("NFKC", name)
+    previous = None
+    while previous != text:
+        previous = text
+        text = _BRACKET_PATTERN.sub(" ", text)
+    text = _DASH_SUFFIX_PATTERN.sub("", text)
+    text = _FEAT_PATTERN.sub("", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    # 整个歌名都是括号内容时保留原文
+    return text or name.strip()
+
+
+def normalize_title(name: str) -> str:
+    """生成用于比较的歌名键"""
+    title = _fold(clean_title(name))
+    title = _NOISE_PATTERN.sub(" ", title)
+    return _compact(title) or _compact(_fold(name))
+
+
+def split_artists(singer: str) -> frozenset[str]:
+    """将歌手字符串拆分为归一化的歌手集合"""
+    folded = _fold(singer)
+    parts = _ARTIST_SPLIT_PATTERN.split(folded)
+    return frozenset(key for part in parts if (key := _compact(part)))
+
+
+def make_match_key(name: str, singer: str = "", duration: float | int | None = None) -> MatchKey:
+    """计算歌曲的匹配键
+
+    Args:
+        name: 歌名
+        singer: 歌手（多个歌手以逗号、/、& 等分隔）
+        duration: 时长（秒）
+
+    Returns:
+        匹配键
+    """
+    return MatchKey(
+        title=normalize_title(name),
+        artists=split_artists(singer) | _featured_artists(name),
+        versions=extract_versions(name),
+        duration=int(duration or 0),
+    )
+
+
+def _featured_artists(name: str) -> frozenset[str]:
+    folded = _fold(name)
+    match = _FEAT_ARTISTS_PATTERN.search(folded)
+    return split_artists(match.group(1)) if match else frozenset()
+
+
+def title_similarity(a: str, b: str) -> float:
+    """歌名相似度（0~1）"""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def artist_overlap(a: frozenset[str], b: frozenset[str]) -> float:
+    """歌手集合重合度（0~1），任一方未知时返回中性值 0.5"""
+    if not a or not b:
+        return 0.5
+    common = len(a & b)
+    if common:
+        # 以较小集合为基准，"A" 与 "A, B" 视为高度重合
+        return common / min(len(a), len(b)) * 0.8 + common / len(a | b) * 0.2
+    # 同一歌手的不同写法（如 "周杰伦" 与 "周杰伦jay"）
+    for x in a:
+        for y in b:
+            if x in y or y in x:
+                return 0.7
+    return 0.0
+
+
+def duration_score(a: int, b: int) -> float:
+    """时长接近程度（0~1），任一方未知时返回中性值 0.5"""
+    if a <= 0 or b <= 0:
+        return 0.5
+    delta = abs(a - b)
+    if delta <= DURATION_EXACT_DELTA:
+        return 1.0
+    if delta >= DURATION_MAX_DELTA:
+        return 0.0
+    return 1.0 - (delta - DURATION_EXACT_DELTA) / (DURATION_MAX_DELTA - DURATION_EXACT_DELTA)
+
+
+def score_match(target: MatchKey, candidate: MatchKey) -> float:
+    """计算候选歌曲与目标的综合得分（0~1）
+
+    歌名相似度低于 MIN_TITLE_SIMILARITY 时直接返回 0。
+    """
+    title = title_similarity(target.title, candidate.title)
+    if title < MIN_TITLE_SIMILARITY:
+        return 0.0
+    score = (
+        title * TITLE_WEIGHT
+        + artist_overlap(target.artists, candidate.artists) * ARTIST_WEIGHT
+        + duration_score(target.duration, candidate.duration) * DURATION_WEIGHT
+    )
+    score -= len(target.versions ^ candidate.versions) * VERSION_MISMATCH_PENALTY
+    return max(score, 0.0)
+
+
+def _as_int(value: object) -> int:
+    try:
+        return int(float(value))  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0
+
+
+def song_match_key(song: Mapping[str, object]) -> MatchKey:
+    """根据歌曲信息（SongInfo 结构）计算匹配键"""
+    return make_match_key(str(song.get("name", "")), str(song.get("singer", "")), _as_int(song.get("duration")))
+
+
+def pick_best_match(
+    target: MatchKey,
+    candidates: Iterable[T],
+    min_score: float = MIN_MATCH_SCORE,
+) -> tuple[T, float] | None:
+    """从候选歌曲中选出得分最高的匹配
+
+    Args:
+        target: 目标歌曲的匹配键
+        candidates: 候选歌曲（SongInfo 结构）
+        min_score: 最低得分
+
+    Returns:
+        (最佳候选, 得分)，无候选达到最低得分时返回 None
+    """
+    best: tuple[T, float] | None = None
+    for candidate in candidates:
+        score = score_match(target, song_match_key(candidate))
+        if score >= min_score and (best is None or score > best[1]):
+            best = (candidate, score)
+    return best
+
+
+def is_same_song(a: MatchKey, b: MatchKey) -> bool:
+    """判断两个匹配键是否为同一首歌的同一版本（用于合并多个 provider 的搜索结果）"""
+    return (
+        a.title == b.title
+        and a.versions == b.versions
+        and artist_overlap(a.artists, b.artists) >= DEDUPE_MIN_ARTIST_OVERLAP
+        and duration_score(a.duration, b.duration) >= DEDUPE_MIN_DURATION_SCORE
+    )
+
+
+def dedupe_songs(songs: Iterable[T]) -> list[T]:
+    """按归一化的歌名、歌手、版本和时长去重，保留先出现的歌曲
+
+    Args:
+        songs: 歌曲列表（SongInfo 结构），靠前的优先保留
+
+    Returns:
+        去重后的歌曲列表
+    """
+    kept: list[T] = []
+    # (歌名, 版本) -> 已保留歌曲的匹配键，只在同名同版本的歌曲间比较歌手和时长
+    seen: dict[tuple[str, frozenset[str]], list[MatchKey]] = {}
+    for song in songs:
+        key = song_match_key(song)
+        bucket = seen.setdefault((key.title, key.versions), [])
+        if any(is_same_song(key, other) for other in bucket):
+            continue
+        bucket.append(key)
+        kept.append(song)
+    return kept
+
+
+def search_query(name: str, singer: str) -> str:
+    """生成跨 provider 搜索用的关键词：去除注释后的歌名 + 第一位歌手"""
+    artists = [a for a in re.split(r"\s*[,/&、;]\s*", singer) if a.strip()]
+    return f"{clean_title(name)} {artists[0].strip() if artists else ''}".strip()
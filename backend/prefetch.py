@@ -0,0 +1,168 @@
+"""播放队列预取
+
+在当前歌曲开始播放时，于后台为队列中接下来的若干首歌曲解析播放链接（含 fallback）和歌词，
+结果写入普通 RPC 读取的缓存（播放链接缓存、歌词磁盘缓存），切到下一首时即可直接命中。
+
+预取深度随跳过频率自适应：用户经常跳过时预取更多首，很少跳过时只预取下一首，
+避免为听不到的歌曲浪费请求（播放链接也会过期）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Mapping
+
+import decky
+from backend.types import PrefetchStats, SongInfo
+
+# 默认预取深度上限与允许的最大值
+PREFETCH_DEFAULT_DEPTH = 3
+PREFETCH_MAX_DEPTH = 5
+# 同时进行的预取数
+PREFETCH_CONCURRENCY = 2
+# 播放时长不足该值（秒）或不足歌曲时长一半即切歌，视为跳过
+SKIP_MIN_PLAY_SECONDS = 30
+# 跳过率的指数平滑系数
+SKIP_RATE_ALPHA = 0.3
+
+Resolver = Callable[[SongInfo], Awaitable[Mapping[str, object]]]
+
+
+class QueuePrefetcher:
+    """按队列顺序预取播放链接和歌词"""
+
+    def __init__(self, resolve_url: Resolver, resolve_lyric: Resolver) -> None:
+        """
+        Args:
+            resolve_url: 解析播放链接并写入缓存的协程函数
+            resolve_lyric: 获取解析后歌词并写入缓存的协程函数
+        """
+        self._resolve_url = resolve_url
+        self._resolve_lyric = resolve_lyric
+        self._semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        # mid -> 进行中的预取任务
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        # 已完成预取的 mid（仅保留最近一批），用于统计命中
+        self._ready: set[str] = set()
+        # 上一次调用时正在播放的歌曲及开始时间，用于判断是否跳过
+        self._current: SongInfo | None = None
+        self._current_started = 0.0
+        self._skip_rate = 0.0
+        self._depth = 1
+        self._scheduled = 0
+        self._completed = 0
+        self._failed = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _update_skip_rate(self, now: float) -> None:
+        previous = self._current
+        if previous is None:
+            return
+        played = now - self._current_started
+        duration = float(previous.get("duration") or 0)
+        threshold = min(SKIP_MIN_PLAY_SECONDS, duration / 2) if duration > 0 else SKIP_MIN_PLAY_SECONDS
+        skipped = played < threshold
+        self._skip_rate += SKIP_RATE_ALPHA * (float(skipped) - self._skip_rate)
+
+    @property
+    def depth(self) -> int:
+        """最近一次调度使用的预取深度"""
+        return self._depth
+
+    def effective_depth(self, max_depth: int) -> int:
+        """根据跳过率计算实际预取深度：不跳过时为 1，总是跳过时为 max_depth"""
+        if max_depth <= 0:
+            return 0
+        return 1 + round(self._skip_rate * (max_depth - 1))
+
+    def schedule(self, items: list[SongInfo], depth: int = PREFETCH_DEFAULT_DEPTH) -> list[str]:
+        """预取队列中当前歌曲之后的歌曲
+
+        Args:
+            items: 当前正在播放的歌曲及其后的队列条目（按播放顺序）
+            depth: 预取深度上限，实际深度随跳过率自适应
+
+        Returns:
+            本次预取窗口内的歌曲 mid
+        """
+        now = time.monotonic()
+        current = items[0] if items else None
+        if current is not None and current.get("mid") != (self._current or {}).get("mid"):
+            self._update_skip_rate(now)
+            mid = str(current.get("mid", ""))
+            if mid in self._ready or mid in self._tasks:
+                self._hits += 1
+            elif self._current is not None:
+                self._misses += 1
+            self._current = current
+            self._current_started = now
+
+        max_depth = max(0, min(int(depth), PREFETCH_MAX_DEPTH))
+        self._depth = self.effective_depth(max_depth)
+        window = [
+            song for song in items[1 : 1 + self._depth] if song.get("mid") and song.get("name") and song.get("singer")
+        ]
+        wanted = {str(song["mid"]) for song in window}
+
+        # 取消已不在窗口内的预取（进行中的共享请求不受影响，结果仍会进入缓存）
+        for mid, task in list(self._tasks.items()):
+            if mid not in wanted:
+                task.cancel()
+                del self._tasks[mid]
+        self._ready &= wanted
+
+        for song in window:
+            mid = str(song["mid"])
+            if mid in self._tasks or mid in self._ready:
+                continue
+            self._scheduled += 1
+            task = asyncio.create_task(self._prefetch(song))
+            self._tasks[mid] = task
+            task.add_done_callback(self._forget_task)
+        return [str(song["mid"]) for song in window]
+
+    def _forget_task(self, task: asyncio.Task[None]) -> None:
+        for mid, pending in list(self._tasks.items()):
+            if pending is task:
+                del self._tasks[mid]
+
+    async def _prefetch(self, song: SongInfo) -> None:
+        mid = str(song["mid"])
+        async with self._semaphore:
+            try:
+                url_result = await self._resolve_url(song)
+                if not url_result.get("success"):
+                    self._failed += 1
+                    decky.logger.debug(f"预取 {mid} 播放链接失败: {url_result.get('error')}")
+                    return
+                await self._resolve_lyric(song)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                decky.logger.debug(f"预取 {mid} 失败: {e}")
+                return
+        self._completed += 1
+        self._ready.add(mid)
+
+    async def shutdown(self) -> None:
+        """取消所有进行中的预取"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def stats(self) -> PrefetchStats:
+        return {
+            "depth": self._depth,
+            "skipRate": round(self._skip_rate, 3),
+            "inFlight": len(self._tasks),
+            "scheduled": self._scheduled,
+            "completed": self._completed,
+            "failed": self._failed,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
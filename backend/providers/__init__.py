@@ -1,17 +1,39 @@
 """Provider 模块
 
 提供音乐服务提供者的抽象层，支持多 provider 切换和 fallback。
+具体 provider 实现依赖体积较大的 SDK，按需导入（PEP 562）。
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 from backend.providers.base import Capability, MusicProvider
 from backend.providers.manager import ProviderManager
-from backend.providers.netease import NeteaseProvider
-from backend.providers.qqmusic import QQMusicProvider
+from backend.providers.registry import PROVIDER_SPECS, ProviderSpec
+
+if TYPE_CHECKING:
+    from backend.providers.netease import NeteaseProvider
+    from backend.providers.qqmusic import QQMusicProvider
+
+# 按需导入的名称 -> 所在模块
+_LAZY_EXPORTS = {spec.class_name: spec.module for spec in PROVIDER_SPECS}
+
+
+def __getattr__(name: str) -> object:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "Capability",
     "MusicProvider",
+    "PROVIDER_SPECS",
     "ProviderManager",
+    "ProviderSpec",
     "QQMusicProvider",
     "NeteaseProvider",
 ]
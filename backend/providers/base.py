@@ -4,15 +4,19 @@
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from enum import Enum
 
 from backend.types import (
     DailyRecommendResponse,
     FavSongsResponse,
     HotSearchResponse,
+    LikedStatusResponse,
     LoginStatusResponse,
     OperationResult,
     PlaylistSongsResponse,
+    PlaylistTrackIdsResponse,
+    PlaylistWindowResponse,
     PreferredQuality,
     QrCodeResponse,
     QrStatusResponse,
@@ -22,6 +26,7 @@ from backend.types import (
     SearchSuggestResponse,
     SongInfoResponse,
     SongLyricResponse,
+    SongsDetailResponse,
     SongUrlBatchResponse,
     SongUrlResponse,
     UserPlaylistsResponse,
@@ -72,6 +77,9 @@ class MusicProvider(ABC):
     每个方法默认返回 NotImplementedError，子类根据自身能力选择性实现。
     """
 
+    # 登录状态变化回调 (provider_id, 新状态或 None)，由 ProviderManager 注册时设置
+    on_login_changed: Callable[[str, LoginStatusResponse | None], None] | None = None
+
     @property
     @abstractmethod
     def id(self) -> str:
@@ -131,6 +139,24 @@ class MusicProvider(ABC):
         """
         return False
 
+    def start_background_tasks(self) -> None:  # noqa: B027 - 可选钩子，默认不做任何事
+        """启动后台维护任务（如凭证续期），需在事件循环中调用
+
+        默认无后台任务。
+        """
+
+    async def shutdown(self) -> None:  # noqa: B027 - 可选钩子，默认不做任何事
+        """停止后台任务并释放资源，插件卸载时调用"""
+
+    def _notify_login_changed(self, status: LoginStatusResponse | None = None) -> None:
+        """通知登录状态发生变化（登录、退出、凭证刷新等）
+
+        Args:
+            status: 变化后的登录状态，None 表示状态已失效、需要重新检查
+        """
+        if self.on_login_changed is not None:
+            self.on_login_changed(self.id, status)
+
     # ==================== 认证相关 ====================
 
     async def get_qr_code(self, login_type: str = "qq") -> QrCodeResponse:
@@ -252,6 +278,18 @@ class MusicProvider(ABC):
             "trans": "",
         }
 
+    async def get_songs_detail(self, mids: list[str]) -> SongsDetailResponse:
+        """批量获取统一结构的歌曲信息
+
+        Args:
+            mids: 歌曲 ID 列表
+
+        Returns:
+            歌曲信息列表（顺序不保证与 mids 一致）
+        """
+        del mids
+        return {"success": False, "error": "Not implemented", "songs": []}
+
     async def get_song_info(self, mid: str) -> SongInfoResponse:
         """获取歌曲详细信息
 
@@ -305,6 +343,18 @@ class MusicProvider(ABC):
         del page, num
         return {"success": False, "error": "Not implemented", "songs": [], "total": 0}
 
+    async def is_liked(self, mids: list[str]) -> LikedStatusResponse:
+        """批量查询歌曲是否已喜欢
+
+        Args:
+            mids: 歌曲 ID 列表
+
+        Returns:
+            歌曲 ID 到喜欢状态的映射
+        """
+        del mids
+        return {"success": False, "error": "Not implemented", "liked": {}}
+
     async def get_user_playlists(self) -> UserPlaylistsResponse:
         """获取用户歌单
 
@@ -330,3 +380,48 @@ class MusicProvider(ABC):
         """
         del playlist_id, dirid
         return {"success": False, "error": "Not implemented", "songs": [], "playlist_id": 0}
+
+    async def get_playlist_track_ids(self, playlist_id: int, dirid: int = 0) -> PlaylistTrackIdsResponse:
+        """获取歌单中歌曲 ID 的有序列表
+
+        默认基于 get_playlist_songs 实现，并附带已取得的歌曲详情，
+        此时分段获取只是切分已完整拉取的列表，不减少首次请求量；
+        能单独获取 ID 列表的 provider 应覆盖此方法，
+        能按页获取歌曲的 provider 应改为实现 get_playlist_songs_page。
+
+        Args:
+            playlist_id: 歌单 ID
+            dirid: 目录 ID（某些 provider 需要）
+
+        Returns:
+            歌曲 ID 有序列表
+        """
+        result = await self.get_playlist_songs(playlist_id, dirid)
+        songs = result.get("songs") or []
+        response: PlaylistTrackIdsResponse = {
+            "success": bool(result.get("success")),
+            "mids": [str(s.get("mid", "")) for s in songs if s.get("mid")],
+            "songs": songs,
+            "playlist_id": playlist_id,
+        }
+        if "error" in result:
+            response["error"] = result["error"]
+        return response
+
+    async def get_playlist_songs_page(
+        self, playlist_id: int, offset: int, limit: int, dirid: int = 0
+    ) -> PlaylistWindowResponse | None:
+        """按服务端分页获取歌单中的一段歌曲
+
+        Args:
+            playlist_id: 歌单 ID
+            offset: 窗口起始位置
+            limit: 窗口大小
+            dirid: 目录 ID（某些 provider 需要）
+
+        Returns:
+            窗口内的歌曲及歌单总数；不支持服务端分页时返回 None，
+            由调用方改用 get_playlist_track_ids 获取的 ID 列表分段
+        """
+        del playlist_id, offset, limit, dirid
+        return None
@@ -0,0 +1,310 @@
+"""Provider 健康度跟踪与熔断
+
+按 provider、按接口记录最近若干次调用的成功率、延迟分位数和错误类别。
+网络类错误（超时、连接失败、异常）连续或高比例出现时打开熔断，
+熔断期间由后台探测恢复情况，ProviderManager 据此跳过或降级不健康的 provider。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable
+from typing import Literal, NamedTuple
+
+import decky
+from backend.types import EndpointHealthStats, ProviderHealthStats
+
+# 每个接口保留的最近调用次数
+HEALTH_WINDOW = 20
+# 熔断判断所需的最少调用次数，以及网络类错误占比阈值
+BREAKER_MIN_CALLS = 5
+BREAKER_FAILURE_RATIO = 0.5
+# 连续网络类错误达到该次数时直接熔断
+BREAKER_CONSECUTIVE_FAILURES = 3
+# 熔断后首次探测前的等待时间（秒），探测失败时加倍，直至上限
+BREAKER_OPEN_SECONDS = 30.0
+BREAKER_MAX_OPEN_SECONDS = 300.0
+# 成功率低于该值或 p95 延迟高于该值（毫秒）的 provider 视为降级，fallback 时排在健康的之后
+# 成功率与熔断一样不计上游业务错误
+DEGRADED_SUCCESS_RATE = 0.5
+DEGRADED_P95_MS = 4000.0
+
+# 计入熔断的错误类别：与具体歌曲无关、说明上游不可用的错误
+BREAKER_ERROR_CLASSES = frozenset({"timeout", "network", "exception"})
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+_TIMEOUT_HINTS = ("timeout", "timed out", "超时")
+_NETWORK_HINTS = (
+    "connection",
+    "connect",
+    "network",
+    "resolve",
+    "ssl",
+    "remote end closed",
+    "max retries",
+    "502",
+    "503",
+    "504",
+    "网络",
+)
+
+
+def classify_error(error: object) -> str:
+    """将异常或错误信息归类
+
+    Returns:
+        "timeout"、"network"、"exception"（未知异常）或 "upstream"（上游返回的业务错误，如无版权）
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    if isinstance(error, (ConnectionError, OSError)):
+        return "network"
+    text = str(error).lower()
+    if any(hint in text for hint in _TIMEOUT_HINTS):
+        return "timeout"
+    if any(hint in text for hint in _NETWORK_HINTS):
+        return "network"
+    return "exception" if isinstance(error, BaseException) else "upstream"
+
+
+class _Call(NamedTuple):
+    ok: bool
+    latency_ms: float
+    error_class: str | None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class EndpointHealth:
+    """单个接口最近调用的滚动统计"""
+
+    def __init__(self, window: int = HEALTH_WINDOW) -> None:
+        self._calls: deque[_Call] = deque(maxlen=window)
+        self.total_calls = 0
+
+    def record(self, ok: bool, latency_ms: float, error_class: str | None) -> None:
+        self._calls.append(_Call(ok, latency_ms, error_class))
+        self.total_calls += 1
+
+    def _rated_calls(self) -> list[_Call]:
+        # 上游业务错误（如 VIP 歌曲、无版权、无歌词）与 provider 健康无关，不计入成功率
+        return [c for c in self._calls if c.error_class != "upstream"]
+
+    @property
+    def rated_count(self) -> int:
+        """计入成功率的调用次数"""
+        return len(self._rated_calls())
+
+    @property
+    def success_rate(self) -> float:
+        rated = self._rated_calls()
+        if not rated:
+            return 1.0
+        return sum(c.ok for c in rated) / len(rated)
+
+    def breaker_failures(self) -> tuple[int, int]:
+        """(窗口内计入熔断的失败次数, 末尾连续的此类失败次数)"""
+        failures = sum(1 for c in self._calls if c.error_class in BREAKER_ERROR_CLASSES)
+        consecutive = 0
+        for c in reversed(self._calls):
+            if c.error_class not in BREAKER_ERROR_CLASSES:
+                break
+            consecutive += 1
+        return failures, consecutive
+
+    def latency_percentiles(self) -> tuple[float, float]:
+        values = sorted(c.latency_ms for c in self._calls)
+        return _percentile(values, 0.5), _percentile(values, 0.95)
+
+    def reset(self) -> None:
+        self._calls.clear()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> EndpointHealthStats:
+        p50, p95 = self.latency_percentiles()
+        errors = Counter(c.error_class for c in self._calls if c.error_class)
+        last_error = next((c.error_class for c in reversed(self._calls) if c.error_class), None)
+        return {
+            "calls": self.total_calls,
+            "window": len(self._calls),
+            "successRate": round(self.success_rate, 3),
+            "p50Ms": round(p50, 1),
+            "p95Ms": round(p95, 1),
+            "lastError": last_error,
+            "errorClasses": dict(errors),
+        }
+
+
+class ProviderHealth:
+    """单个 provider 的各接口统计与熔断状态"""
+
+    def __init__(self, provider_id: str) -> None:
+        self.provider_id = provider_id
+        self.endpoints: dict[str, EndpointHealth] = {}
+        self.state: BreakerState = "closed"
+        self.opened_at = 0.0
+        self.open_seconds = BREAKER_OPEN_SECONDS
+
+    def record(self, endpoint: str, ok: bool, latency_ms: float, error_class: str | None) -> bool:
+        """记录一次调用
+
+        Returns:
+            本次调用是否导致熔断打开
+        """
+        stats = self.endpoints.setdefault(endpoint, EndpointHealth())
+        stats.record(ok, latency_ms, error_class)
+
+        if ok or error_class not in BREAKER_ERROR_CLASSES:
+            if self.state == "half_open" and ok:
+                self.close()
+            return False
+
+        if self.state == "half_open":
+            self.open(escalate=True)
+            return True
+        if self.state == "open":
+            return False
+        failures, consecutive = stats.breaker_failures()
+        if consecutive >= BREAKER_CONSECUTIVE_FAILURES or (
+            len(stats) >= BREAKER_MIN_CALLS and failures / len(stats) >= BREAKER_FAILURE_RATIO
+        ):
+            self.open()
+            return True
+        return False
+
+    def open(self, escalate: bool = False) -> None:
+        if escalate:
+            self.open_seconds = min(self.open_seconds * 2, BREAKER_MAX_OPEN_SECONDS)
+        self.state = "open"
+        self.opened_at = time.monotonic()
+
+    def close(self) -> None:
+        self.state = "closed"
+        self.open_seconds = BREAKER_OPEN_SECONDS
+        # 清空窗口，避免恢复后立即因旧的失败记录再次熔断
+        for stats in self.endpoints.values():
+            stats.reset()
+
+    @property
+    def available(self) -> bool:
+        """熔断关闭或等待探测恢复（半开）时可用"""
+        return self.state != "open"
+
+    @property
+    def degraded(self) -> bool:
+        for stats in self.endpoints.values():
+            if len(stats) >= BREAKER_MIN_CALLS and stats.latency_percentiles()[1] > DEGRADED_P95_MS:
+                return True
+            if stats.rated_count >= BREAKER_MIN_CALLS and stats.success_rate < DEGRADED_SUCCESS_RATE:
+                return True
+        return False
+
+    def stats(self) -> ProviderHealthStats:
+        return {
+            "state": self.state,
+            "degraded": self.degraded,
+            "openSeconds": self.open_seconds if self.state != "closed" else 0.0,
+            "endpoints": {name: stats.stats() for name, stats in self.endpoints.items()},
+        }
+
+
+class HealthTracker:
+    """所有 provider 的健康度跟踪，熔断打开时启动后台探测"""
+
+    def __init__(self) -> None:
+        self._providers: dict[str, ProviderHealth] = {}
+        self._probes: dict[str, asyncio.Task[None]] = {}
+        self._prober: Callable[[str], Awaitable[bool]] | None = None
+
+    def set_prober(self, prober: Callable[[str], Awaitable[bool]]) -> None:
+        """设置熔断期间的探测函数
+
+        Args:
+            prober: 接收 provider_id，返回上游是否恢复的协程函数
+        """
+        self._prober = prober
+
+    def get(self, provider_id: str) -> ProviderHealth:
+        health = self._providers.get(provider_id)
+        if health is None:
+            health = self._providers[provider_id] = ProviderHealth(provider_id)
+        return health
+
+    def is_available(self, provider_id: str) -> bool:
+        return self.get(provider_id).available
+
+    def is_degraded(self, provider_id: str) -> bool:
+        return self.get(provider_id).degraded
+
+    def record(self, provider_id: str, endpoint: str, ok: bool, latency: float, error: object = None) -> None:
+        """记录一次调用结果
+
+        Args:
+            provider_id: provider ID
+            endpoint: 接口名
+            ok: 是否成功
+            latency: 耗时（秒）
+            error: 失败时的异常或错误信息
+        """
+        error_class = None if ok else classify_error(error)
+        health = self.get(provider_id)
+        if health.record(endpoint, ok, latency * 1000, error_class):
+            decky.logger.warning(
+                f"{provider_id} 熔断打开（{endpoint}: {error_class}），{health.open_seconds:.0f}s 后探测恢复"
+            )
+            self._schedule_probe(provider_id)
+
+    def order(self, provider_ids: list[str]) -> list[str]:
+        """按健康度调整顺序：跳过熔断中的 provider，降级的排在健康的之后，其余保持原顺序"""
+        available = [pid for pid in provider_ids if self.is_available(pid)]
+        return sorted(available, key=self.is_degraded)
+
+    def _schedule_probe(self, provider_id: str) -> None:
+        task = self._probes.get(provider_id)
+        if task is not None and not task.done():
+            return
+        # 没有运行中的事件循环时不探测
+        with contextlib.suppress(RuntimeError):
+            self._probes[provider_id] = asyncio.get_running_loop().create_task(self._probe_loop(provider_id))
+
+    async def _probe_loop(self, provider_id: str) -> None:
+        health = self.get(provider_id)
+        while health.state == "open":
+            await asyncio.sleep(max(0.0, health.opened_at + health.open_seconds - time.monotonic()))
+            if health.state != "open":
+                break
+            if self._prober is None:
+                # 无探测函数时放行一次真实请求作为探测
+                health.state = "half_open"
+                break
+            try:
+                recovered = await self._prober(provider_id)
+            except Exception as e:
+                decky.logger.debug(f"{provider_id} 探测失败: {e}")
+                recovered = False
+            if recovered:
+                health.close()
+                decky.logger.info(f"{provider_id} 已恢复，熔断关闭")
+            else:
+                health.open(escalate=True)
+
+    async def shutdown(self) -> None:
+        tasks = [t for t in self._probes.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._probes.clear()
+
+    def stats(self) -> dict[str, ProviderHealthStats]:
+        return {pid: health.stats() for pid, health in self._providers.items()}
@@ -3,36 +3,184 @@
 管理所有 Provider，处理路由和 fallback。
 """
 
-from typing import TYPE_CHECKING
+import asyncio
+import time
+from collections.abc import Awaitable, Mapping
+from typing import TYPE_CHECKING, TypeVar, cast
 
 import decky
+from backend.cache import LRUCache, song_metadata
+from backend.match_index import MatchIndex
+from backend.matching import dedupe_songs, make_match_key, pick_best_match, search_query
 from backend.providers.base import Capability, MusicProvider
+from backend.providers.health import HealthTracker
+from backend.providers.registry import ProviderSpec, import_provider_class
 from backend.types import (
+    LoginStatusResponse,
+    PlaylistWindowResponse,
     PreferredQuality,
     ProviderFullInfo,
+    ProviderHealthStats,
     ProviderInfoPayload,
+    ProviderLoadStats,
+    SearchAllResponse,
+    SearchResponse,
     SongInfo,
     SongLyricResponse,
     SongUrlResponse,
 )
+from backend.util import parse_url_expiry
 
 if TYPE_CHECKING:
     from backend.config_manager import ConfigManager
 
+R = TypeVar("R", bound=Mapping[str, object])
+
+# 歌单歌曲 ID 列表缓存：最多缓存的歌单数、过期时间（秒）
+PLAYLIST_IDS_CACHE_SIZE = 32
+PLAYLIST_IDS_CACHE_TTL = 600
+# 单次窗口请求的最大歌曲数
+PLAYLIST_WINDOW_MAX_LIMIT = 200
+
+# 播放链接缓存：最大条目数、到期前提前失效的余量（秒）、无法得知过期时间时的默认有效期（秒）
+URL_CACHE_SIZE = 300
+URL_EXPIRY_MARGIN = 60
+URL_DEFAULT_TTL = 600
+
+# 主 Provider 超过该时长（秒）仍未返回播放链接时，提前并发启动 fallback
+FALLBACK_HEDGE_DELAY = 2.0
+# 单个 provider 登录检查的等待上限（秒），超时的检查转入后台继续
+LOGIN_CHECK_DEADLINE = 3.0
+# 登录状态快照的有效期（秒），登录、退出、凭证刷新时会立即更新
+LOGIN_STATE_TTL = 300
+# 聚合搜索中单个 provider 的等待上限（秒），超时的 provider 不计入结果
+SEARCH_ALL_DEADLINE = 4.0
+
 
 class ProviderManager:
     """管理所有注册的 Provider，处理路由和 fallback"""
 
     def __init__(self) -> None:
         self._providers: dict[str, MusicProvider] = {}
+        # 已声明但尚未导入的 provider，首次使用时加载
+        self._specs: dict[str, ProviderSpec] = {}
+        self._load_stats: dict[str, ProviderLoadStats] = {}
+        self._background_started = False
         self._active_id: str | None = None
         self._fallback_ids: list[str] = []
+        # (provider_id, playlist_id, dirid) -> 有序歌曲 ID 列表
+        self._playlist_ids: LRUCache[tuple[str, int, int], list[str]] = LRUCache(
+            PLAYLIST_IDS_CACHE_SIZE, default_ttl=PLAYLIST_IDS_CACHE_TTL
+        )
+        # (provider_id, mid, quality, 是否经由 fallback) -> 播放链接响应
+        self._url_cache: LRUCache[tuple[str, str, str, bool], SongUrlResponse] = LRUCache(URL_CACHE_SIZE)
+        # 是否并发解析 fallback，以及主 Provider 的等待预算（秒）
+        self._hedge_fallback = True
+        self._hedge_delay = FALLBACK_HEDGE_DELAY
+        self._match_index: MatchIndex | None = None
+        # 进行中的登录检查，以及等待超时检查完成后补充选择的后台任务
+        self._login_checks: dict[str, asyncio.Task[LoginStatusResponse]] = {}
+        self._pending_selection: asyncio.Task[None] | None = None
+        # provider_id -> 登录状态快照，按 LOGIN_STATE_TTL 过期
+        self._login_states: LRUCache[str, LoginStatusResponse] = LRUCache(16, default_ttl=LOGIN_STATE_TTL)
+        # 每次收到明确的登录状态变化时递增，用于丢弃变化前发起的检查结果
+        self._login_generation: dict[str, int] = {}
+        # 各 provider 的健康度统计与熔断
+        self._health = HealthTracker()
+        self._health.set_prober(self._probe_provider)
 
     def register(self, provider: MusicProvider) -> None:
         self._providers[provider.id] = provider
+        provider.on_login_changed = self._on_login_changed
         decky.logger.info(f"注册 Provider: {provider.name} ({provider.id})")
 
+    def register_spec(self, spec: ProviderSpec) -> None:
+        """声明 provider，模块在首次使用时才导入和实例化"""
+        self._specs[spec.id] = spec
+
+    def _instantiate(self, spec: ProviderSpec, cls: type[MusicProvider], import_ms: float) -> MusicProvider:
+        start = time.perf_counter()
+        provider = cls()
+        try:
+            provider.load_credential()
+        except Exception as e:
+            decky.logger.warning(f"加载 {provider.id} 凭证失败: {e}")
+        init_ms = (time.perf_counter() - start) * 1000
+        self._load_stats[spec.id] = {"importMs": round(import_ms, 1), "initMs": round(init_ms, 1)}
+        self.register(provider)
+        if self._background_started:
+            self._start_provider_tasks(provider)
+        return provider
+
+    async def load_providers(self, provider_ids: list[str]) -> None:
+        """加载尚未实例化的 provider，模块在线程中导入以免阻塞事件循环
+
+        Args:
+            provider_ids: provider ID 列表，未声明的 ID 会被忽略
+        """
+        specs = [self._specs[pid] for pid in dict.fromkeys(provider_ids) if pid in self._specs]
+        specs = [spec for spec in specs if spec.id not in self._providers]
+        if not specs:
+            return
+        results = await asyncio.gather(
+            *(asyncio.to_thread(import_provider_class, spec) for spec in specs), return_exceptions=True
+        )
+        for spec, result in zip(specs, results):
+            if isinstance(result, BaseException):
+                decky.logger.error(f"导入 {spec.id} 失败: {result}")
+            elif spec.id not in self._providers:
+                self._instantiate(spec, *result)
+
+    def provider_ids(self) -> list[str]:
+        """所有已声明或已注册的 provider ID（不触发加载）"""
+        return list(dict.fromkeys([*self._specs, *self._providers]))
+
+    def get_load_stats(self) -> dict[str, ProviderLoadStats]:
+        """获取已加载 provider 的导入和初始化耗时"""
+        return dict(self._load_stats)
+
+    def _start_provider_tasks(self, provider: MusicProvider) -> None:
+        try:
+            provider.start_background_tasks()
+        except Exception as e:
+            decky.logger.warning(f"启动 {provider.id} 后台任务失败: {e}")
+
+    def start_background_tasks(self) -> None:
+        """启动已加载 provider 的后台维护任务，之后加载的 provider 在加载时启动"""
+        self._background_started = True
+        for provider in self._providers.values():
+            self._start_provider_tasks(provider)
+
+    async def shutdown(self) -> None:
+        """停止所有 provider 的后台任务"""
+        tasks = [t for t in (self._pending_selection, *self._login_checks.values()) if t and not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._health.shutdown()
+        for provider in self._providers.values():
+            try:
+                await provider.shutdown()
+            except Exception as e:
+                decky.logger.warning(f"停止 {provider.id} 后台任务失败: {e}")
+
+    def set_match_index(self, index: MatchIndex | None) -> None:
+        """设置跨 provider 歌曲匹配索引，None 表示不使用索引"""
+        self._match_index = index
+
+    def set_fallback_hedging(self, enabled: bool, delay: float | None = None) -> None:
+        """配置 fallback 的并发解析策略
+
+        Args:
+            enabled: 为 True 时同时向所有 fallback 发起匹配和解析，否则逐个尝试
+            delay: 主 Provider 的等待预算（秒），超时后不等其结果即启动 fallback
+        """
+        self._hedge_fallback = enabled
+        if delay is not None:
+            self._hedge_delay = max(0.0, delay)
+
     def set_fallback_order(self, provider_ids: list[str]) -> None:
+        """设置 fallback 顺序，只保留已加载的 provider（需先通过 load_providers 加载）"""
         self._fallback_ids = [pid for pid in provider_ids if pid in self._providers]
 
     @property
@@ -46,15 +194,21 @@ class ProviderManager:
         return self._active_id
 
     def switch(self, provider_id: str) -> None:
+        """切换主 Provider，provider 需先通过 load_providers 加载"""
         if provider_id not in self._providers:
+            if provider_id in self._specs:
+                raise ValueError(f"Provider not loaded: {provider_id}")
             raise ValueError(f"Unknown provider: {provider_id}")
         self._active_id = provider_id
         decky.logger.info(f"切换到 Provider: {provider_id}")
 
-    def get_provider(self, provider_id: str) -> MusicProvider | None:
+    async def get_provider(self, provider_id: str) -> MusicProvider | None:
+        """获取 provider，尚未加载时在线程中导入后实例化"""
+        await self.load_providers([provider_id])
         return self._providers.get(provider_id)
 
     def all_providers(self) -> list[MusicProvider]:
+        """已加载的 provider"""
         return list(self._providers.values())
 
     def get_capabilities(self) -> ProviderInfoPayload:
@@ -69,36 +223,211 @@ class ProviderManager:
         }
 
     def list_providers_info(self) -> list[ProviderFullInfo]:
-        return [
-            {
-                "id": p.id,
-                "name": p.name,
-                "capabilities": [c.value for c in p.capabilities],
-            }
-            for p in self._providers.values()
-        ]
+        """列出所有 provider，未加载的使用声明中的名称和能力"""
+        infos: list[ProviderFullInfo] = []
+        for pid in self.provider_ids():
+            provider = self._providers.get(pid)
+            spec = self._specs.get(pid)
+            if provider is not None:
+                name, capabilities = provider.name, provider.capabilities
+            elif spec is not None:
+                name, capabilities = spec.name, spec.capabilities
+            else:  # pragma: no cover - provider_ids 只包含两者之一
+                continue
+            infos.append({"id": pid, "name": name, "capabilities": [c.value for c in capabilities]})
+        return infos
+
+    async def get_playlist_songs_window(
+        self, playlist_id: int, offset: int = 0, limit: int = 50, dirid: int = 0, refresh: bool = False
+    ) -> PlaylistWindowResponse:
+        """分段获取歌单歌曲
 
-    async def _match_song_in_provider(self, provider: MusicProvider, song_name: str, singer: str) -> SongInfo | None:
-        """在指定 provider 中搜索匹配的歌曲"""
+        provider 支持服务端分页时直接按页获取；否则首次请求时缓存歌单的有序歌曲 ID 列表，
+        之后只补全请求窗口内元数据缓存未命中的歌曲。
+
+        Args:
+            playlist_id: 歌单 ID
+            offset: 窗口起始位置
+            limit: 窗口大小
+            dirid: 目录 ID（某些 provider 需要）
+            refresh: 是否忽略缓存重新获取 ID 列表
+
+        Returns:
+            窗口内的歌曲及歌单总数
+        """
+        provider = self.active
+        if not provider:
+            return {"success": False, "error": "No active provider", "songs": [], "playlist_id": playlist_id}
+
+        offset = max(0, offset)
+        limit = max(0, min(limit, PLAYLIST_WINDOW_MAX_LIMIT))
+        page = await provider.get_playlist_songs_page(playlist_id, offset, limit, dirid)
+        if page is not None:
+            for s in page.get("songs") or []:
+                song_metadata.put(s)
+            return page
+
+        key = (provider.id, playlist_id, dirid)
+        mids = None if refresh else self._playlist_ids.get(key)
+        if mids is None:
+            ids_result = await provider.get_playlist_track_ids(playlist_id, dirid)
+            if not ids_result.get("success"):
+                return {
+                    "success": False,
+                    "error": ids_result.get("error", "获取歌单歌曲失败"),
+                    "songs": [],
+                    "playlist_id": playlist_id,
+                }
+            for s in ids_result.get("songs") or []:
+                song_metadata.put(s)
+            mids = list(ids_result.get("mids") or [])
+            self._playlist_ids.set(key, mids)
+
+        window = mids[offset : offset + limit]
+
+        known, missing = song_metadata.get_many(provider.id, window)
+        if missing:
+            detail = await provider.get_songs_detail(missing)
+            if not detail.get("success"):
+                return {
+                    "success": False,
+                    "error": detail.get("error", "获取歌曲详情失败"),
+                    "songs": [],
+                    "playlist_id": playlist_id,
+                    "offset": offset,
+                    "total": len(mids),
+                }
+            for s in detail.get("songs") or []:
+                if s.get("mid"):
+                    known[str(s.get("mid"))] = s
+
+        return {
+            "success": True,
+            "songs": [known[mid] for mid in window if mid in known],
+            "playlist_id": playlist_id,
+            "offset": offset,
+            "total": len(mids),
+        }
+
+    async def _tracked(self, provider_id: str, endpoint: str, call: Awaitable[R], require: str | None = None) -> R:
+        """执行 provider 调用并记录耗时和结果到健康度统计
+
+        Args:
+            provider_id: provider ID
+            endpoint: 接口名
+            call: provider 调用
+            require: 成功时响应中必须非空的字段（如 url）
+
+        Returns:
+            调用结果
+        """
+        started = time.perf_counter()
+        try:
+            result = await call
+        except Exception as e:
+            self._health.record(provider_id, endpoint, False, time.perf_counter() - started, e)
+            raise
+        ok = bool(result.get("success")) and (require is None or bool(result.get(require)))
+        error = None if ok else result.get("error")
+        self._health.record(provider_id, endpoint, ok, time.perf_counter() - started, error)
+        return result
+
+    async def _probe_provider(self, provider_id: str) -> bool:
+        """熔断期间探测 provider 是否恢复（使用轻量接口）"""
+        provider = self._providers.get(provider_id)
+        if provider is None:
+            return False
+        if provider.has_capability(Capability.SEARCH_HOT):
+            result = await provider.get_hot_search()
+            return bool(result.get("success"))
+        status = await provider.get_login_status()
+        return "error" not in status
+
+    def get_health_stats(self) -> dict[str, ProviderHealthStats]:
+        """获取各 provider 的健康度统计"""
+        return self._health.stats()
+
+    @staticmethod
+    def _url_ttl(result: SongUrlResponse) -> float:
+        """计算播放链接可缓存的时长（秒），优先使用 provider 返回的过期时间"""
+        expires_at = result.get("expires_at") or parse_url_expiry(result.get("url", ""))
+        if not expires_at:
+            return URL_DEFAULT_TTL
+        return expires_at - time.time() - URL_EXPIRY_MARGIN
+
+    def _cache_url(self, key: tuple[str, str, str, bool], result: SongUrlResponse) -> None:
+        ttl = self._url_ttl(result)
+        if ttl > 0:
+            self._url_cache.set(key, cast(SongUrlResponse, dict(result)), ttl)
+
+    def _cached_url(self, key: tuple[str, str, str, bool]) -> SongUrlResponse | None:
+        cached = self._url_cache.get(key)
+        return cast(SongUrlResponse, dict(cached)) if cached is not None else None
+
+    def invalidate_song_urls(self, provider_id: str | None = None) -> None:
+        """清除播放链接缓存（登录状态变化后音质权限可能不同）
+
+        Args:
+            provider_id: 只清除该 provider 相关的链接，None 表示全部清除
+        """
+        if provider_id is None:
+            self._url_cache.clear()
+            return
+        # LRUCache 不可迭代，keys() 返回键的副本
+        for key in [k for k in self._url_cache.keys() if k[0] == provider_id]:  # noqa: SIM118
+            self._url_cache.pop(key)
+
+    async def resolve_song_url(
+        self,
+        provider: MusicProvider,
+        mid: str,
+        preferred_quality: PreferredQuality | None = None,
+        refresh: bool = False,
+    ) -> SongUrlResponse:
+        """获取播放链接，在链接过期前直接返回缓存
+
+        Args:
+            provider: 音乐提供者
+            mid: 歌曲 ID
+            preferred_quality: 偏好音质
+            refresh: 是否忽略缓存重新获取
+
+        Returns:
+            播放链接
+        """
+        key = (provider.id, mid, preferred_quality or "auto", False)
+        if not refresh:
+            cached = self._cached_url(key)
+            if cached is not None:
+                return cached
+
+        result = await self._tracked(provider.id, "song_url", provider.get_song_url(mid, preferred_quality), "url")
+        if result.get("success") and result.get("url"):
+            self._cache_url(key, result)
+        return result
+
+    async def _match_song_in_provider(
+        self, provider: MusicProvider, song_name: str, singer: str, duration: float | None = None
+    ) -> SongInfo | None:
+        """在指定 provider 中搜索，按歌名、歌手和时长打分选出最佳匹配"""
         if not provider.has_capability(Capability.SEARCH_SONG):
             return None
 
-        query = f"{song_name} {singer}"
-        result = await provider.search_songs(query, page=1, num=10)
+        result = await self._tracked(
+            provider.id, "search", provider.search_songs(search_query(song_name, singer), page=1, num=10)
+        )
 
         songs = result.get("songs") or []
         if not result.get("success") or not songs:
             return None
 
-        for s in songs:
-            if s.get("name") == song_name and singer in s.get("singer", ""):
-                return s
-
-        for s in songs:
-            if s.get("name") == song_name:
-                return s
-
-        return None
+        best = pick_best_match(make_match_key(song_name, singer, duration), songs)
+        if best is None:
+            decky.logger.debug(f"{provider.id} 中未找到匹配的歌曲: {song_name} - {singer}")
+            return None
+        matched, score = best
+        decky.logger.debug(f"{provider.id} 匹配到 {matched.get('name')} - {matched.get('singer')}（得分 {score:.2f}）")
+        return matched
 
     async def get_song_url_with_fallback(
         self,
@@ -106,41 +435,105 @@ class ProviderManager:
         song_name: str,
         singer: str,
         preferred_quality: PreferredQuality | None = None,
+        refresh: bool = False,
+        duration: float | None = None,
     ) -> SongUrlResponse:
-        """获取播放链接，失败时尝试 fallback providers"""
+        """获取播放链接，失败时尝试 fallback providers
+
+        匹配索引中记录过的歌曲直接使用已知的歌曲 ID，并优先尝试最近成功提供链接的 provider。
+        """
         if not self.active:
             return {"success": False, "error": "No active provider", "url": "", "mid": mid}
 
-        result = await self.active.get_song_url(mid, preferred_quality)
-        if result.get("success") and result.get("url"):
-            result["provider"] = self.active.id
+        # 经由 fallback 获取的链接以原始歌曲为键缓存，重播时无需再次搜索匹配
+        fallback_key = (self.active.id, mid, preferred_quality or "auto", True)
+        if not refresh:
+            cached = self._cached_url(fallback_key)
+            if cached is not None:
+                return cached
+
+        active_id = self.active.id
+        match_key = MatchIndex.make_key(song_name, singer, duration)
+        indexed_mids: dict[str, str] = {}
+        last_provider = ""
+        if self._match_index is not None:
+            found = self._match_index.lookup(song_name, singer, duration)
+            if found is not None:
+                match_key, entry = found
+                indexed_mids = dict(entry["mids"])
+                last_provider = entry["last_provider"]
+
+        # 跳过熔断中的 fallback，降级的排在健康的之后；最近成功提供链接的排在最前
+        fallbacks = [
+            (fb_id, fb_provider)
+            for fb_id in self._health.order([pid for pid in self._fallback_ids if pid != active_id])
+            if (fb_provider := self._providers.get(fb_id))
+        ]
+        fallbacks.sort(key=lambda item: item[0] != last_provider)
+        # 主 provider 熔断中时不再请求它，只启动 fallback；
+        # 这首歌上次由 fallback 提供时仍请求主 provider，但不等待它，同时启动 fallback
+        active_available = self._health.is_available(active_id)
+        known_fallback = any(fb_id == last_provider for fb_id, _ in fallbacks)
+
+        if self._hedge_fallback and fallbacks:
+            result = await self._resolve_hedged(
+                mid,
+                song_name,
+                singer,
+                preferred_quality,
+                refresh,
+                fallbacks,
+                match_key,
+                indexed_mids,
+                duration,
+                hedge_delay=0.0 if known_fallback else self._hedge_delay,
+                start_primary=active_available,
+            )
+        else:
+            if active_available or not fallbacks:
+                result = await self.resolve_song_url(self.active, mid, preferred_quality, refresh)
+            else:
+                result = self._fallback_failure(mid, f"{active_id} 暂时不可用")
+            if result.get("success") and result.get("url"):
+                result["provider"] = active_id
+            else:
+                original_error = result.get("error", "Unknown error")
+                result = self._fallback_failure(mid, original_error)
+                for fb_id, fb_provider in fallbacks:
+                    fb_result = await self._resolve_in_fallback(
+                        fb_provider,
+                        song_name,
+                        singer,
+                        preferred_quality,
+                        refresh,
+                        match_key,
+                        indexed_mids.get(fb_id),
+                        duration,
+                    )
+                    if fb_result is not None:
+                        decky.logger.info(f"Fallback 成功: {song_name} 从 {fb_id} 获取")
+                        result = fb_result
+                        break
+
+        if not (result.get("success") and result.get("url")):
             return result
 
-        original_error = result.get("error", "Unknown error")
-
-        for fb_id in self._fallback_ids:
-            if fb_id == self._active_id:
-                continue
-            fb_provider = self._providers.get(fb_id)
-            if not fb_provider:
-                continue
-
-            matched = await self._match_song_in_provider(fb_provider, song_name, singer)
-            if not matched:
-                continue
-
-            fb_result = await fb_provider.get_song_url(matched.get("mid", ""), preferred_quality)
-            if fb_result.get("success") and fb_result.get("url"):
-                fb_result["fallback_provider"] = fb_id
-                if self._active_id:
-                    fb_result["original_provider"] = self._active_id
-                fb_result["matched_song"] = matched
-                decky.logger.info(f"Fallback 成功: {song_name} 从 {fb_id} 获取")
-                return fb_result
+        fb_id = result.get("fallback_provider")
+        if fb_id:
+            self._cache_url(fallback_key, result)
+            if self._match_index is not None:
+                matched_mid = str(result.get("matched_song", {}).get("mid", ""))
+                self._match_index.record(match_key, active_id, mid, duration, served=False)
+                self._match_index.record(match_key, fb_id, matched_mid, duration)
+        elif self._match_index is not None and last_provider and last_provider != active_id:
+            # 主 provider 恢复可用，之后不再优先走 fallback
+            self._match_index.record(match_key, active_id, mid, duration)
+        return result
 
+    def _fallback_failure(self, mid: str, error: str) -> SongUrlResponse:
         result: SongUrlResponse = {
             "success": False,
-            "error": original_error,
+            "error": error,
             "url": "",
             "mid": mid,
         }
@@ -148,6 +541,142 @@ class ProviderManager:
             result["provider"] = self._active_id
         return result
 
+    async def _resolve_in_fallback(
+        self,
+        provider: MusicProvider,
+        song_name: str,
+        singer: str,
+        preferred_quality: PreferredQuality | None,
+        refresh: bool,
+        match_key: str,
+        indexed_mid: str | None = None,
+        duration: float | None = None,
+    ) -> SongUrlResponse | None:
+        """在 fallback provider 中匹配歌曲并获取播放链接，失败返回 None
+
+        匹配索引中已有该 provider 的歌曲 ID 时跳过搜索。
+        """
+        if indexed_mid:
+            fb_result = await self.resolve_song_url(provider, indexed_mid, preferred_quality, refresh)
+            if fb_result.get("success") and fb_result.get("url"):
+                matched = song_metadata.get(provider.id, indexed_mid) or cast(
+                    SongInfo, {"mid": indexed_mid, "name": song_name, "singer": singer, "provider": provider.id}
+                )
+                return self._mark_fallback(fb_result, provider, matched)
+            # 索引中的 ID 已无法播放，移除后重新搜索
+            if self._match_index is not None:
+                self._match_index.forget(match_key, provider.id)
+
+        matched = await self._match_song_in_provider(provider, song_name, singer, duration)
+        if not matched:
+            return None
+
+        fb_result = await self.resolve_song_url(provider, matched.get("mid", ""), preferred_quality, refresh)
+        if not (fb_result.get("success") and fb_result.get("url")):
+            return None
+        return self._mark_fallback(fb_result, provider, matched)
+
+    def _mark_fallback(self, fb_result: SongUrlResponse, provider: MusicProvider, matched: SongInfo) -> SongUrlResponse:
+        fb_result["fallback_provider"] = provider.id
+        if self._active_id:
+            fb_result["original_provider"] = self._active_id
+        fb_result["matched_song"] = matched
+        return fb_result
+
+    async def _resolve_hedged(
+        self,
+        mid: str,
+        song_name: str,
+        singer: str,
+        preferred_quality: PreferredQuality | None,
+        refresh: bool,
+        fallbacks: list[tuple[str, MusicProvider]],
+        match_key: str,
+        indexed_mids: dict[str, str],
+        duration: float | None = None,
+        hedge_delay: float = FALLBACK_HEDGE_DELAY,
+        start_primary: bool = True,
+    ) -> SongUrlResponse:
+        """并发解析主 Provider 和 fallback，按优先级取成功的结果
+
+        主 Provider 在等待预算内失败或超时后，同时启动所有 fallback，
+        采用结果后取消其余任务。start_primary 为 False（主 Provider 熔断中）时只启动 fallback。
+        """
+        assert self.active is not None
+        active_id = self.active.id
+        original_error = f"{active_id} 暂时不可用"
+        primary: asyncio.Task[SongUrlResponse] | None = None
+        tasks: list[asyncio.Task[SongUrlResponse | None]] = []
+        if start_primary:
+            primary = asyncio.create_task(self.resolve_song_url(self.active, mid, preferred_quality, refresh))
+            tasks.append(primary)
+
+        try:
+            if primary is not None:
+                original_error = "Unknown error"
+                done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+                if primary in done and not primary.cancelled() and primary.exception() is None:
+                    result = primary.result()
+                    if result.get("success") and result.get("url"):
+                        result["provider"] = active_id
+                        return result
+                elif primary not in done:
+                    decky.logger.debug(f"{active_id} 超过 {hedge_delay}s 未返回，提前启动 fallback")
+
+            fallback_start = len(tasks)
+            tasks.extend(
+                asyncio.create_task(
+                    self._resolve_in_fallback(
+                        fb_provider,
+                        song_name,
+                        singer,
+                        preferred_quality,
+                        refresh,
+                        match_key,
+                        indexed_mids.get(fb_id),
+                        duration,
+                    )
+                )
+                for fb_id, fb_provider in fallbacks
+            )
+
+            # 主 Provider 已超出预算，不再阻塞 fallback：任意时刻主 Provider 成功即采用，
+            # 否则采用配置顺序中第一个成功、且其前面的 fallback 均已失败的结果
+            outcomes: dict[int, SongUrlResponse | None] = {}
+            pending: set[asyncio.Task[SongUrlResponse | None]] = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = tasks.index(task)
+                    try:
+                        candidate = task.result()
+                    except Exception as e:
+                        decky.logger.warning(f"解析播放链接失败: {e}")
+                        if task is primary:
+                            original_error = str(e)
+                        candidate = None
+                    if task is primary and candidate is not None:
+                        if candidate.get("success") and candidate.get("url"):
+                            candidate["provider"] = active_id
+                            return candidate
+                        original_error = candidate.get("error", original_error)
+                        candidate = None
+                    outcomes[index] = candidate
+
+                for index in range(fallback_start, len(tasks)):
+                    if index not in outcomes:
+                        break
+                    winner = outcomes[index]
+                    if winner is not None:
+                        decky.logger.info(f"Fallback 成功: {song_name} 从 {winner.get('fallback_provider')} 获取")
+                        return winner
+
+            return self._fallback_failure(mid, original_error)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
     async def get_song_lyric_with_fallback(
         self, mid: str, song_name: str, singer: str, qrc: bool = True
     ) -> SongLyricResponse:
@@ -155,11 +684,11 @@ class ProviderManager:
         if not self.active:
             return {"success": False, "error": "No active provider", "lyric": "", "trans": ""}
 
-        result = await self.active.get_song_lyric(mid, qrc)
+        result = await self._tracked(self.active.id, "lyric", self.active.get_song_lyric(mid, qrc), "lyric")
         if result.get("success") and result.get("lyric"):
             return result
 
-        for fb_id in self._fallback_ids:
+        for fb_id in self._health.order(self._fallback_ids):
             if fb_id == self._active_id:
                 continue
             fb_provider = self._providers.get(fb_id)
@@ -170,7 +699,9 @@ class ProviderManager:
             if not matched:
                 continue
 
-            fb_result = await fb_provider.get_song_lyric(matched.get("mid", ""), qrc)
+            fb_result = await self._tracked(
+                fb_id, "lyric", fb_provider.get_song_lyric(matched.get("mid", ""), qrc), "lyric"
+            )
             if fb_result.get("success") and fb_result.get("lyric"):
                 fb_result["fallback_provider"] = fb_id
                 if self._active_id:
@@ -179,53 +710,255 @@ class ProviderManager:
 
         return result
 
-    async def ensure_provider_logged_in(self, provider: MusicProvider) -> bool:
-        """检查 provider 登录状态，未登录则返回 False
+    async def search_all(
+        self, keyword: str, page: int = 1, num: int = 20, deadline: float = SEARCH_ALL_DEADLINE
+    ) -> SearchAllResponse:
+        """同时在所有已加载、已登录且支持搜索的 provider 中搜索，合并去重后返回
+
+        只使用已加载的 provider，不为搜索导入 SDK。有登录状态快照的 provider 直接开始搜索，
+        没有快照的先检查登录再搜索；登录检查和搜索共用同一个 deadline，
+        超时的 provider 被取消，只返回已完成的部分结果。
 
         Args:
-            provider: 音乐提供者实例
+            keyword: 搜索关键词
+            page: 页码
+            num: 每个 provider 的结果数
+            deadline: 单个 provider 登录检查加搜索的等待上限（秒）
 
         Returns:
-            已登录返回 True，否则返回 False
+            合并后的搜索结果，按各 provider 的排名交错排列，重复歌曲保留优先级较高的 provider 的版本
         """
+        # 当前 provider 优先，其次为 fallback 顺序，最后为其余已加载的 provider
+        order = list(dict.fromkeys([*([self._active_id] if self._active_id else []), *self._fallback_ids]))
+        order += [pid for pid in self._providers if pid not in order]
+        providers = [
+            provider
+            for pid in order
+            if (provider := self._providers.get(pid)) is not None
+            and provider.has_capability(Capability.SEARCH_SONG)
+            and self._health.is_available(pid)
+            and ((snapshot := self._login_states.get(pid)) is None or snapshot.get("logged_in"))
+        ]
+        if not providers:
+            return {
+                "success": False,
+                "error": "No logged-in provider supports search",
+                "songs": [],
+                "keyword": keyword,
+                "page": page,
+                "providers": [],
+                "timedOut": [],
+                "failed": [],
+            }
+
+        searching: set[str] = set()
+
+        async def search(provider: MusicProvider) -> SearchResponse | None:
+            # shield 使超时取消只作用于本次搜索，共享的登录检查继续在后台完成
+            status = await asyncio.shield(self.get_login_status(provider))
+            if not status.get("logged_in"):
+                return None
+            searching.add(provider.id)
+            return await self._tracked(provider.id, "search", provider.search_songs(keyword, page, num))
+
+        tasks: dict[str, asyncio.Task[SearchResponse | None]] = {p.id: asyncio.create_task(search(p)) for p in providers}
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+        answered: list[str] = []
+        timed_out: list[str] = []
+        failed: list[str] = []
+        ranked: list[list[SongInfo]] = []
+        for pid, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                if pid in searching:
+                    self._health.record(pid, "search", False, deadline, TimeoutError())
+                timed_out.append(pid)
+                continue
+            if task.cancelled() or task.exception() is not None:
+                failed.append(pid)
+                continue
+            result = task.result()
+            if result is None:
+                continue
+            if not result.get("success"):
+                failed.append(pid)
+                continue
+            answered.append(pid)
+            songs = result.get("songs") or []
+            ranked.append([cast(SongInfo, {**song, "provider": song.get("provider") or pid}) for song in songs])
+        if timed_out:
+            decky.logger.info(f"聚合搜索 {keyword!r}: {', '.join(timed_out)} 超过 {deadline}s 未返回")
+
+        # 按排名交错合并，使各 provider 的靠前结果都排在前面
+        interleaved = [songs[i] for i in range(max(map(len, ranked), default=0)) for songs in ranked if i < len(songs)]
+        response: SearchAllResponse = {
+            "success": bool(answered),
+            "songs": dedupe_songs(interleaved),
+            "keyword": keyword,
+            "page": page,
+            "providers": answered,
+            "timedOut": timed_out,
+            "failed": failed,
+        }
+        if not answered:
+            response["error"] = "All providers failed or timed out"
+        return response
+
+    def _on_login_changed(self, provider_id: str, status: LoginStatusResponse | None) -> None:
+        """provider 登录状态变化回调：更新或作废登录状态快照"""
+        # 两种情况都递增代数，使变化前发起的检查结果不会覆盖新状态
+        self._login_generation[provider_id] = self._login_generation.get(provider_id, 0) + 1
+        if status is None:
+            self._login_states.pop(provider_id)
+            return
+        self._login_states.set(provider_id, status)
+
+    async def _check_login(self, provider: MusicProvider) -> LoginStatusResponse:
+        generation = self._login_generation.get(provider.id, 0)
         try:
             status = await provider.get_login_status()
-            return bool(status.get("logged_in"))
         except Exception as e:  # pragma: no cover - 依赖外部接口
             decky.logger.error(f"检查 {provider.id} 登录状态失败: {e}")
+            return {"logged_in": False, "error": str(e)}
+
+        # 检查期间收到了明确的登录/退出事件时，以事件为准；检查失败的结果不缓存
+        if self._login_generation.get(provider.id, 0) == generation and "error" not in status:
+            snapshot = cast(LoginStatusResponse, {k: v for k, v in status.items() if k != "refreshed"})
+            self._login_states.set(provider.id, snapshot)
+        return status
+
+    def _login_check_task(self, provider: MusicProvider) -> asyncio.Task[LoginStatusResponse]:
+        """获取 provider 的登录检查任务，已有进行中的检查时复用"""
+        task = self._login_checks.get(provider.id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._check_login(provider))
+            self._login_checks[provider.id] = task
+        return task
+
+    async def get_login_status(self, provider: MusicProvider, refresh: bool = False) -> LoginStatusResponse:
+        """获取登录状态，快照有效时直接返回，不访问网络
+
+        Args:
+            provider: 音乐提供者实例
+            refresh: 是否忽略快照重新检查
+
+        Returns:
+            登录状态
+        """
+        if not refresh:
+            snapshot = self._login_states.get(provider.id)
+            if snapshot is not None:
+                return cast(LoginStatusResponse, dict(snapshot))
+        return await self._login_check_task(provider)
+
+    async def ensure_provider_logged_in(self, provider: MusicProvider) -> bool:
+        """检查 provider 登录状态，未登录则返回 False
+
+        Args:
+            provider: 音乐提供者实例
+
+        Returns:
+            已登录返回 True，否则返回 False
+        """
+        status = await self.get_login_status(provider)
+        return bool(status.get("logged_in"))
+
+    async def check_logins(
+        self, provider_ids: list[str], deadline: float = LOGIN_CHECK_DEADLINE
+    ) -> dict[str, bool | None]:
+        """并发检查多个 provider 的登录状态
+
+        Args:
+            provider_ids: 要检查的 provider ID 列表
+            deadline: 每个 provider 的等待上限（秒），检查同时开始，因此也是总等待上限
+
+        Returns:
+            provider_id -> 是否已登录，未在期限内完成的为 None（检查仍在后台继续）
+        """
+        states: dict[str, bool | None] = {}
+        tasks: dict[str, asyncio.Task[LoginStatusResponse]] = {}
+        await self.load_providers(provider_ids)
+        for pid in dict.fromkeys(provider_ids):
+            provider = self._providers.get(pid)
+            if provider is None:
+                continue
+            snapshot = self._login_states.get(pid)
+            if snapshot is not None:
+                states[pid] = bool(snapshot.get("logged_in"))
+            else:
+                tasks[pid] = self._login_check_task(provider)
+        if not tasks:
+            return states
+
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+        for pid, task in tasks.items():
+            if not task.done():
+                decky.logger.info(f"{pid} 登录检查超过 {deadline}s 未完成，转入后台")
+                states[pid] = None
+            else:
+                states[pid] = self._task_logged_in(task)
+        return states
+
+    @staticmethod
+    def _task_logged_in(task: asyncio.Task[LoginStatusResponse]) -> bool:
+        if task.cancelled() or task.exception() is not None:
             return False
+        return bool(task.result().get("logged_in"))
+
+    def _apply_login_states(self, config: "ConfigManager", states: dict[str, bool | None]) -> None:
+        """根据登录状态选择主 Provider 和 fallback Provider"""
+        main_id = config.get_main_provider_id()
+
+        if self._active_id is None:
+            if main_id:
+                if states.get(main_id):
+                    self.switch(main_id)
+            else:
+                # 如果没有配置主 Provider，选择第一个已登录的 Provider 作为默认值
+                for pid in self.provider_ids():
+                    if states.get(pid):
+                        self.switch(pid)
+                        decky.logger.info(f"未配置主 Provider，自动选择已登录的 Provider: {pid}")
+                        break
+
+        # 处理 fallback Provider 列表，必须已登录且不同于主 Provider
+        self.set_fallback_order(
+            [fb_id for fb_id in config.get_fallback_provider_ids() if fb_id != self._active_id and states.get(fb_id)]
+        )
 
     async def apply_provider_config(self, config: "ConfigManager") -> None:
         """根据配置选择主 Provider 和 fallback Provider（仅使用已登录的 Provider）
 
+        所有相关 provider 的登录检查并发进行；超过期限仍未完成的 provider 在后台检查完成后再补充选择。
+
         Args:
             config: 配置管理器
         """
         main_id = config.get_main_provider_id()
-        fallback_ids_config = config.get_fallback_provider_ids()
-
-        # 处理主 Provider
-        if main_id:
-            provider = self.get_provider(main_id)
-            if provider and await self.ensure_provider_logged_in(provider):
-                self.switch(main_id)
-        else:
-            # 如果没有配置主 Provider，选择第一个已登录的 Provider 作为默认值
-            for provider in self.all_providers():
-                if await self.ensure_provider_logged_in(provider):
-                    self.switch(provider.id)
-                    decky.logger.info(f"未配置主 Provider，自动选择已登录的 Provider: {provider.name}")
-                    break
-
-        # 处理 fallback Provider 列表，必须已登录且不同于主 Provider
-        fallback_ids: list[str] = []
-        for fb_id in fallback_ids_config:
-            if fb_id == self._active_id:
-                continue
-            fb_provider = self.get_provider(fb_id)
-            if fb_provider and await self.ensure_provider_logged_in(fb_provider):
-                fallback_ids.append(fb_id)
-        self.set_fallback_order(fallback_ids)
+        # 只加载主 Provider 和 fallback Provider；未配置主 Provider 时需检查全部
+        candidates = [main_id] if main_id else self.provider_ids()
+        candidates += config.get_fallback_provider_ids()
+
+        states = await self.check_logins(candidates)
+        self._apply_login_states(config, states)
+
+        pending = [pid for pid, state in states.items() if state is None]
+        if pending:
+            if self._pending_selection is not None and not self._pending_selection.done():
+                self._pending_selection.cancel()
+            self._pending_selection = asyncio.create_task(self._resolve_pending_logins(config, states))
+
+    async def _resolve_pending_logins(self, config: "ConfigManager", states: dict[str, bool | None]) -> None:
+        """等待超时的登录检查完成后，补充选择主 Provider 和 fallback Provider"""
+        pending = {pid: self._login_checks[pid] for pid, state in states.items() if state is None}
+        await asyncio.wait(pending.values())
+        resolved = dict(states)
+        for pid, task in pending.items():
+            resolved[pid] = self._task_logged_in(task)
+        self._apply_login_states(config, resolved)
+        decky.logger.info(f"后台登录检查完成: {', '.join(f'{pid}={resolved[pid]}' for pid in pending)}")
 
     async def get_provider_selection(self, config: "ConfigManager") -> dict[str, object]:
         """获取当前配置的主 Provider 和 fallback Provider（仅返回已登录的）
@@ -234,26 +967,29 @@ class ProviderManager:
             config: 配置管理器
 
         Returns:
-            包含 mainProvider 和 fallbackProviders 的字典
+            包含 mainProvider、fallbackProviders 以及登录检查尚未完成的 pendingProviders 的字典
         """
         try:
-            main_id: str | None = None
-            if self.active and await self.ensure_provider_logged_in(self.active):
-                main_id = self.active.id
-
-            fallback_ids: list[str] = []
-            for fb_id in config.get_fallback_provider_ids():
-                if fb_id == main_id:
-                    continue
-                fb_provider = self.get_provider(fb_id)
-                if fb_provider and await self.ensure_provider_logged_in(fb_provider):
-                    fallback_ids.append(fb_id)
+            candidates = ([self.active.id] if self.active else []) + config.get_fallback_provider_ids()
+            states = await self.check_logins(candidates)
+
+            main_id = self.active.id if self.active and states.get(self.active.id) else None
+            fallback_ids = [
+                fb_id for fb_id in config.get_fallback_provider_ids() if fb_id != main_id and states.get(fb_id)
+            ]
 
             return {
                 "success": True,
                 "mainProvider": main_id,
                 "fallbackProviders": fallback_ids,
+                "pendingProviders": [pid for pid, state in states.items() if state is None],
             }
         except Exception as e:  # pragma: no cover - 依赖外部接口
             decky.logger.error(f"获取 Provider 配置失败: {e}")
-            return {"success": False, "error": str(e), "mainProvider": None, "fallbackProviders": []}
+            return {
+                "success": False,
+                "error": str(e),
+                "mainProvider": None,
+                "fallbackProviders": [],
+                "pendingProviders": [],
+            }
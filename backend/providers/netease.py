@@ -4,6 +4,7 @@
 使用 pyncm 库进行 API 调用。
 """
 
+import asyncio
 import time
 from collections.abc import Mapping
 from contextlib import suppress
@@ -19,17 +20,21 @@ from pyncm import (
 from pyncm.apis import cloudsearch, login, playlist, track, user, WeapiCryptoRequest
 
 import decky
+from backend.cache import song_metadata
 from backend.config_manager import ConfigManager
+from backend.executor import run_blocking
 from backend.providers.base import Capability, MusicProvider
 from backend.types import (
     DailyRecommendResponse,
     FavSongsResponse,
     HotKey,
     HotSearchResponse,
+    LikedStatusResponse,
     LoginStatusResponse,
     OperationResult,
     PlaylistInfo,
     PlaylistSongsResponse,
+    PlaylistTrackIdsResponse,
     PreferredQuality,
     QrCodeResponse,
     QrStatus,
@@ -40,6 +45,7 @@ from backend.types import (
     SearchSuggestResponse,
     SongInfo,
     SongLyricResponse,
+    SongsDetailResponse,
     SongUrlBatchResponse,
     SongUrlResponse,
     SuggestionItem,
@@ -47,6 +53,26 @@ from backend.types import (
 )
 
 
+# 偏好音质到网易云音质等级的映射（FLAC 格式需要使用 lossless/hires 音质等级）
+QUALITY_LEVEL_MAP: dict[str, str] = {
+    "high": "lossless",  # 高音质使用无损
+    "balanced": "lossless",  # 平衡音质使用无损
+    "compat": "higher",  # 兼容模式使用较高音质
+    "auto": "lossless",  # 自动使用无损
+}
+
+# GetTrackAudioV1 单次请求的歌曲数量
+AUDIO_BATCH_SIZE = 200
+
+# GetTrackDetail 分批大小（API 单次限制 1000 首）、并发批次数和单批次最大尝试次数
+DETAIL_BATCH_SIZE = 500
+DETAIL_CONCURRENCY = 3
+DETAIL_MAX_ATTEMPTS = 3
+
+# 喜欢歌曲 ID 列表的缓存时间（秒）
+LIKED_IDS_TTL = 300
+
+
 def _weapi_request(path: str, payload: dict[str, object] | None = None) -> dict[str, object]:
     """调用网易云 Weapi 接口，自动携带当前 Session"""
     session = GetCurrentSession()
@@ -97,7 +123,7 @@ def _format_netease_song(item: Mapping[str, object]) -> SongInfo:
     # 确保 duration_ms 是整数类型
     duration_ms = int(duration_raw) if isinstance(duration_raw, (int, float)) else 0
 
-    return cast(SongInfo, {
+    return song_metadata.put(cast(SongInfo, {
         "id": song_id,
         "mid": str(song_id),
         "name": item.get("name", ""),
@@ -107,7 +133,7 @@ def _format_netease_song(item: Mapping[str, object]) -> SongInfo:
         "duration": duration_ms // 1000 if duration_ms > 1000 else duration_ms,
         "cover": cover,
         "provider": "netease",
-    })
+    }))
 
 
 def _format_netease_playlist(item: Mapping[str, object]) -> PlaylistInfo:
@@ -131,6 +157,14 @@ class NeteaseProvider(MusicProvider):
     def __init__(self) -> None:
         self._qr_unikey: str | None = None
         self._config = ConfigManager()
+        # 喜欢歌曲 ID 缓存：有序列表用于分页，集合用于快速判断是否喜欢
+        self._liked_ids: list[int] = []
+        self._liked_set: set[str] = set()
+        self._liked_uid: int | None = None
+        self._liked_loaded_at: float | None = None
+        self._liked_lock = asyncio.Lock()
+        # 是否已尝试从配置恢复过 session
+        self._session_restored = False
 
     @property
     def id(self) -> str:
@@ -173,22 +207,56 @@ class NeteaseProvider(MusicProvider):
             return False
 
     def load_credential(self) -> bool:
+        self._session_restored = True
         try:
             session_str = self._config.get_netease_session()
             if not session_str:
                 return False
             session = LoadSessionFromString(session_str)
             SetCurrentSession(session)
+            self._notify_login_changed()
             decky.logger.info("网易云凭证加载成功")
             return True
         except Exception as e:
             decky.logger.error(f"加载网易云凭证失败: {e}")
             return False
 
+    def invalidate_liked_cache(self) -> None:
+        """清除喜欢歌曲 ID 缓存，下次访问时重新获取"""
+        self._liked_ids = []
+        self._liked_set = set()
+        self._liked_uid = None
+        self._liked_loaded_at = None
+
+    async def _get_liked_ids(self) -> list[int]:
+        """获取当前用户喜欢的歌曲 ID 列表，在有效期内直接返回缓存"""
+        async with self._liked_lock:
+            session = GetCurrentSession()
+            loaded_at = self._liked_loaded_at
+            if (
+                loaded_at is not None
+                and self._liked_uid == session.uid
+                and time.monotonic() - loaded_at < LIKED_IDS_TTL
+            ):
+                return self._liked_ids
+
+            # /likelist 返回喜欢歌曲的 ID 列表
+            like_ids_resp = await run_blocking(_weapi_request, "/weapi/song/like/get", {"uid": session.uid})
+            if like_ids_resp.get("code") != 200:
+                raise RuntimeError(str(like_ids_resp.get("msg") or "获取喜欢歌曲列表失败"))
+            ids_raw = like_ids_resp.get("ids", [])
+            ids = [int(i) for i in ids_raw if isinstance(i, (int, float))] if isinstance(ids_raw, list) else []
+
+            self._liked_ids = ids
+            self._liked_set = {str(i) for i in ids}
+            self._liked_uid = session.uid
+            self._liked_loaded_at = time.monotonic()
+            return ids
+
     async def get_qr_code(self, login_type: str = "qq") -> QrCodeResponse:
         del login_type
         try:
-            result_raw = login.LoginQrcodeUnikey()
+            result_raw = await run_blocking(login.LoginQrcodeUnikey)
             # WeapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
             result = cast(dict[str, object], result_raw)
             if result.get("code") != 200:
@@ -237,7 +305,7 @@ class NeteaseProvider(MusicProvider):
             return {"success": False, "error": "没有可用的二维码"}
 
         try:
-            result_raw = login.LoginQrcodeCheck(self._qr_unikey)
+            result_raw = await run_blocking(login.LoginQrcodeCheck, self._qr_unikey)
             # WeapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
             result = cast(dict[str, object], result_raw)
             code_raw = result.get("code", 0)
@@ -255,20 +323,22 @@ class NeteaseProvider(MusicProvider):
             response: QrStatusResponse = {"success": True, "status": status}
 
             if code == 803:
-                login_status_raw = login.GetCurrentLoginStatus()
+                login_status_raw = await run_blocking(login.GetCurrentLoginStatus)
                 # GetCurrentLoginStatus 返回 dict，但类型检查器认为是 tuple
                 login_status = cast(dict[str, object], login_status_raw)
                 login.WriteLoginInfo(login_status)
                 session = GetCurrentSession()
                 try:
                     # 登录成功后立即刷新 cookie，避免部分接口未携带
-                    _weapi_request("/weapi/login/token/refresh", {})
+                    await run_blocking(_weapi_request, "/weapi/login/token/refresh", {})
                 except Exception as e:
                     decky.logger.debug(f"网易云登录后刷新 token 失败: {e}")
                 self.save_credential()
+                self.invalidate_liked_cache()
                 self._qr_unikey = None
                 response["logged_in"] = True
                 response["musicid"] = session.uid
+                self._notify_login_changed({"logged_in": True, "musicid": session.uid})
                 decky.logger.info(f"网易云登录成功，uid: {session.uid}")
 
             return response
@@ -279,10 +349,12 @@ class NeteaseProvider(MusicProvider):
 
     async def get_login_status(self) -> LoginStatusResponse:
         try:
-            # 先尝试加载保存的凭证（系统重启后需要恢复 session）
-            self.load_credential()
-            
             session = GetCurrentSession()
+            if not session.logged_in and not self._session_restored:
+                # 尚未恢复过 session 时从配置加载（系统重启后需要恢复 session）
+                self.load_credential()
+                session = GetCurrentSession()
+
             if session.logged_in:
                 return {
                     "logged_in": True,
@@ -303,6 +375,8 @@ class NeteaseProvider(MusicProvider):
             SetNewSession()
 
             self._config.delete_netease_session()
+            self.invalidate_liked_cache()
+            self._notify_login_changed({"logged_in": False})
 
             self._qr_unikey = None
             decky.logger.info("网易云已退出登录")
@@ -314,11 +388,12 @@ class NeteaseProvider(MusicProvider):
     async def search_songs(self, keyword: str, page: int = 1, num: int = 20) -> SearchResponse:
         try:
             offset = (page - 1) * num
-            result_raw = cloudsearch.GetSearchResult(
+            result_raw = await run_blocking(
+                cloudsearch.GetSearchResult,
                 keyword,
                 stype=cloudsearch.SONG,
                 limit=num,
-                offset=offset
+                offset=offset,
             )
             # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
             result = cast(dict[str, object], result_raw)
@@ -347,94 +422,172 @@ class NeteaseProvider(MusicProvider):
             decky.logger.error(f"网易云搜索失败: {e}")
             return {"success": False, "error": str(e), "songs": [], "keyword": keyword, "page": page}
 
+    @staticmethod
+    async def _fetch_audio_chunk(song_ids: list[int], level: str) -> dict[int, dict[str, object]]:
+        """请求一批歌曲的音频信息，按歌曲 ID 建立映射"""
+        result_raw = await run_blocking(track.GetTrackAudioV1, song_ids, level=level, encodeType="flac")
+        # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
+        result = cast(dict[str, object], result_raw)
+        if result.get("code") != 200:
+            raise RuntimeError("获取播放链接失败")
+
+        data_list_raw = result.get("data", [])
+        data_list = data_list_raw if isinstance(data_list_raw, list) else []
+        items: dict[int, dict[str, object]] = {}
+        for item in data_list:
+            if not isinstance(item, dict):
+                continue
+            item_id = item.get("id")
+            if isinstance(item_id, (int, float)):
+                items[int(item_id)] = item
+        return items
+
+    @staticmethod
+    def _build_url_response(mid: str, item: dict[str, object] | None) -> SongUrlResponse:
+        """将单首歌曲的音频信息转换为播放链接响应"""
+        if item is None:
+            return {"success": False, "error": "无可用音源", "url": "", "mid": mid}
+
+        url_raw = item.get("url", "")
+        url = str(url_raw) if url_raw else ""
+        if not url:
+            return {"success": False, "error": "该歌曲需要付费或VIP", "url": "", "mid": mid}
+
+        quality_raw = item.get("level", "unknown")
+        quality = str(quality_raw) if quality_raw else "unknown"
+        response: SongUrlResponse = {"success": True, "url": url, "mid": mid, "quality": quality}
+        # expi 为链接有效期（秒）
+        expi = item.get("expi")
+        if isinstance(expi, (int, float)) and expi > 0:
+            response["expires_at"] = time.time() + expi
+        return response
+
+    async def _resolve_song_urls(
+        self, mids: list[str], preferred_quality: PreferredQuality | None = None
+    ) -> dict[str, SongUrlResponse]:
+        """分块批量解析播放链接，逐首返回结果"""
+        level = QUALITY_LEVEL_MAP.get(preferred_quality or "auto", "lossless")
+        results: dict[str, SongUrlResponse] = {}
+        id_map: dict[int, str] = {}
+        for mid in mids:
+            try:
+                id_map[int(mid)] = mid
+            except (TypeError, ValueError):
+                results[mid] = {"success": False, "error": "无效的歌曲 ID", "url": "", "mid": mid}
+
+        song_ids = list(id_map)
+        chunks = [song_ids[i : i + AUDIO_BATCH_SIZE] for i in range(0, len(song_ids), AUDIO_BATCH_SIZE)]
+        chunk_results = await asyncio.gather(
+            *(self._fetch_audio_chunk(chunk, level) for chunk in chunks), return_exceptions=True
+        )
+
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            if isinstance(chunk_result, BaseException):
+                decky.logger.error(f"网易云获取播放链接失败: {chunk_result}")
+                for song_id in chunk:
+                    mid = id_map[song_id]
+                    results[mid] = {"success": False, "error": str(chunk_result), "url": "", "mid": mid}
+                continue
+            for song_id in chunk:
+                mid = id_map[song_id]
+                results[mid] = self._build_url_response(mid, chunk_result.get(song_id))
+        return results
+
+    @staticmethod
+    async def _fetch_detail_batch(batch_ids: list[int], semaphore: asyncio.Semaphore) -> list[dict[str, object]]:
+        """获取一批歌曲详情，失败时单独重试该批次"""
+        last_error: Exception | None = None
+        for attempt in range(DETAIL_MAX_ATTEMPTS):
+            async with semaphore:
+                try:
+                    detail_result_raw = await run_blocking(track.GetTrackDetail, batch_ids)
+                    # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
+                    detail_result = cast(dict[str, object], detail_result_raw)
+                    detail_code_raw = detail_result.get("code", 0)
+                    detail_code = int(detail_code_raw) if isinstance(detail_code_raw, (int, float)) else 0
+                    if detail_code == 200:
+                        songs_data_raw = detail_result.get("songs", [])
+                        songs_data = songs_data_raw if isinstance(songs_data_raw, list) else []
+                        return [s for s in songs_data if isinstance(s, dict)]
+                    last_error = RuntimeError(f"获取歌曲详情失败, code: {detail_code}")
+                except Exception as e:
+                    last_error = e
+            if attempt + 1 < DETAIL_MAX_ATTEMPTS:
+                decky.logger.debug(f"歌曲详情批次第 {attempt + 1} 次尝试失败，稍后重试: {last_error}")
+                await asyncio.sleep(0.5 * (attempt + 1))
+        raise last_error or RuntimeError("获取歌曲详情失败")
+
+    async def _fetch_track_details(self, song_ids: list[int]) -> list[SongInfo]:
+        """并发分批获取歌曲详情，并按 song_ids 的顺序合并结果
+
+        已在元数据缓存中的歌曲直接复用，只请求未命中的部分。
+
+        Raises:
+            RuntimeError: 有批次重试后仍失败；成功的批次已写入元数据缓存，再次请求时只需获取失败的部分
+        """
+        cached, missing = song_metadata.get_many(self.id, [str(song_id) for song_id in song_ids])
+        songs_by_id: dict[int, SongInfo] = {int(mid): song for mid, song in cached.items()}
+        missing_ids = [int(mid) for mid in missing]
+
+        semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+        batches = [missing_ids[i : i + DETAIL_BATCH_SIZE] for i in range(0, len(missing_ids), DETAIL_BATCH_SIZE)]
+        batch_results = await asyncio.gather(
+            *(self._fetch_detail_batch(batch, semaphore) for batch in batches), return_exceptions=True
+        )
+
+        failed_ids: list[int] = []
+        for index, batch_result in enumerate(batch_results):
+            if isinstance(batch_result, BaseException):
+                failed_ids += batches[index]
+                decky.logger.error(f"获取歌曲详情批次 {index + 1} 失败（已重试 {DETAIL_MAX_ATTEMPTS} 次）: {batch_result}")
+                continue
+            for item in batch_result:
+                item_id = item.get("id")
+                if isinstance(item_id, (int, float)):
+                    songs_by_id[int(item_id)] = _format_netease_song(item)
+
+        # 不返回缺失部分歌曲的结果，避免调用方把不完整的列表当作成功
+        if failed_ids:
+            raise RuntimeError(f"获取歌曲详情失败：{len(failed_ids)}/{len(song_ids)} 首未能获取")
+        return [songs_by_id[song_id] for song_id in song_ids if song_id in songs_by_id]
+
     async def get_song_url(self, mid: str, preferred_quality: PreferredQuality | None = None) -> SongUrlResponse:
         try:
-            song_id = int(mid)
-
-            # FLAC 格式需要使用 lossless/hires 音质等级
-            level_map = {
-                "high": "lossless",  # 高音质使用无损
-                "balanced": "lossless",  # 平衡音质使用无损
-                "compat": "higher",  # 兼容模式使用较高音质
-                "auto": "lossless",  # 自动使用无损
-            }
-            level = level_map.get(preferred_quality or "auto", "lossless")
-
-            result_raw = track.GetTrackAudioV1([song_id], level=level, encodeType="flac")
-            # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
-            result = cast(dict[str, object], result_raw)
-
-            if result.get("code") != 200:
-                return {
-                    "success": False,
-                    "error": "获取播放链接失败",
-                    "url": "",
-                    "mid": mid,
-                }
-
-            data_list_raw = result.get("data", [])
-            data_list = data_list_raw if isinstance(data_list_raw, list) else []
-            if not data_list:
-                return {
-                    "success": False,
-                    "error": "无可用音源",
-                    "url": "",
-                    "mid": mid,
-                }
-
-            first_item = data_list[0]
-            if not isinstance(first_item, dict):
-                return {
-                    "success": False,
-                    "error": "数据格式错误",
-                    "url": "",
-                    "mid": mid,
-                }
-
-            url_raw = first_item.get("url", "")
-            url = str(url_raw) if url_raw else ""
-            if not url:
-                return {
-                    "success": False,
-                    "error": "该歌曲需要付费或VIP",
-                    "url": "",
-                    "mid": mid,
-                }
-
-            quality_raw = first_item.get("level", "unknown")
-            quality = str(quality_raw) if quality_raw else "unknown"
-            decky.logger.debug(f"网易云获取歌曲 {mid} 成功，音质: {quality}")
-            return {
-                "success": True,
-                "url": url,
-                "mid": mid,
-                "quality": quality,
-            }
-
+            result = (await self._resolve_song_urls([mid], preferred_quality))[mid]
+            if result.get("success"):
+                decky.logger.debug(f"网易云获取歌曲 {mid} 成功，音质: {result.get('quality', 'unknown')}")
+            return result
         except Exception as e:
             decky.logger.error(f"网易云获取播放链接失败: {e}")
             return {"success": False, "error": str(e), "url": "", "mid": mid}
 
     async def get_song_urls_batch(self, mids: list[str]) -> SongUrlBatchResponse:
+        try:
+            results = await self._resolve_song_urls(mids)
+        except Exception as e:
+            decky.logger.error(f"网易云批量获取播放链接失败: {e}")
+            return {"success": False, "error": str(e), "urls": {}}
+
         urls: dict[str, str] = {}
-        last_error = ""
-        for mid in mids:
-            single = await self.get_song_url(mid)
+        failed: dict[str, str] = {}
+        for mid, single in results.items():
             url_value = single.get("url")
             if single.get("success") and url_value:
                 urls[mid] = str(url_value)
             else:
-                last_error = single.get("error", "")
-        if urls and len(urls) == len(mids):
+                failed[mid] = single.get("error", "未知错误")
+
+        if not failed:
             return {"success": True, "urls": urls}
-        return {"success": False, "error": last_error or "部分歌曲获取失败", "urls": urls}
+        decky.logger.debug(f"网易云批量获取播放链接: 成功 {len(urls)} 首, 失败 {len(failed)} 首")
+        return {"success": False, "error": "部分歌曲获取失败", "urls": urls, "failed": failed}
 
     async def get_search_suggest(self, keyword: str) -> SearchSuggestResponse:
         try:
             if not keyword or not keyword.strip():
                 return {"success": True, "suggestions": []}
 
-            result = _weapi_request("/weapi/search/suggest/keyword", {"s": keyword})
+            result = await run_blocking(_weapi_request, "/weapi/search/suggest/keyword", {"s": keyword})
             result_data = result.get("result", {}) if isinstance(result, dict) else {}
 
             suggestions: list[SuggestionItem] = []
@@ -487,7 +640,7 @@ class NeteaseProvider(MusicProvider):
     async def get_hot_search(self) -> HotSearchResponse:
         try:
             # 优先使用带评分的热搜列表
-            result = _weapi_request("/weapi/search/hot/detail", {})
+            result = await run_blocking(_weapi_request, "/weapi/search/hot/detail", {})
             data_raw = result.get("data", [])
             result_data = result.get("result", {})
             result_hots = result_data.get("hots", []) if isinstance(result_data, dict) else []
@@ -516,10 +669,7 @@ class NeteaseProvider(MusicProvider):
             return {"success": False, "error": "未登录", "songs": [], "total": 0}
 
         try:
-            # /likelist 返回喜欢歌曲的 ID 列表
-            like_ids_resp = _weapi_request("/weapi/song/like/get", {"uid": session.uid})
-            ids_raw = like_ids_resp.get("ids", []) if isinstance(like_ids_resp, dict) else []
-            ids = ids_raw if isinstance(ids_raw, list) else []
+            ids = await self._get_liked_ids()
             if not ids:
                 return {"success": True, "songs": [], "total": 0}
 
@@ -529,28 +679,33 @@ class NeteaseProvider(MusicProvider):
             if not slice_ids:
                 return {"success": True, "songs": [], "total": total}
 
-            detail_result_raw = track.GetTrackDetail(slice_ids)
-            # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
-            detail_result = cast(dict[str, object], detail_result_raw)
-            
-            code_raw = detail_result.get("code", 0)
-            code = int(code_raw) if isinstance(code_raw, (int, float)) else 0
-            if code != 200:
+            try:
+                songs = await self._fetch_track_details(slice_ids)
+            except Exception as e:
+                decky.logger.error(f"网易云获取收藏歌曲详情失败: {e}")
                 return {"success": False, "error": "获取歌曲详情失败", "songs": [], "total": total}
 
-            songs_data_raw = detail_result.get("songs", [])
-            songs_data = songs_data_raw if isinstance(songs_data_raw, list) else []
-            songs = [_format_netease_song(s) for s in songs_data if isinstance(s, dict)]
-
             return {"success": True, "songs": songs, "total": total}
         except Exception as e:
             decky.logger.error(f"网易云获取收藏歌曲失败: {e}")
             return {"success": False, "error": str(e), "songs": [], "total": 0}
 
+    async def is_liked(self, mids: list[str]) -> LikedStatusResponse:
+        session = GetCurrentSession()
+        if not session.logged_in:
+            return {"success": False, "error": "未登录", "liked": {}}
+
+        try:
+            await self._get_liked_ids()
+            return {"success": True, "liked": {mid: mid in self._liked_set for mid in mids}}
+        except Exception as e:
+            decky.logger.error(f"网易云查询喜欢状态失败: {e}")
+            return {"success": False, "error": str(e), "liked": {}}
+
     async def get_song_lyric(self, mid: str, qrc: bool = True) -> SongLyricResponse:
         del qrc
         try:
-            result_raw = track.GetTrackLyricsNew(mid)
+            result_raw = await run_blocking(track.GetTrackLyricsNew, mid)
             # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
             result = cast(dict[str, object], result_raw)
 
@@ -614,7 +769,7 @@ class NeteaseProvider(MusicProvider):
                 }
 
             uid = session.uid
-            result_raw = user.GetUserPlaylists(uid)
+            result_raw = await run_blocking(user.GetUserPlaylists, uid)
             # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
             result = cast(dict[str, object], result_raw)
 
@@ -657,46 +812,51 @@ class NeteaseProvider(MusicProvider):
             decky.logger.error(f"网易云获取用户歌单失败: {e}")
             return {"success": False, "error": str(e), "created": [], "collected": []}
 
-    async def get_playlist_songs(self, playlist_id: int, dirid: int = 0) -> PlaylistSongsResponse:
+    async def get_playlist_track_ids(self, playlist_id: int, dirid: int = 0) -> PlaylistTrackIdsResponse:
+        del dirid
         try:
-            del dirid
-            result_raw = playlist.GetPlaylistInfo(playlist_id)
+            result_raw = await run_blocking(playlist.GetPlaylistInfo, playlist_id)
             # EapiCryptoRequest 装饰器实际返回 dict，但类型检查器认为是 tuple
             result = cast(dict[str, object], result_raw)
 
             code_raw = result.get("code", 0)
             code = int(code_raw) if isinstance(code_raw, (int, float)) else 0
             if code != 200:
-                return {"success": False, "error": "获取歌单歌曲失败", "songs": [], "playlist_id": playlist_id}
+                return {"success": False, "error": "获取歌单歌曲失败", "mids": [], "playlist_id": playlist_id}
 
             playlist_data_raw = result.get("playlist", {})
             playlist_data = playlist_data_raw if isinstance(playlist_data_raw, dict) else {}
             track_ids_raw = playlist_data.get("trackIds", [])
             track_ids = track_ids_raw if isinstance(track_ids_raw, list) else []
-            
-            if not track_ids:
-                return {"success": True, "songs": [], "playlist_id": playlist_id}
 
-            all_ids = [t.get("id", 0) for t in track_ids if isinstance(t, dict)]
+            mids = [str(t.get("id", 0)) for t in track_ids if isinstance(t, dict) and t.get("id")]
+            return {"success": True, "mids": mids, "playlist_id": playlist_id}
 
-            # 分批获取歌曲详情，API 单次限制 1000 首
-            batch_size = 500
-            songs: list[SongInfo] = []
+        except Exception as e:
+            decky.logger.error(f"网易云获取歌单歌曲 ID 失败: {e}")
+            return {"success": False, "error": str(e), "mids": [], "playlist_id": playlist_id}
 
-            for i in range(0, len(all_ids), batch_size):
-                batch_ids = all_ids[i : i + batch_size]
-                detail_result_raw = track.GetTrackDetail(batch_ids)
-                detail_result = cast(dict[str, object], detail_result_raw)
+    async def get_songs_detail(self, mids: list[str]) -> SongsDetailResponse:
+        try:
+            song_ids = [int(mid) for mid in mids if mid.isdigit()]
+            songs = await self._fetch_track_details(song_ids) if song_ids else []
+            return {"success": True, "songs": songs}
+        except Exception as e:
+            decky.logger.error(f"网易云批量获取歌曲信息失败: {e}")
+            return {"success": False, "error": str(e), "songs": []}
 
-                detail_code_raw = detail_result.get("code", 0)
-                detail_code = int(detail_code_raw) if isinstance(detail_code_raw, (int, float)) else 0
-                if detail_code != 200:
-                    decky.logger.warning(f"获取歌曲详情批次 {i // batch_size + 1} 失败")
-                    continue
+    async def get_playlist_songs(self, playlist_id: int, dirid: int = 0) -> PlaylistSongsResponse:
+        try:
+            ids_result = await self.get_playlist_track_ids(playlist_id, dirid)
+            if not ids_result.get("success"):
+                error = ids_result.get("error", "获取歌单歌曲失败")
+                return {"success": False, "error": error, "songs": [], "playlist_id": playlist_id}
+
+            mids = ids_result.get("mids") or []
+            if not mids:
+                return {"success": True, "songs": [], "playlist_id": playlist_id}
 
-                songs_data_raw = detail_result.get("songs", [])
-                songs_data = songs_data_raw if isinstance(songs_data_raw, list) else []
-                songs.extend([_format_netease_song(s) for s in songs_data if isinstance(s, dict)])
+            songs = await self._fetch_track_details([int(mid) for mid in mids])
 
             decky.logger.info(f"网易云获取歌单 {playlist_id} 的歌曲: {len(songs)} 首")
             return {
@@ -713,7 +873,8 @@ class NeteaseProvider(MusicProvider):
         """猜你喜欢（个性化推荐新歌）"""
         try:
             # TODO: 这个固定 50 吗？？？
-            result = _weapi_request(
+            result = await run_blocking(
+                _weapi_request,
                 "/weapi/personalized/newsong",
                 {"limit": 50, "timestamp": int(time.time() * 1000)},
             )
@@ -726,8 +887,9 @@ class NeteaseProvider(MusicProvider):
             if code == 301:
                 decky.logger.info("网易云 token 过期，尝试刷新")
                 try:
-                    login.LoginRefreshToken()
-                    result = _weapi_request(
+                    await run_blocking(login.LoginRefreshToken)
+                    result = await run_blocking(
+                        _weapi_request,
                         "/weapi/personalized/newsong",
                         {"limit": 50, "timestamp": int(time.time() * 1000)},
                     )
@@ -807,16 +969,18 @@ class NeteaseProvider(MusicProvider):
             return {"success": False, "error": "未登录", "songs": []}
 
         try:
-            result = _weapi_request(
+            result = await run_blocking(
+                _weapi_request,
                 "/weapi/v3/discovery/recommend/songs",
                 {"limit": 50, "offset": 0, "total": True, "csrf_token": session.csrf_token},
             )
             if result.get("code") == 301:
                 # 登录状态失效，尝试刷新
                 try:
-                    login.LoginRefreshToken()
+                    await run_blocking(login.LoginRefreshToken)
                     session = GetCurrentSession()
-                    result = _weapi_request(
+                    result = await run_blocking(
+                        _weapi_request,
                         "/weapi/v3/discovery/recommend/songs",
                         {"limit": 50, "offset": 0, "total": True, "csrf_token": session.csrf_token},
                     )
@@ -847,7 +1011,7 @@ class NeteaseProvider(MusicProvider):
 
         try:
             # 官方每日推荐歌单接口
-            result = _weapi_request("/weapi/v1/discovery/recommend/resource", {"limit": 30})
+            result = await run_blocking(_weapi_request, "/weapi/v1/discovery/recommend/resource", {"limit": 30})
             recommend_raw = result.get("recommend", [])
             data_raw = result.get("data", {})
             data = data_raw if isinstance(data_raw, dict) else {}
@@ -857,7 +1021,7 @@ class NeteaseProvider(MusicProvider):
 
             if not playlist_data:
                 # 兜底使用个性化歌单
-                result = _weapi_request("/weapi/personalized/playlist", {"limit": 30})
+                result = await run_blocking(_weapi_request, "/weapi/personalized/playlist", {"limit": 30})
                 result_items = result.get("result", [])
                 playlists_items = result.get("playlists", [])
                 playlist_data_raw = result_items if isinstance(result_items, list) and result_items else (playlists_items if isinstance(playlists_items, list) else [])
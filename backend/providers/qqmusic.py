@@ -3,13 +3,16 @@
 实现 QQ 音乐的登录、搜索、推荐、播放、歌单等功能。
 """
 
+import asyncio
 import base64
 import json
+import time
 from collections.abc import Mapping
 from datetime import datetime
 from typing import cast
 
 import decky
+from backend.cache import song_metadata
 from backend.config_manager import ConfigManager
 from backend.providers.base import Capability, MusicProvider
 from backend.types import (
@@ -21,6 +24,7 @@ from backend.types import (
     OperationResult,
     PlaylistInfo,
     PlaylistSongsResponse,
+    PlaylistWindowResponse,
     PreferredQuality,
     QrCodeResponse,
     QrStatus,
@@ -32,6 +36,7 @@ from backend.types import (
     SongInfo,
     SongInfoResponse,
     SongLyricResponse,
+    SongsDetailResponse,
     SongUrlBatchResponse,
     SongUrlResponse,
     UserPlaylistsResponse,
@@ -40,6 +45,23 @@ from qqmusic_api import Credential, login, lyric, recommend, search, song, songl
 from qqmusic_api.login import QR, QRCodeLoginEvents, QRLoginType
 from qqmusic_api.utils.session import get_session
 
+# song.query_song 单次查询的歌曲数量
+SONG_QUERY_BATCH_SIZE = 50
+# 某音质连续多少次拿不到链接（而更低音质可用）后暂时跳过；空链接也可能只是单曲限制，因此只是暂时跳过
+TIER_SKIP_THRESHOLD = 3
+# 被跳过的音质自最近一次确认起的有效期（秒），过期后重新参与探测
+TIER_MEMORY_TTL = 6 * 3600
+# 每隔多少次取链接顺带并发重探一次被跳过的音质，使误判能尽快恢复
+TIER_REPROBE_EVERY = 10
+# 异常信息中表示账号无权限的关键字，命中时直接跳过该音质
+TIER_DENIED_KEYWORDS = ("vip", "付费", "权限")
+# 缓存的凭证有效性状态多久后需要重新联网校验（秒）
+CREDENTIAL_CHECK_INTERVAL = 30 * 60
+# 距凭证过期多久时提前在后台刷新（秒）
+CREDENTIAL_REFRESH_AHEAD = 12 * 3600
+# 后台维护的最短间隔（秒），刷新失败后按此间隔重试
+CREDENTIAL_RETRY_INTERVAL = 5 * 60
+
 
 class QQMusicProvider(MusicProvider):
     """QQ 音乐服务 Provider"""
@@ -63,19 +85,21 @@ class QQMusicProvider(MusicProvider):
 
         mid = item.get("mid", "") or item.get("songmid", "")
 
-        return cast(
-            SongInfo,
-            {
-                "id": item.get("id", 0) or item.get("songid", 0),
-                "mid": mid,
-                "name": item.get("name", "") or item.get("title", "") or item.get("songname", ""),
-                "singer": singer_name,
-                "album": album_name,
-                "albumMid": album_mid,
-                "duration": item.get("interval", 0),
-                "cover": f"https://y.qq.com/music/photo_new/T002R300x300M000{album_mid}.jpg" if album_mid else "",
-                "provider": "qqmusic",
-            },
+        return song_metadata.put(
+            cast(
+                SongInfo,
+                {
+                    "id": item.get("id", 0) or item.get("songid", 0),
+                    "mid": mid,
+                    "name": item.get("name", "") or item.get("title", "") or item.get("songname", ""),
+                    "singer": singer_name,
+                    "album": album_name,
+                    "albumMid": album_mid,
+                    "duration": item.get("interval", 0),
+                    "cover": f"https://y.qq.com/music/photo_new/T002R300x300M000{album_mid}.jpg" if album_mid else "",
+                    "provider": "qqmusic",
+                },
+            )
         )
 
     @staticmethod
@@ -112,6 +136,16 @@ class QQMusicProvider(MusicProvider):
         self.current_qr: QR | None = None
         self.encrypt_uin: str | None = None
         self._config = ConfigManager()
+        # 音质学习：各音质连续拿不到链接的次数、被跳过的音质及其最近确认时间
+        self._tier_failures: dict[song.SongFileType, int] = {}
+        self._tier_skipped_at: dict[song.SongFileType, float] = {}
+        self._tier_calls = 0
+        # 凭证有效性缓存：None 表示尚未校验
+        self._credential_valid: bool | None = None
+        self._credential_checked_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._credential_task: asyncio.Task[bool] | None = None
+        self._maintenance_task: asyncio.Task[None] | None = None
 
     @property
     def id(self) -> str:
@@ -161,37 +195,166 @@ class QQMusicProvider(MusicProvider):
                 self.encrypt_uin = self.credential.encrypt_uin if self.credential else None
                 if self.credential:
                     get_session().credential = self.credential
+                self._reset_tier_memory()
+                self._set_credential_state(None)
                 decky.logger.info("凭证加载成功")
                 return True
         except Exception as e:
             decky.logger.error(f"加载凭证失败: {e}")
         return False
 
-    async def _ensure_credential_valid(self) -> bool:
-        if not self.credential or not self.credential.has_musicid():
+    def _seconds_until_expiry(self) -> float | None:
+        """凭证距过期的秒数，凭证未携带过期时间时返回 None"""
+        expired_at = float(getattr(self.credential, "expired_at", 0) or 0)
+        if expired_at <= 0:
+            return None
+        if expired_at > 1e12:
+            expired_at /= 1000
+        return expired_at - time.time()
+
+    def _refresh_due(self) -> bool:
+        remaining = self._seconds_until_expiry()
+        return remaining is not None and remaining <= CREDENTIAL_REFRESH_AHEAD
+
+    def _credential_state_stale(self) -> bool:
+        return time.monotonic() - self._credential_checked_at >= CREDENTIAL_CHECK_INTERVAL
+
+    def _set_credential_state(self, valid: bool | None) -> None:
+        if valid != self._credential_valid:
+            self._notify_login_changed()
+        self._credential_valid = valid
+        self._credential_checked_at = time.monotonic() if valid is not None else 0.0
+
+    async def _validate_credential(self, allow_refresh: bool) -> bool:
+        """联网校验凭证是否过期并更新缓存的有效性状态
+
+        Args:
+            allow_refresh: 已过期时是否立即刷新，否则仅安排后台刷新
+
+        Returns:
+            凭证当前是否有效
+        """
+        credential = self.credential
+        if not credential or not credential.has_musicid():
             return False
 
         try:
-            is_expired = await self.credential.is_expired()
-            if is_expired:
-                decky.logger.debug("凭证已过期，尝试刷新...")
-                if await self.credential.can_refresh():
-                    refreshed = await self.credential.refresh()
-                    if refreshed:
-                        get_session().credential = self.credential
-                        self.encrypt_uin = self.credential.encrypt_uin
-                        self.save_credential()
-                        decky.logger.info("凭证刷新成功")
-                        return True
-                    else:
-                        decky.logger.warning("凭证刷新失败")
-                        return False
-                return False
-            return True
+            expired = await credential.is_expired()
         except Exception as e:
             decky.logger.warning(f"检查凭证状态失败: {e}")
+            return bool(self._credential_valid)
+
+        if credential is not self.credential:
+            return bool(self._credential_valid)
+        if not expired:
+            self._set_credential_state(True)
+            return True
+
+        decky.logger.debug("凭证已过期")
+        self._set_credential_state(False)
+        if allow_refresh:
+            return await self._refresh_credential()
+        self._spawn_credential_task(refresh=True)
+        return False
+
+    async def _refresh_credential(self) -> bool:
+        """刷新凭证并持久化，同一时间只有一个刷新在进行"""
+        async with self._refresh_lock:
+            credential = self.credential
+            if not credential or not credential.has_musicid():
+                return False
+            # 等锁期间其他任务可能已完成刷新
+            if self._credential_valid and not self._refresh_due():
+                return True
+
+            try:
+                if not await credential.can_refresh():
+                    decky.logger.warning("凭证无法刷新，需要重新登录")
+                    self._set_credential_state(False)
+                    return False
+                refreshed = await credential.refresh()
+            except Exception as e:
+                decky.logger.warning(f"刷新凭证失败: {e}")
+                return bool(self._credential_valid)
+
+            if credential is not self.credential:
+                return False
+            if not refreshed:
+                decky.logger.warning("凭证刷新失败")
+                self._set_credential_state(False)
+                return False
+
+            get_session().credential = credential
+            self.encrypt_uin = credential.encrypt_uin
+            self._reset_tier_memory()
+            self.save_credential()
+            self._set_credential_state(True)
+            decky.logger.info("凭证刷新成功")
+            return True
+
+    def _spawn_credential_task(self, refresh: bool) -> None:
+        """在后台校验或刷新凭证，已有任务进行中时不重复创建"""
+        if self._credential_task and not self._credential_task.done():
+            return
+        coro = self._refresh_credential() if refresh else self._validate_credential(allow_refresh=True)
+        try:
+            self._credential_task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()
+
+    async def _ensure_credential_valid(self) -> bool:
+        """判断凭证是否可用，只读取缓存状态，不在调用路径上联网校验或刷新"""
+        if not self.credential or not self.credential.has_musicid():
             return False
 
+        if self._credential_valid is None:
+            # 尚未校验过（后台任务未启动时），做一次不带刷新的校验
+            return await self._validate_credential(allow_refresh=False)
+
+        remaining = self._seconds_until_expiry()
+        if remaining is not None and remaining <= 0:
+            self._set_credential_state(False)
+
+        if not self._credential_valid or self._refresh_due():
+            self._spawn_credential_task(refresh=True)
+        elif self._credential_state_stale():
+            self._spawn_credential_task(refresh=False)
+        return bool(self._credential_valid)
+
+    def _next_maintenance_delay(self) -> float:
+        delay = float(CREDENTIAL_CHECK_INTERVAL)
+        remaining = self._seconds_until_expiry()
+        if remaining is not None:
+            delay = min(delay, remaining - CREDENTIAL_REFRESH_AHEAD)
+        return max(delay, CREDENTIAL_RETRY_INTERVAL)
+
+    async def _credential_maintenance_loop(self) -> None:
+        """后台定期校验凭证，并在过期前主动刷新"""
+        while True:
+            await asyncio.sleep(self._next_maintenance_delay())
+            if not self.credential or not self.credential.has_musicid():
+                continue
+            try:
+                if not self._credential_valid or self._refresh_due():
+                    await self._refresh_credential()
+                elif self._credential_state_stale():
+                    await self._validate_credential(allow_refresh=True)
+            except Exception as e:
+                decky.logger.warning(f"凭证后台维护失败: {e}")
+
+    def start_background_tasks(self) -> None:
+        if self._maintenance_task and not self._maintenance_task.done():
+            return
+        self._maintenance_task = asyncio.get_running_loop().create_task(self._credential_maintenance_loop())
+
+    async def shutdown(self) -> None:
+        tasks = [t for t in (self._maintenance_task, self._credential_task) if t and not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._maintenance_task = None
+        self._credential_task = None
+
     async def get_qr_code(self, login_type: str = "qq") -> QrCodeResponse:
         try:
             qr_type = QRLoginType.QQ if login_type == "qq" else QRLoginType.WX
@@ -232,10 +395,15 @@ class QQMusicProvider(MusicProvider):
                 self.credential = credential
                 self.encrypt_uin = credential.encrypt_uin
                 get_session().credential = credential
+                self._reset_tier_memory()
+                self._set_credential_state(True)
                 self.save_credential()
                 self.current_qr = None
                 result["logged_in"] = True
                 result["musicid"] = credential.musicid
+                self._notify_login_changed(
+                    {"logged_in": True, "musicid": credential.musicid, "encrypt_uin": credential.encrypt_uin}
+                )
                 decky.logger.info(f"登录成功，musicid: {credential.musicid}")
 
             return result
@@ -250,8 +418,14 @@ class QQMusicProvider(MusicProvider):
                 self.load_credential()
 
             if self.credential and self.credential.has_musicid():
-                was_expired = await self.credential.is_expired() if self.credential else False
-                is_valid = await self._ensure_credential_valid()
+                refreshed = False
+                if self._credential_valid is None or self._credential_state_stale():
+                    is_valid = await self._validate_credential(allow_refresh=False)
+                    if not is_valid and self.credential:
+                        # 登录状态查询不在播放路径上，允许就地刷新已过期的凭证
+                        is_valid = refreshed = await self._refresh_credential()
+                else:
+                    is_valid = await self._ensure_credential_valid()
 
                 if is_valid:
                     result: LoginStatusResponse = {
@@ -259,7 +433,7 @@ class QQMusicProvider(MusicProvider):
                         "musicid": self.credential.musicid,
                         "encrypt_uin": self.credential.encrypt_uin,
                     }
-                    if was_expired:
+                    if refreshed:
                         result["refreshed"] = True
                     return result
                 else:
@@ -276,8 +450,11 @@ class QQMusicProvider(MusicProvider):
             self.credential = None
             self.current_qr = None
             self.encrypt_uin = None
+            self._reset_tier_memory()
+            self._set_credential_state(None)
 
             self._config.delete_qqmusic_credential()
+            self._notify_login_changed({"logged_in": False})
 
             decky.logger.info("已退出登录")
             return {"success": True}
@@ -507,27 +684,33 @@ class QQMusicProvider(MusicProvider):
             return high_profile if logged_in else balanced_profile
 
         file_types = pick_order(preferred_quality, has_credential)
+        self._expire_tier_memory()
 
-        last_error = ""
+        # 被跳过的音质放到最后兜底，不参与首轮探测；每隔若干次调用全部音质一起重探
+        skipped = [ft for ft in file_types if ft in self._tier_skipped_at]
+        self._tier_calls += 1
+        if skipped and self._tier_calls % TIER_REPROBE_EVERY == 0:
+            skipped = []
+        candidates = [ft for ft in file_types if ft not in skipped]
 
-        for file_type in file_types:
-            try:
-                urls = await song.get_song_urls(mid=[mid], file_type=file_type, credential=self.credential)
-
-                url = urls.get(mid, "")
-                if url:
-                    decky.logger.debug(f"获取歌曲 {mid} 成功，音质: {file_type.name}")
-                    return {
-                        "success": True,
-                        "url": url,
-                        "mid": mid,
-                        "quality": file_type.name,
-                    }
+        last_error = ""
+        winner: song.SongFileType | None = None
+        url = ""
 
-            except Exception as e:
-                last_error = str(e)
-                decky.logger.debug(f"尝试 {file_type.name} 失败: {e}")
+        for group in (candidates, skipped):
+            if winner or not group:
                 continue
+            winner, url, error = await self._probe_tiers(mid, group)
+            last_error = error or last_error
+
+        if winner and url:
+            decky.logger.debug(f"获取歌曲 {mid} 成功，音质: {winner.name}")
+            return {
+                "success": True,
+                "url": url,
+                "mid": mid,
+                "quality": winner.name,
+            }
 
         if not has_credential:
             error_msg = "登录状态异常，请重新登录后重试"
@@ -539,6 +722,81 @@ class QQMusicProvider(MusicProvider):
         decky.logger.warning(f"无法获取歌曲 {mid}: {error_msg}")
         return {"success": False, "url": "", "mid": mid, "error": error_msg}
 
+    async def _fetch_tier_url(self, mid: str, file_type: song.SongFileType) -> str:
+        urls = await song.get_song_urls(mid=[mid], file_type=file_type, credential=self.credential)
+        return urls.get(mid, "")
+
+    async def _probe_tiers(
+        self, mid: str, file_types: list[song.SongFileType]
+    ) -> tuple[song.SongFileType | None, str, str]:
+        """按 file_types 顺序选出可用的最佳音质
+
+        先单独请求第一个音质（学习稳定后即为账号可用的最高音质），命中时只需一次请求；
+        未命中时再并发请求其余音质。
+
+        Returns:
+            (命中的音质, 播放链接, 最后一次错误信息)
+        """
+        unavailable: list[song.SongFileType] = []
+        denied: list[song.SongFileType] = []
+        last_error = ""
+        for group in (file_types[:1], file_types[1:]):
+            tasks = {ft: asyncio.create_task(self._fetch_tier_url(mid, ft)) for ft in group}
+            try:
+                for file_type in group:
+                    try:
+                        url = await tasks[file_type]
+                    except Exception as e:
+                        last_error = str(e)
+                        decky.logger.debug(f"尝试 {file_type.name} 失败: {e}")
+                        if any(keyword in last_error.lower() for keyword in TIER_DENIED_KEYWORDS):
+                            denied.append(file_type)
+                        continue
+                    if url:
+                        self._remember_tiers(unavailable, denied, file_type)
+                        return file_type, url, last_error
+                    unavailable.append(file_type)
+            finally:
+                for task in tasks.values():
+                    if not task.done():
+                        task.cancel()
+        return None, "", last_error
+
+    def _remember_tiers(
+        self,
+        unavailable: list[song.SongFileType],
+        denied: list[song.SongFileType],
+        winner: song.SongFileType,
+    ) -> None:
+        """记录音质探测结果
+
+        只有在较低音质可用时才记录更高音质的失败，整首歌不可用（版权等）不影响学习结果。
+        接口明确报告无权限的音质属于账号级信号，直接跳过；空链接可能只是单曲限制，
+        连续多次后才暂时跳过，并由定期重探恢复。
+        """
+        now = time.monotonic()
+        for file_type in unavailable:
+            failures = self._tier_failures.get(file_type, 0) + 1
+            self._tier_failures[file_type] = failures
+            if failures >= TIER_SKIP_THRESHOLD:
+                self._tier_skipped_at[file_type] = now
+        for file_type in denied:
+            self._tier_skipped_at[file_type] = now
+        self._tier_failures.pop(winner, None)
+        self._tier_skipped_at.pop(winner, None)
+
+    def _expire_tier_memory(self) -> None:
+        now = time.monotonic()
+        for file_type, skipped_at in list(self._tier_skipped_at.items()):
+            if now - skipped_at > TIER_MEMORY_TTL:
+                del self._tier_skipped_at[file_type]
+                self._tier_failures.pop(file_type, None)
+
+    def _reset_tier_memory(self) -> None:
+        """清除已学习的音质信息（凭证变化后账号权限可能不同）"""
+        self._tier_failures = {}
+        self._tier_skipped_at = {}
+
     async def get_song_urls_batch(self, mids: list[str]) -> SongUrlBatchResponse:
         try:
             urls = await song.get_song_urls(
@@ -576,6 +834,18 @@ class QQMusicProvider(MusicProvider):
                 "trans": "",
             }
 
+    async def get_songs_detail(self, mids: list[str]) -> SongsDetailResponse:
+        try:
+            cached, missing = song_metadata.get_many(self.id, mids)
+            songs: list[SongInfo] = list(cached.values())
+            for i in range(0, len(missing), SONG_QUERY_BATCH_SIZE):
+                tracks = await song.query_song(missing[i : i + SONG_QUERY_BATCH_SIZE])
+                songs.extend(self._format_song(item) for item in tracks if isinstance(item, dict))
+            return {"success": True, "songs": songs}
+        except Exception as e:
+            decky.logger.error(f"批量获取歌曲信息失败: {e}")
+            return {"success": False, "error": str(e), "songs": []}
+
     async def get_song_info(self, mid: str) -> SongInfoResponse:
         try:
             result = await song.get_detail(mid)
@@ -649,3 +919,33 @@ class QQMusicProvider(MusicProvider):
         except Exception as e:
             decky.logger.error(f"获取歌单歌曲失败: {e}")
             return {"success": False, "error": str(e), "songs": [], "playlist_id": playlist_id}
+
+    async def get_playlist_songs_page(
+        self, playlist_id: int, offset: int, limit: int, dirid: int = 0
+    ) -> PlaylistWindowResponse:
+        try:
+            # 接口按 num * (page - 1) 定位，窗口未按 limit 对齐时跨两页
+            num = max(limit, 1)
+            first_page = offset // num + 1
+            last_page = (offset + num - 1) // num + 1
+            responses = await asyncio.gather(
+                *(
+                    songlist.get_detail(songlist_id=playlist_id, dirid=dirid, num=num, page=page, onlysong=True)
+                    for page in range(first_page, last_page + 1)
+                )
+            )
+
+            items = [item for response in responses for item in response.get("songlist") or []]
+            start = offset - (first_page - 1) * num
+            songs = [self._format_song(item) for item in items[start : start + limit]]
+            return {
+                "success": True,
+                "songs": songs,
+                "playlist_id": playlist_id,
+                "offset": offset,
+                "total": int(responses[0].get("total_song_num") or 0),
+            }
+
+        except Exception as e:
+            decky.logger.error(f"分页获取歌单歌曲失败: {e}")
+            return {"success": False, "error": str(e), "songs": [], "playlist_id": playlist_id, "offset": offset}
@@ -0,0 +1,104 @@
+"""Provider 声明式注册表
+
+各 provider 的 SDK（qqmusic_api 依赖 httpx 和加密库，pyncm 依赖 requests）导入开销较大，
+而多数用户只使用其中一个服务。这里仅声明 provider 的元信息，
+模块在首次启用或作为 fallback 使用时才导入并实例化。
+"""
+
+from __future__ import annotations
+
+import importlib
+import time
+from typing import NamedTuple
+
+import decky
+from backend.providers.base import Capability, MusicProvider
+
+# 单个 provider 模块导入耗时预算（毫秒），超出时输出警告日志
+PROVIDER_IMPORT_BUDGET_MS = 1500.0
+
+
+class ProviderSpec(NamedTuple):
+    """Provider 声明：未导入模块前即可展示名称和能力"""
+
+    id: str
+    name: str
+    module: str  # 实现所在模块
+    class_name: str  # 实现类名
+    capabilities: frozenset[Capability]  # 与实现类的 capabilities 保持一致
+
+
+PROVIDER_SPECS: tuple[ProviderSpec, ...] = (
+    ProviderSpec(
+        id="qqmusic",
+        name="QQ音乐",
+        module="backend.providers.qqmusic",
+        class_name="QQMusicProvider",
+        capabilities=frozenset(
+            {
+                Capability.AUTH_QR_LOGIN,
+                Capability.SEARCH_SONG,
+                Capability.SEARCH_SUGGEST,
+                Capability.SEARCH_HOT,
+                Capability.PLAY_SONG,
+                Capability.PLAY_QUALITY_HIGH,
+                Capability.PLAY_QUALITY_STANDARD,
+                Capability.LYRIC_BASIC,
+                Capability.LYRIC_WORD_BY_WORD,
+                Capability.LYRIC_TRANSLATION,
+                Capability.RECOMMEND_DAILY,
+                Capability.RECOMMEND_PERSONALIZED,
+                Capability.RECOMMEND_PLAYLIST,
+                Capability.PLAYLIST_USER,
+                Capability.PLAYLIST_FAVORITE,
+            }
+        ),
+    ),
+    ProviderSpec(
+        id="netease",
+        name="网易云音乐",
+        module="backend.providers.netease",
+        class_name="NeteaseProvider",
+        capabilities=frozenset(
+            {
+                Capability.AUTH_QR_LOGIN,
+                Capability.SEARCH_SONG,
+                Capability.SEARCH_HOT,
+                Capability.SEARCH_SUGGEST,
+                Capability.PLAY_SONG,
+                Capability.PLAY_QUALITY_HIGH,
+                Capability.PLAY_QUALITY_STANDARD,
+                Capability.LYRIC_BASIC,
+                Capability.LYRIC_WORD_BY_WORD,
+                Capability.LYRIC_TRANSLATION,
+                Capability.PLAYLIST_USER,
+                Capability.RECOMMEND_DAILY,
+                Capability.RECOMMEND_PERSONALIZED,
+                Capability.RECOMMEND_PLAYLIST,
+            }
+        ),
+    ),
+)
+
+
+def import_provider_class(spec: ProviderSpec) -> tuple[type[MusicProvider], float]:
+    """导入 provider 实现类
+
+    可在线程中调用，以免首次导入 SDK 时阻塞事件循环。
+
+    Args:
+        spec: provider 声明
+
+    Returns:
+        (实现类, 导入耗时毫秒)
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(spec.module)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms > PROVIDER_IMPORT_BUDGET_MS:
+        decky.logger.warning(
+            f"导入 {spec.id} 耗时 {elapsed_ms:.0f}ms，超出预算 {PROVIDER_IMPORT_BUDGET_MS:.0f}ms"
+        )
+    else:
+        decky.logger.info(f"导入 {spec.id} 耗时 {elapsed_ms:.0f}ms")
+    return getattr(module, spec.class_name), elapsed_ms
@@ -0,0 +1,212 @@
+"""播放队列存储
+
+每个 provider 的队列单独保存在 queues/ 目录下，与 settings.json 分离：
+- <provider>.json：有序的歌曲 mid 列表和按 mid 去重的歌曲信息表，仅在队列内容变化时重写
+- <provider>.cursor.json：当前播放位置，切歌时只写这个几十字节的文件
+
+首次启动时自动从旧的 frontend_settings.providerQueues 迁移。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import decky
+from backend.types import PlaylistState, QueueStoreStats, SongInfo
+from backend.util import atomic_write_text
+
+if TYPE_CHECKING:
+    from backend.config_manager import ConfigManager
+
+# 队列文件格式版本
+QUEUE_FORMAT_VERSION = 1
+# 歌曲信息表中保留的字段
+SONG_FIELDS = ("id", "mid", "name", "singer", "album", "albumMid", "duration", "cover", "provider")
+
+_SAFE_ID_PATTERN = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class _Queue:
+    """单个 provider 的队列（内存）"""
+
+    __slots__ = ("mids", "songs", "current_index", "current_mid")
+
+    def __init__(self) -> None:
+        self.mids: list[str] = []
+        self.songs: dict[str, SongInfo] = {}
+        self.current_index = -1
+        self.current_mid: str | None = None
+
+
+def _compact_song(song: dict[str, object]) -> SongInfo:
+    return cast(SongInfo, {k: song[k] for k in SONG_FIELDS if k in song})
+
+
+class QueueStore:
+    """按 provider 分文件保存播放队列，支持只更新播放位置"""
+
+    def __init__(self, directory: Path) -> None:
+        self._dir = directory
+        self._queues: dict[str, _Queue] = {}
+        # 同一 provider 的写入串行执行，保证后写入的是最新状态
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.queue_writes = 0
+        self.cursor_writes = 0
+
+    def _paths(self, provider_id: str) -> tuple[Path, Path]:
+        name = _SAFE_ID_PATTERN.sub("_", provider_id) or "_"
+        return self._dir / f"{name}.json", self._dir / f"{name}.cursor.json"
+
+    def _lock(self, provider_id: str) -> asyncio.Lock:
+        lock = self._locks.get(provider_id)
+        if lock is None:
+            lock = self._locks[provider_id] = asyncio.Lock()
+        return lock
+
+    def _read(self, provider_id: str) -> _Queue:
+        queue = _Queue()
+        queue_path, cursor_path = self._paths(provider_id)
+        try:
+            if queue_path.exists():
+                raw = json.loads(queue_path.read_text(encoding="utf-8"))
+                if isinstance(raw, dict):
+                    mids = raw.get("mids")
+                    songs = raw.get("songs")
+                    queue.mids = [str(m) for m in mids] if isinstance(mids, list) else []
+                    queue.songs = cast(dict[str, SongInfo], songs) if isinstance(songs, dict) else {}
+            if cursor_path.exists():
+                cursor = json.loads(cursor_path.read_text(encoding="utf-8"))
+                if isinstance(cursor, dict):
+                    index = cursor.get("currentIndex", -1)
+                    mid = cursor.get("currentMid")
+                    queue.current_index = index if isinstance(index, int) else -1
+                    queue.current_mid = mid if isinstance(mid, str) and mid else None
+        except (OSError, ValueError) as e:
+            decky.logger.warning(f"读取 {provider_id} 队列失败: {e}")
+        return queue
+
+    async def _get(self, provider_id: str) -> _Queue:
+        queue = self._queues.get(provider_id)
+        if queue is None:
+            loaded = await asyncio.to_thread(self._read, provider_id)
+            # 读取期间可能已有写入，以内存中的为准
+            queue = self._queues.setdefault(provider_id, loaded)
+        return queue
+
+    def _queue_text(self, queue: _Queue) -> str:
+        payload = {"version": QUEUE_FORMAT_VERSION, "mids": queue.mids, "songs": queue.songs}
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _cursor_text(queue: _Queue) -> str:
+        return json.dumps({"currentIndex": queue.current_index, "currentMid": queue.current_mid}, ensure_ascii=False)
+
+    async def _write(self, provider_id: str, write_queue: bool) -> None:
+        queue_path, cursor_path = self._paths(provider_id)
+        async with self._lock(provider_id):
+            # 等待锁期间队列可能已被 clear 清空，此时不再写回文件
+            queue = self._queues.get(provider_id)
+            if queue is None:
+                return
+            if write_queue:
+                await asyncio.to_thread(atomic_write_text, queue_path, self._queue_text(queue))
+                self.queue_writes += 1
+            await asyncio.to_thread(atomic_write_text, cursor_path, self._cursor_text(queue))
+            self.cursor_writes += 1
+
+    async def get(self, provider_id: str) -> PlaylistState:
+        """获取队列，返回与旧版 providerQueues 相同的结构"""
+        queue = await self._get(provider_id)
+        playlist = [queue.songs.get(mid) or cast(SongInfo, {"mid": mid}) for mid in queue.mids]
+        state: PlaylistState = {"playlist": playlist, "currentIndex": queue.current_index}
+        if queue.current_mid:
+            state["currentMid"] = queue.current_mid
+        return state
+
+    async def save(
+        self, provider_id: str, playlist: list[dict[str, object]], current_index: int, current_mid: str | None = None
+    ) -> None:
+        """保存整个队列；歌曲列表未变化时只写播放位置"""
+        queue = await self._get(provider_id)
+        entries = [(str(song["mid"]), song) for song in playlist if song.get("mid")]
+        mids = [mid for mid, _ in entries]
+        songs = {mid: _compact_song(song) for mid, song in entries}
+        changed = mids != queue.mids or songs != {mid: queue.songs.get(mid) for mid in mids}
+        if changed:
+            queue.mids = mids
+            queue.songs = songs
+        queue.current_index = current_index
+        queue.current_mid = current_mid or None
+        await self._write(provider_id, write_queue=changed)
+
+    async def update_position(self, provider_id: str, index: int, mid: str | None = None) -> bool:
+        """只更新播放位置
+
+        Args:
+            provider_id: provider ID
+            index: 当前播放下标
+            mid: 当前歌曲 mid，与下标不一致时以 mid 在队列中的位置为准
+
+        Returns:
+            mid 是否在队列中（mid 为空时恒为 True）
+        """
+        queue = await self._get(provider_id)
+        found = True
+        if mid and not (0 <= index < len(queue.mids) and queue.mids[index] == mid):
+            found = mid in queue.mids
+            if found:
+                index = queue.mids.index(mid)
+        queue.current_index = index
+        queue.current_mid = mid or None
+        await self._write(provider_id, write_queue=False)
+        return found
+
+    async def migrate_from_settings(self, config: ConfigManager) -> None:
+        """将 frontend_settings.providerQueues 中的旧队列迁移到独立文件"""
+        settings = config.get_frontend_settings()
+        legacy = settings.get("providerQueues")
+        if legacy is None:
+            return
+        if isinstance(legacy, dict):
+            for provider_id, state in legacy.items():
+                if not isinstance(state, dict):
+                    continue
+                queue_path, _ = self._paths(provider_id)
+                if provider_id in self._queues or await asyncio.to_thread(queue_path.exists):
+                    continue
+                playlist = state.get("playlist")
+                await self.save(
+                    provider_id,
+                    [s for s in playlist if isinstance(s, dict)] if isinstance(playlist, list) else [],
+                    state.get("currentIndex", -1) if isinstance(state.get("currentIndex"), int) else -1,
+                    state.get("currentMid") if isinstance(state.get("currentMid"), str) else None,
+                )
+            decky.logger.info(f"已迁移 {len(legacy)} 个 provider 的播放队列")
+        remaining = {k: v for k, v in settings.items() if k != "providerQueues"}
+        config.set_setting("frontend_settings", remaining)
+
+    def stats(self) -> QueueStoreStats:
+        return {"queueWrites": self.queue_writes, "cursorWrites": self.cursor_writes}
+
+    async def clear(self) -> None:
+        """清空所有队列并删除队列文件
+
+        内存状态在事件循环中清空；删除文件前先等待进行中的写入完成，避免写入把刚删除的文件重新创建出来。
+        """
+        self._queues.clear()
+        async with contextlib.AsyncExitStack() as stack:
+            for lock in list(self._locks.values()):
+                await stack.enter_async_context(lock)
+            await asyncio.to_thread(self._delete_files)
+
+    def _delete_files(self) -> None:
+        try:
+            for path in self._dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            decky.logger.warning(f"删除队列文件失败: {e}")
@@ -0,0 +1,108 @@
+"""单飞（single-flight）请求合并
+
+前端重复渲染、快速连点或预加载与播放同时发生时，会以相同参数并发调用同一个 RPC。
+SingleFlight 按调用键合并这些并发请求：第一个调用真正执行，其余调用等待同一个 Future，
+请求完成后立即移除，不缓存结果。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections.abc import Awaitable, Callable, Hashable
+from functools import wraps
+from typing import Concatenate, ParamSpec, TypeVar, cast
+
+from backend.types import SingleFlightStats
+
+T = TypeVar("T")
+R = TypeVar("R")
+P = ParamSpec("P")
+Self = TypeVar("Self")
+
+
+class SingleFlight:
+    """按键合并并发的相同调用"""
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Future[object]] = {}
+        self._calls = 0
+        self._shared = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """执行调用，若相同键的调用正在进行则等待其结果
+
+        等待方被取消时不会取消共享的请求；共享到的 dict 结果为浅拷贝，避免调用方互相修改。
+
+        Args:
+            key: 调用键（方法名与参数）
+            call: 真正执行请求的协程函数
+
+        Returns:
+            调用结果
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._shared += 1
+            result = await asyncio.shield(future)
+            return cast(T, dict(result) if isinstance(result, dict) else result)
+
+        self._calls += 1
+        task = asyncio.ensure_future(call())
+        self._in_flight[key] = cast("asyncio.Future[object]", task)
+
+        def _done(_: object) -> None:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    def stats(self) -> SingleFlightStats:
+        return {
+            "calls": self._calls,
+            "saved": self._shared,
+            "inFlight": len(self._in_flight),
+        }
+
+
+def single_flight(
+    attr: str = "_flight",
+) -> Callable[
+    [Callable[Concatenate[Self, P], Awaitable[R]]],
+    Callable[Concatenate[Self, P], Awaitable[R]],
+]:
+    """装饰器：合并插件方法的并发相同调用
+
+    调用键由方法名、当前 provider ID 和补全默认值后的参数组成，切换 provider 后不会复用旧请求。
+    参数不可哈希时直接调用。
+
+    Args:
+        attr: 实例上 SingleFlight 对象的属性名
+
+    Returns:
+        装饰器函数
+    """
+
+    def decorator(
+        func: Callable[Concatenate[Self, P], Awaitable[R]],
+    ) -> Callable[Concatenate[Self, P], Awaitable[R]]:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(self: Self, *args: P.args, **kwargs: P.kwargs) -> R:
+            flight: SingleFlight = getattr(self, attr)
+            provider = getattr(self, "_provider", None)
+            try:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                params = tuple(bound.arguments.values())[1:]
+                key = (func.__name__, getattr(provider, "id", None), params)
+                hash(key)
+            except TypeError:
+                return await func(self, *args, **kwargs)
+            return await flight.do(key, lambda: func(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,144 @@
+"""
+歌曲匹配单元测试
+"""
+
+import os
+import sys
+
+# Save current directory and temporarily remove it from path to avoid types.py conflict
+# (os is already loaded at interpreter startup, so it is safe to use here)
+cwd = os.getcwd()
+backend_path = os.path.dirname(os.path.abspath(__file__))
+
+# Ensure backend is NOT in sys.path when importing unittest
+for path in (backend_path, cwd, ""):
+    while path in sys.path:
+        sys.path.remove(path)
+
+# Now safe to import unittest (won't hit backend/types.py)
+import unittest  # noqa: E402
+
+# NOW add backend to path and import matching
+sys.path.insert(0, backend_path)
+from matching import (  # noqa: E402
+    clean_title,
+    dedupe_songs,
+    make_match_key,
+    normalize_title,
+    pick_best_match,
+    search_query,
+    split_artists,
+)
+
+
+def song(name, singer, duration=0, mid=""):
+    return {"mid": mid or name, "name": name, "singer": singer, "duration": duration}
+
+
+# (目标歌名, 目标歌手, 目标时长, 候选列表, 期望匹配的候选下标，None 表示不应匹配)
+MATCH_CORPUS = [
+    # 括号注释与版本后缀
+    ("晴天", "周杰伦", 269, [song("晴天 (Live)", "周杰伦", 280), song("晴天", "周杰伦", 269)], 1),
+    ("晴天 (Live)", "周杰伦", 280, [song("晴天", "周杰伦", 269), song("晴天 (Live)", "周杰伦", 281)], 1),
+    ("Yesterday - Remastered 2009", "The Beatles", 125, [song("Yesterday", "The Beatles", 126)], 0),
+    ("Bohemian Rhapsody (Remastered 2011)", "Queen", 355, [song("Bohemian Rhapsody", "Queen", 354)], 0),
+    # feat. 与多歌手
+    ("Shape of You (feat. Stormzy)", "Ed Sheeran", 233, [song("Shape of You", "Ed Sheeran, Stormzy", 233)], 0),
+    ("Stay", "The Kid LAROI & Justin Bieber", 141, [song("Stay", "The Kid LAROI/Justin Bieber", 142)], 0),
+    ("说好不哭", "周杰伦/五月天阿信", 222, [song("说好不哭 (with 五月天阿信)", "周杰伦", 222)], 0),
+    # 全角字符与大小写
+    ("ＨＥＬＬＯ", "Ａｄｅｌｅ", 295, [song("Hello", "Adele", 295)], 0),
+    (
+        "Love Story（Taylor's Version）",
+        "Taylor Swift",
+        235,
+        [song("Love Story (Taylor's Version)", "Taylor Swift", 235)],
+        0,
+    ),
+    # 繁简差异
+    ("後來", "劉若英", 340, [song("后来", "刘若英", 340)], 0),
+    ("愛你", "王心凌", 214, [song("爱你", "王心凌", 214)], 0),
+    # 伴奏、翻唱等不同版本不应误配
+    ("演员", "薛之谦", 261, [song("演员 (伴奏)", "薛之谦", 261)], None),
+    ("演员", "薛之谦", 261, [song("演员 (伴奏)", "薛之谦", 261), song("演员", "薛之谦", 261)], 1),
+    # 同名不同歌手：时长接近的优先
+    ("光年之外", "G.E.M.邓紫棋", 235, [song("光年之外", "某翻唱歌手", 240), song("光年之外", "G.E.M. 邓紫棋", 235)], 1),
+    # 完全不同的歌曲
+    ("七里香", "周杰伦", 299, [song("稻香", "周杰伦", 223), song("七月上", "Jam", 300)], None),
+    # 候选为空
+    ("七里香", "周杰伦", 299, [], None),
+]
+
+
+class TestNormalization(unittest.TestCase):
+    """归一化测试"""
+
+    def test_clean_title(self):
+        self.assertEqual(clean_title("晴天 (Live)"), "晴天")
+        self.assertEqual(clean_title("Yesterday - Remastered 2009"), "Yesterday")
+        self.assertEqual(clean_title("Shape of You (feat. Stormzy)"), "Shape of You")
+        self.assertEqual(clean_title("Song feat. Someone"), "Song")
+        self.assertEqual(clean_title("【官方版】稻香"), "稻香")
+        # 整个歌名都在括号中时保留原文
+        self.assertEqual(clean_title("(Intro)"), "(Intro)")
+
+    def test_normalize_title(self):
+        self.assertEqual(normalize_title("ＨＥＬＬＯ"), "hello")
+        self.assertEqual(normalize_title("後來"), "后来")
+        self.assertEqual(normalize_title("Don't Stop Me Now"), "dontstopmenow")
+
+    def test_split_artists(self):
+        self.assertEqual(split_artists("周杰伦/五月天阿信"), frozenset({"周杰伦", "五月天阿信"}))
+        self.assertEqual(split_artists("Simon & Garfunkel"), frozenset({"simon", "garfunkel"}))
+        self.assertEqual(split_artists("A, B feat. C"), frozenset({"a", "b", "c"}))
+        self.assertEqual(split_artists(""), frozenset())
+
+    def test_version_tags(self):
+        self.assertEqual(make_match_key("晴天 (Live)").versions, frozenset({"live"}))
+        self.assertEqual(make_match_key("演员 (伴奏)").versions, frozenset({"instrumental"}))
+        self.assertEqual(make_match_key("Yesterday - Remastered 2009").versions, frozenset())
+
+    def test_search_query(self):
+        self.assertEqual(search_query("晴天 (Live)", "周杰伦"), "晴天 周杰伦")
+        self.assertEqual(search_query("Stay", "The Kid LAROI, Justin Bieber"), "Stay The Kid LAROI")
+
+
+class TestPickBestMatch(unittest.TestCase):
+    """匹配语料测试"""
+
+    def test_corpus(self):
+        for name, singer, duration, candidates, expected in MATCH_CORPUS:
+            with self.subTest(name=name, singer=singer):
+                best = pick_best_match(make_match_key(name, singer, duration), candidates)
+                if expected is None:
+                    self.assertIsNone(best)
+                else:
+                    self.assertIsNotNone(best)
+                    self.assertIs(best[0], candidates[expected])
+
+    def test_unknown_duration_is_neutral(self):
+        candidates = [song("稻香", "周杰伦", 0)]
+        best = pick_best_match(make_match_key("稻香", "周杰伦"), candidates)
+        self.assertIsNotNone(best)
+
+
+class TestDedupeSongs(unittest.TestCase):
+    """多 provider 搜索结果去重测试"""
+
+    def test_merges_variants_across_providers(self):
+        qq = [song("後來", "劉若英", 340, "qq1"), song("晴天", "周杰伦", 269, "qq2")]
+        netease = [song("后来", "刘若英", 341, "ne1"), song("晴天 (Live)", "周杰伦", 280, "ne2")]
+        merged = dedupe_songs(qq + netease)
+        self.assertEqual([s["mid"] for s in merged], ["qq1", "qq2", "ne2"])
+
+    def test_keeps_same_title_by_other_artist_or_length(self):
+        songs = [
+            song("光年之外", "G.E.M.邓紫棋", 235, "a"),
+            song("光年之外", "某翻唱歌手", 235, "b"),
+            song("光年之外", "G.E.M. 邓紫棋", 300, "c"),
+        ]
+        self.assertEqual(len(dedupe_songs(songs)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
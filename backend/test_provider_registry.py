@@ -0,0 +1,48 @@
+"""
+Provider 注册表单元测试
+
+PROVIDER_SPECS 中的能力集是手工声明的（以免展示 provider 列表时导入 SDK），
+这里校验它与各 provider 实现类的 capabilities 保持一致。
+"""
+
+import sys
+from pathlib import Path
+
+# Keep backend/ itself off sys.path so backend/types.py does not shadow the stdlib module;
+# the repository root is enough to import the backend package
+backend_path = Path(__file__).parent
+repo_root = backend_path.parent
+for path in (str(backend_path), str(Path.cwd()), ""):
+    while path in sys.path:
+        sys.path.remove(path)
+
+import unittest  # noqa: E402
+
+sys.path.insert(0, str(repo_root))
+
+
+class TestProviderSpecs(unittest.TestCase):
+    """Provider 声明与实现一致性测试"""
+
+    def test_spec_capabilities_match_provider_class(self):
+        """测试声明的能力集与实现类一致"""
+        try:
+            from backend.providers.registry import PROVIDER_SPECS, import_provider_class
+        except ImportError as e:
+            self.skipTest(f"插件运行环境不可用: {e}")
+
+        for spec in PROVIDER_SPECS:
+            with self.subTest(provider=spec.id):
+                try:
+                    cls, _ = import_provider_class(spec)
+                except ImportError as e:
+                    self.skipTest(f"{spec.id} 的 SDK 未安装: {e}")
+                # capabilities 不依赖实例状态，跳过 __init__ 以免加载凭证
+                provider = cls.__new__(cls)
+                self.assertEqual(spec.capabilities, frozenset(provider.capabilities))
+                self.assertEqual(spec.name, provider.name)
+                self.assertEqual(spec.id, provider.id)
+
+
+if __name__ == "__main__":
+    unittest.main()
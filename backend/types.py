@@ -126,6 +126,19 @@ class SearchResponse(TypedDict, total=False):
     error: NotRequired[str]
 
 
+class SearchAllResponse(TypedDict, total=False):
+    """多 provider 聚合搜索结果，歌曲的 provider 字段标明来源"""
+
+    success: bool
+    songs: list[SongInfo]
+    keyword: str
+    page: int
+    providers: list[str]  # 返回了结果的 provider
+    timedOut: list[str]  # 超过等待上限的 provider
+    failed: list[str]  # 搜索失败的 provider
+    error: NotRequired[str]
+
+
 class HotSearchResponse(TypedDict, total=False):
     success: bool
     hotkeys: list[HotKey]
@@ -151,12 +164,14 @@ class SongUrlResponse(TypedDict, total=False):
     original_provider: NotRequired[str]
     provider: NotRequired[str]
     matched_song: NotRequired[SongInfo]
+    expires_at: NotRequired[float]  # 链接过期时间（Unix 时间戳，秒）
     error: NotRequired[str]
 
 
 class SongUrlBatchResponse(TypedDict, total=False):
     success: bool
     urls: SongUrlMap
+    failed: NotRequired[dict[str, str]]  # 获取失败的歌曲 ID -> 错误信息
     error: NotRequired[str]
 
 
@@ -200,6 +215,12 @@ class FavSongsResponse(TypedDict, total=False):
     error: NotRequired[str]
 
 
+class LikedStatusResponse(TypedDict, total=False):
+    success: bool
+    liked: dict[str, bool]  # 歌曲 ID -> 是否已喜欢
+    error: NotRequired[str]
+
+
 class UserPlaylistsResponse(TypedDict, total=False):
     success: bool
     created: list[PlaylistInfo]
@@ -213,6 +234,33 @@ class PlaylistSongsResponse(TypedDict, total=False):
     playlist_id: int
     error: NotRequired[str]
 
+
+class PlaylistTrackIdsResponse(TypedDict, total=False):
+    """歌单歌曲 ID 有序列表"""
+
+    success: bool
+    mids: list[str]
+    songs: NotRequired[list[SongInfo]]  # provider 已顺带取得的歌曲详情
+    playlist_id: int
+    error: NotRequired[str]
+
+
+class PlaylistWindowResponse(TypedDict, total=False):
+    """歌单歌曲窗口（按 offset/limit 分段加载）"""
+
+    success: bool
+    songs: list[SongInfo]
+    playlist_id: int
+    offset: int
+    total: int  # 歌单歌曲总数
+    error: NotRequired[str]
+
+
+class SongsDetailResponse(TypedDict, total=False):
+    success: bool
+    songs: list[SongInfo]
+    error: NotRequired[str]
+
 # ==================== 设置相关 ====================
 
 PlayMode = Literal["order", "single", "shuffle"]
@@ -225,7 +273,7 @@ class PlaylistState(TypedDict, total=False):
 
 
 class FrontendSettings(TypedDict, total=False):
-    providerQueues: NotRequired[dict[str, PlaylistState]]
+    providerQueues: NotRequired[dict[str, PlaylistState]]  # 旧版队列存储，启动时迁移到 QueueStore
     lastProviderId: NotRequired[str]
     playMode: PlayMode
     volume: float
@@ -237,6 +285,23 @@ class FrontendSettingsResponse(TypedDict, total=False):
     settings: FrontendSettings
     error: NotRequired[str]
 
+
+class PluginSettings(TypedDict, total=False):
+    """可通过 get_settings / update_settings 批量读写的设置项"""
+
+    playMode: PlayMode
+    volume: float
+    preferredQuality: PreferredQuality
+    lastProviderId: str | None
+    mainProviderId: str | None
+    fallbackProviderIds: list[str]
+
+
+class SettingsResponse(TypedDict, total=False):
+    success: bool
+    settings: PluginSettings
+    error: NotRequired[str]
+
 # ==================== 更新相关 ====================
 
 
@@ -319,6 +384,15 @@ class SwitchProviderResponse(TypedDict, total=False):
     success: bool
     error: NotRequired[str]
 
+
+class MatchEntry(TypedDict):
+    """跨 provider 歌曲匹配索引条目"""
+
+    mids: dict[str, str]  # provider_id -> 歌曲 ID
+    last_provider: str  # 最近一次成功提供播放链接的 provider
+    duration: int  # 歌曲时长（秒），0 表示未知
+    updated_at: float
+
 # ==================== 通用 ====================
 
 
@@ -331,3 +405,131 @@ class SongInfoResponse(TypedDict, total=False):
     success: bool
     info: dict[str, object]
     error: NotRequired[str]
+
+
+# ==================== 诊断相关 ====================
+
+
+class ExecutorStats(TypedDict):
+    """阻塞 I/O 执行器统计"""
+
+    name: str
+    maxWorkers: int
+    calls: int
+    errors: int
+    inFlight: int
+    avgWaitMs: float  # 平均排队耗时
+    maxWaitMs: float
+    lastWaitMs: float
+    avgRunMs: float  # 平均执行耗时
+    maxRunMs: float
+    lastRunMs: float
+
+
+class CacheStats(TypedDict):
+    """内存缓存统计"""
+
+    size: int
+    maxSize: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class LyricCacheStats(TypedDict):
+    """歌词磁盘缓存统计"""
+
+    bytes: int
+    maxBytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class EndpointHealthStats(TypedDict):
+    """单个接口最近调用的健康度统计"""
+
+    calls: int
+    window: int
+    successRate: float
+    p50Ms: float
+    p95Ms: float
+    lastError: str | None
+    errorClasses: dict[str, int]
+
+
+class ProviderHealthStats(TypedDict):
+    """Provider 健康度与熔断状态"""
+
+    state: Literal["closed", "open", "half_open"]
+    degraded: bool
+    openSeconds: float
+    endpoints: dict[str, EndpointHealthStats]
+
+
+class ProviderLoadStats(TypedDict):
+    """provider 按需加载耗时"""
+
+    importMs: float  # 模块导入耗时
+    initMs: float  # 实例化与加载凭证耗时
+
+
+class PrefetchStats(TypedDict):
+    """队列预取统计"""
+
+    depth: int  # 当前自适应预取深度
+    skipRate: float  # 平滑后的跳过率
+    inFlight: int
+    scheduled: int
+    completed: int
+    failed: int
+    hits: int  # 切到的歌曲已预取（或正在预取）的次数
+    misses: int
+
+
+class PrefetchQueueResponse(TypedDict, total=False):
+    success: bool
+    depth: int  # 本次实际预取深度
+    mids: list[str]  # 本次预取窗口内的歌曲
+    error: NotRequired[str]
+
+
+class ConfigWriteStats(TypedDict):
+    """配置合并写入统计"""
+
+    requested: int  # 修改次数
+    written: int  # 实际写入分片文件次数
+    saved: int  # 合并后省去的写入次数
+    pending: int  # 尚未写入的分片数
+    loadedShards: dict[str, float]  # 已加载的分片及读取耗时（毫秒）
+
+
+class QueueStoreStats(TypedDict):
+    """播放队列存储写入统计"""
+
+    queueWrites: int  # 队列内容写入次数
+    cursorWrites: int  # 播放位置写入次数
+
+
+class SingleFlightStats(TypedDict):
+    """并发相同请求合并统计"""
+
+    calls: int  # 实际发出的请求数
+    saved: int  # 合并到进行中请求、因而省去的请求数
+    inFlight: int
+
+
+class BackendStatsResponse(TypedDict, total=False):
+    success: bool
+    executor: ExecutorStats
+    songCache: CacheStats
+    lyricCache: LyricCacheStats
+    matchIndex: CacheStats
+    providerHealth: dict[str, ProviderHealthStats]
+    singleFlight: SingleFlightStats
+    prefetch: PrefetchStats
+    configWrites: ConfigWriteStats
+    queueStore: QueueStoreStats
+    pluginImportMs: float
+    providerLoads: dict[str, ProviderLoadStats]
+    error: NotRequired[str]
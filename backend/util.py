@@ -3,11 +3,17 @@
 提供版本处理、HTTP 请求、数据格式化等通用工具函数。
 """
 
+import contextlib
 import json
+import os
+import re
+import tempfile
 from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
 from functools import cache, wraps
 from pathlib import Path
 from typing import Concatenate, ParamSpec, TypeVar, cast
+from urllib.parse import parse_qs, urlparse
 
 import requests
 
@@ -18,6 +24,12 @@ R = TypeVar("R")
 P = ParamSpec("P")
 Self = TypeVar("Self")
 
+# 播放链接中表示过期时间（Unix 时间戳）的查询参数
+_URL_EXPIRY_PARAMS = ("expire", "expires", "expiry", "x-expires")
+# 网易云 CDN 链接路径中的过期时间，如 /20240101123456/，为北京时间
+_NETEASE_URL_EXPIRY_REGEX = re.compile(r"/(\d{14})/")
+_CHINA_TZ = timezone(timedelta(hours=8))
+
 
 @cache
 def load_plugin_version() -> str:
@@ -100,6 +112,62 @@ def download_file(url: str, dest: Path) -> None:
                     f.write(chunk)
 
 
+def atomic_write_text(path: Path, text: str) -> None:
+    """原子写入文本文件
+
+    先写入同目录下的临时文件并 fsync，再通过 rename 替换目标文件，
+    避免写入中途断电或崩溃导致文件损坏。
+
+    Args:
+        path: 目标文件路径
+        text: 文件内容
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+def parse_url_expiry(url: str) -> float | None:
+    """从播放链接中解析过期时间
+
+    支持查询参数中的 Unix 时间戳（expire/expires 等）以及网易云 CDN 路径中的
+    ``YYYYMMDDHHMMSS`` 时间戳。
+
+    Args:
+        url: 播放链接
+
+    Returns:
+        过期时间（Unix 时间戳，秒），无法解析返回 None
+    """
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+
+    query = {k.lower(): v for k, v in parse_qs(parsed.query).items()}
+    for name in _URL_EXPIRY_PARAMS:
+        values = query.get(name)
+        if values and values[0].isdigit() and len(values[0]) == 10:
+            return float(values[0])
+
+    match = _NETEASE_URL_EXPIRY_REGEX.search(parsed.path)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d%H%M%S").replace(tzinfo=_CHINA_TZ).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
 def require_provider(
     **default_fields: object,
 ) -> Callable[
@@ -3,9 +3,14 @@
 实现多 Provider 架构的音乐服务，支持登录、搜索、推荐和播放功能。
 """
 
+import asyncio  # noqa: E402
 import sys  # noqa: E402
+import time  # noqa: E402
 from pathlib import Path  # noqa: E402
 
+# 插件模块导入开始时间，用于统计启动导入耗时
+_import_started = time.perf_counter()
+
 plugin_dir = Path(__file__).parent.resolve()
 if str(plugin_dir) not in sys.path:
     sys.path.insert(0, str(plugin_dir))
@@ -17,24 +22,32 @@ if py_modules_dir.exists() and str(py_modules_dir) not in sys.path:
 from typing import cast  # noqa: E402
 
 from backend.types import (  # noqa: E402
+    BackendStatsResponse,
     DailyRecommendResponse,
     DownloadResult,
     FavSongsResponse,
     FrontendSettings,
     HotSearchResponse,
+    LikedStatusResponse,
     ListProvidersResponse,
     LoginStatusResponse,
     OperationResult,
     PlaylistSongsResponse,
+    PlaylistWindowResponse,
+    PluginSettings,
     PluginVersionResponse,
+    PrefetchQueueResponse,
     PreferredQuality,
     ProviderInfoResponse,
     QrCodeResponse,
     QrStatusResponse,
     RecommendPlaylistResponse,
     RecommendResponse,
+    SearchAllResponse,
     SearchResponse,
     SearchSuggestResponse,
+    SettingsResponse,
+    SongInfo,
     SongInfoResponse,
     SongLyricResponse,
     SongUrlBatchResponse,
@@ -48,18 +61,36 @@ import decky  # noqa: E402
 from backend import (  # noqa: E402
     ConfigManager,
     MusicProvider,
-    NeteaseProvider,
     ProviderManager,
-    QQMusicProvider,
     check_for_update,
     download_update,
     load_plugin_version,
     log_from_frontend,
     require_provider,
 )
+from backend.cache import song_metadata  # noqa: E402
+from backend.executor import provider_executor  # noqa: E402
+from backend.lyric_cache import FALLBACK_LYRIC_TTL, LyricCache  # noqa: E402
 from backend.lyric_parser import parse_lyric  # noqa: E402
+from backend.match_index import MatchIndex  # noqa: E402
+from backend.prefetch import PREFETCH_DEFAULT_DEPTH, QueuePrefetcher  # noqa: E402
+from backend.providers.registry import PROVIDER_SPECS  # noqa: E402
+from backend.queue_store import QueueStore  # noqa: E402
+from backend.singleflight import SingleFlight, single_flight  # noqa: E402
 from backend.types import FrontendSettingsResponse
 
+# 插件模块（不含按需加载的 provider SDK）导入耗时（毫秒）
+PLUGIN_IMPORT_MS = (time.perf_counter() - _import_started) * 1000
+
+# 播放模式与首选音质的有效值
+PLAY_MODES = ("order", "single", "shuffle")
+PREFERRED_QUALITIES = ("auto", "high", "balanced", "compat")
+# 限制最小音量为 5%，避免完全静音造成用户困惑
+MIN_VOLUME = 0.05
+# get_settings / update_settings 支持的设置项，前四项保存在前端设置中
+FRONTEND_SETTING_KEYS = ("playMode", "volume", "preferredQuality", "lastProviderId")
+SETTING_KEYS = (*FRONTEND_SETTING_KEYS, "mainProviderId", "fallbackProviderIds")
+
 
 class Plugin:
     """Decky Music 插件主类"""
@@ -68,20 +99,17 @@ class Plugin:
         self.current_version = load_plugin_version()
         self.config = ConfigManager()
         self._manager = ProviderManager()
-
-        # 注册 providers
-        qqmusic_provider = QQMusicProvider()
-        self._manager.register(qqmusic_provider)
-        netease_provider = NeteaseProvider()
-        self._manager.register(netease_provider)
-
-        # 在初始化时加载所有 providers 的凭证
-        # 这样在检查登录状态时，凭证已经准备好了
-        for provider in self._manager.all_providers():
-            try:
-                provider.load_credential()
-            except Exception as e:
-                decky.logger.warning(f"加载 {provider.id} 凭证失败: {e}")
+        self._lyric_cache = LyricCache(Path(decky.DECKY_PLUGIN_SETTINGS_DIR) / "lyric_cache")
+        self._match_index = MatchIndex(Path(decky.DECKY_PLUGIN_SETTINGS_DIR) / "match_index.json")
+        self._queue_store = QueueStore(Path(decky.DECKY_PLUGIN_SETTINGS_DIR) / "queues")
+        # 合并前端并发发起的相同请求
+        self._flight = SingleFlight()
+        self._prefetcher = QueuePrefetcher(self._prefetch_song_url, self._prefetch_song_lyric)
+        self._manager.set_match_index(self._match_index)
+
+        # 声明 providers，SDK 在首次启用或作为 fallback 时才导入，并在实例化时加载凭证
+        for spec in PROVIDER_SPECS:
+            self._manager.register_spec(spec)
 
         # 不设置默认 provider，让 apply_provider_config() 根据配置和登录状态来选择
 
@@ -104,14 +132,119 @@ class Plugin:
             decky.logger.error(f"保存前端设置失败: {e}")
             return {"success": False, "error": str(e)}
 
+    def _read_setting(self, key: str) -> object:
+        """读取单项设置，无效值校正为默认值
+
+        Raises:
+            ValueError: 未知的设置项
+        """
+        if key == "playMode":
+            play_mode = self.config.get_frontend_setting("playMode", "order")
+            return play_mode if play_mode in PLAY_MODES else "order"
+        if key == "volume":
+            volume = self.config.get_frontend_setting("volume", 1.0)
+            # 确保音量在 0.0 到 1.0 之间
+            return max(0.0, min(1.0, float(volume))) if isinstance(volume, (int, float)) else 1.0
+        if key == "preferredQuality":
+            quality = self.config.get_frontend_setting("preferredQuality", "auto")
+            return quality if quality in PREFERRED_QUALITIES else "auto"
+        if key == "lastProviderId":
+            return self.config.get_frontend_setting("lastProviderId") or None
+        if key == "mainProviderId":
+            return self.config.get_main_provider_id() or None
+        if key == "fallbackProviderIds":
+            return self.config.get_fallback_provider_ids()
+        raise ValueError(f"未知的设置项: {key}")
+
+    @staticmethod
+    def _validate_setting(key: str, value: object) -> object:
+        """校验待写入的设置值
+
+        Returns:
+            规范化后的值
+
+        Raises:
+            ValueError: 未知的设置项或取值无效
+        """
+        if key == "playMode":
+            if value not in PLAY_MODES:
+                raise ValueError(f"无效的播放模式: {value}")
+        elif key == "volume":
+            if not isinstance(value, (int, float)):
+                raise ValueError("音量必须是数字")
+            value = max(MIN_VOLUME, min(1.0, float(value)))
+        elif key == "preferredQuality":
+            if value not in PREFERRED_QUALITIES:
+                raise ValueError(f"无效的音质选项: {value}")
+        elif key in ("lastProviderId", "mainProviderId"):
+            if not isinstance(value, str) or not value:
+                raise ValueError(f"无效的 provider ID: {value}")
+        elif key == "fallbackProviderIds":
+            if not isinstance(value, list):
+                raise ValueError("fallbackProviderIds 必须是列表")
+        else:
+            raise ValueError(f"未知的设置项: {key}")
+        return value
+
+    def _apply_settings(self, patch: PluginSettings | dict[str, object]) -> None:
+        """校验并应用多项设置，只触发一次写入；任一项无效时不做任何修改
+
+        Raises:
+            ValueError: 未知的设置项或取值无效
+        """
+        values = {key: self._validate_setting(key, value) for key, value in patch.items()}
+        frontend = {key: value for key, value in values.items() if key in FRONTEND_SETTING_KEYS}
+        with self.config.transaction():
+            if frontend:
+                self.config.update_frontend_settings(cast(FrontendSettings, frontend))
+            if "mainProviderId" in values:
+                self.config.set_main_provider_id(cast(str, values["mainProviderId"]))
+            if "fallbackProviderIds" in values:
+                self.config.set_fallback_provider_ids(cast(list[str], values["fallbackProviderIds"]))
+
+    async def get_settings(self, keys: list[str] | None = None) -> SettingsResponse:
+        """一次读取多项设置
+
+        Args:
+            keys: 要读取的设置项，为空时读取全部
+
+        Returns:
+            设置项到取值的映射
+        """
+        try:
+            settings = {key: self._read_setting(key) for key in keys or SETTING_KEYS}
+            return {"success": True, "settings": cast(PluginSettings, settings)}
+        except ValueError as e:
+            return {"success": False, "error": str(e), "settings": {}}
+        except Exception as e:
+            decky.logger.error(f"获取设置失败: {e}")
+            return {"success": False, "error": str(e), "settings": {}}
+
+    async def update_settings(self, patch: PluginSettings) -> SettingsResponse:
+        """一次写入多项设置，所有修改合并为一次持久化
+
+        Args:
+            patch: 要修改的设置项，任一项无效时不做任何修改
+
+        Returns:
+            修改后的设置项（已规范化）
+        """
+        try:
+            self._apply_settings(patch or {})
+            settings = {key: self._read_setting(key) for key in patch or {}}
+            return {"success": True, "settings": cast(PluginSettings, settings)}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            decky.logger.error(f"更新设置失败: {e}")
+            return {"success": False, "error": str(e)}
+
     async def get_last_provider_id(self) -> dict[str, object]:
         """获取上次使用的 provider ID"""
         try:
-            settings = self.config.get_frontend_settings()
-            last_provider_id = settings.get("lastProviderId")
             return {
                 "success": True,
-                "lastProviderId": last_provider_id if last_provider_id else None,
+                "lastProviderId": self._read_setting("lastProviderId"),
             }
         except Exception as e:
             decky.logger.error(f"获取 last provider ID 失败: {e}")
@@ -120,9 +253,7 @@ class Plugin:
     async def set_last_provider_id(self, provider_id: str) -> OperationResult:
         """设置上次使用的 provider ID"""
         try:
-            settings = self.config.get_frontend_settings()
-            settings["lastProviderId"] = provider_id
-            self.config.update_frontend_settings(settings)
+            self._apply_settings({"lastProviderId": provider_id})
             return {"success": True}
         except Exception as e:
             decky.logger.error(f"设置 last provider ID 失败: {e}")
@@ -131,10 +262,9 @@ class Plugin:
     async def get_main_provider_id(self) -> dict[str, object]:
         """获取主 Provider ID"""
         try:
-            main_provider_id = self.config.get_main_provider_id()
             return {
                 "success": True,
-                "mainProviderId": main_provider_id if main_provider_id else None,
+                "mainProviderId": self._read_setting("mainProviderId"),
             }
         except Exception as e:
             decky.logger.error(f"获取 main provider ID 失败: {e}")
@@ -143,7 +273,7 @@ class Plugin:
     async def set_main_provider_id(self, provider_id: str) -> OperationResult:
         """设置主 Provider ID"""
         try:
-            self.config.set_main_provider_id(provider_id)
+            self._apply_settings({"mainProviderId": provider_id})
             return {"success": True}
         except Exception as e:
             decky.logger.error(f"设置 main provider ID 失败: {e}")
@@ -152,10 +282,9 @@ class Plugin:
     async def get_fallback_provider_ids(self) -> dict[str, object]:
         """获取 Fallback Provider IDs"""
         try:
-            fallback_ids = self.config.get_fallback_provider_ids()
             return {
                 "success": True,
-                "fallbackProviderIds": fallback_ids,
+                "fallbackProviderIds": self._read_setting("fallbackProviderIds"),
             }
         except Exception as e:
             decky.logger.error(f"获取 fallback provider IDs 失败: {e}")
@@ -164,7 +293,7 @@ class Plugin:
     async def set_fallback_provider_ids(self, provider_ids: list[str]) -> OperationResult:
         """设置 Fallback Provider IDs"""
         try:
-            self.config.set_fallback_provider_ids(provider_ids)
+            self._apply_settings({"fallbackProviderIds": provider_ids})
             return {"success": True}
         except Exception as e:
             decky.logger.error(f"设置 fallback provider IDs 失败: {e}")
@@ -173,14 +302,9 @@ class Plugin:
     async def get_play_mode(self) -> dict[str, object]:
         """获取播放模式"""
         try:
-            settings = self.config.get_frontend_settings()
-            play_mode = settings.get("playMode", "order")
-            # 确保返回的是有效的播放模式
-            if play_mode not in ["order", "single", "shuffle"]:
-                play_mode = "order"
             return {
                 "success": True,
-                "playMode": play_mode,
+                "playMode": self._read_setting("playMode"),
             }
         except Exception as e:
             decky.logger.error(f"获取播放模式失败: {e}")
@@ -189,14 +313,10 @@ class Plugin:
     async def set_play_mode(self, play_mode: str) -> OperationResult:
         """设置播放模式"""
         try:
-            # 验证播放模式
-            if play_mode not in ["order", "single", "shuffle"]:
-                return {"success": False, "error": f"无效的播放模式: {play_mode}"}
-
-            settings = self.config.get_frontend_settings()
-            settings["playMode"] = play_mode
-            self.config.update_frontend_settings(settings)
+            self._apply_settings({"playMode": play_mode})
             return {"success": True}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         except Exception as e:
             decky.logger.error(f"设置播放模式失败: {e}")
             return {"success": False, "error": str(e)}
@@ -204,15 +324,9 @@ class Plugin:
     async def get_volume(self) -> dict[str, object]:
         """获取音量"""
         try:
-            settings = self.config.get_frontend_settings()
-            volume = settings.get("volume", 1.0)
-            # 确保音量在 0.0 到 1.0 之间
-            if not isinstance(volume, (int, float)):
-                volume = 1.0
-            volume = max(0.0, min(1.0, float(volume)))
             return {
                 "success": True,
-                "volume": volume,
+                "volume": self._read_setting("volume"),
             }
         except Exception as e:
             decky.logger.error(f"获取音量失败: {e}")
@@ -221,33 +335,23 @@ class Plugin:
     async def set_volume(self, volume: float) -> OperationResult:
         """设置音量"""
         try:
-            # 验证音量范围
-            if not isinstance(volume, (int, float)):
-                return {"success": False, "error": "音量必须是数字"}
-
-            # 限制最小音量为 5%，避免完全静音造成用户困惑
-            MIN_VOLUME = 0.05
-            volume = max(MIN_VOLUME, min(1.0, float(volume)))
-            settings = self.config.get_frontend_settings()
-            settings["volume"] = volume
-            self.config.update_frontend_settings(settings)
+            self._apply_settings({"volume": volume})
             return {"success": True}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         except Exception as e:
             decky.logger.error(f"设置音量失败: {e}")
             return {"success": False, "error": str(e)}
 
+    def _preferred_quality(self) -> PreferredQuality:
+        return cast(PreferredQuality, self._read_setting("preferredQuality"))
+
     async def get_preferred_quality(self) -> dict[str, object]:
         """获取首选音质"""
         try:
-            settings = self.config.get_frontend_settings()
-            quality = settings.get("preferredQuality", "auto")
-            # 验证音质值
-            valid_qualities = ["auto", "high", "balanced", "compat"]
-            if quality not in valid_qualities:
-                quality = "auto"
             return {
                 "success": True,
-                "preferredQuality": quality,
+                "preferredQuality": self._preferred_quality(),
             }
         except Exception as e:
             decky.logger.error(f"获取首选音质失败: {e}")
@@ -256,15 +360,10 @@ class Plugin:
     async def set_preferred_quality(self, quality: str) -> OperationResult:
         """设置首选音质"""
         try:
-            # 验证音质值
-            valid_qualities = ["auto", "high", "balanced", "compat"]
-            if quality not in valid_qualities:
-                return {"success": False, "error": f"无效的音质选项: {quality}"}
-
-            settings = self.config.get_frontend_settings()
-            settings["preferredQuality"] = quality
-            self.config.update_frontend_settings(settings)
+            self._apply_settings({"preferredQuality": quality})
             return {"success": True}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
         except Exception as e:
             decky.logger.error(f"设置首选音质失败: {e}")
             return {"success": False, "error": str(e)}
@@ -272,18 +371,7 @@ class Plugin:
     async def get_provider_queue(self, provider_id: str) -> dict[str, object]:
         """获取指定 Provider 的队列状态"""
         try:
-            settings = self.config.get_frontend_settings()
-            provider_queues = settings.get("providerQueues", {})
-
-            if not isinstance(provider_queues, dict):
-                provider_queues = {}
-
-            queue = provider_queues.get(provider_id, {})
-
-            # 确保返回的数据结构正确
-            if not isinstance(queue, dict):
-                queue = {}
-
+            queue = await self._queue_store.get(provider_id)
             return {
                 "success": True,
                 "queue": {
@@ -303,28 +391,24 @@ class Plugin:
     async def save_provider_queue(
         self, provider_id: str, playlist: list[dict[str, object]], current_index: int, current_mid: str | None = None
     ) -> OperationResult:
-        """保存指定 Provider 的队列状态"""
+        """保存指定 Provider 的队列状态（歌曲列表未变化时只写播放位置）"""
         try:
-            settings = self.config.get_frontend_settings()
-            provider_queues = settings.get("providerQueues", {})
-
-            if not isinstance(provider_queues, dict):
-                provider_queues = {}
-
-            # 保存队列状态
-            provider_queues[provider_id] = {
-                "playlist": playlist,
-                "currentIndex": current_index,
-                "currentMid": current_mid,
-            }
-
-            settings["providerQueues"] = provider_queues
-            self.config.update_frontend_settings(settings)
+            await self._queue_store.save(provider_id, playlist or [], current_index, current_mid)
             return {"success": True}
         except Exception as e:
             decky.logger.error(f"保存 Provider 队列失败: {e}")
             return {"success": False, "error": str(e)}
 
+    async def update_queue_position(self, provider_id: str, index: int, mid: str | None = None) -> OperationResult:
+        """只更新指定 Provider 队列的播放位置，不重写队列内容"""
+        try:
+            if not await self._queue_store.update_position(provider_id, index, mid):
+                decky.logger.debug(f"{provider_id} 队列中没有 {mid}，仅记录下标")
+            return {"success": True}
+        except Exception as e:
+            decky.logger.error(f"更新队列位置失败: {e}")
+            return {"success": False, "error": str(e)}
+
     async def get_provider_selection(self) -> dict[str, object]:
         """获取当前配置的主 Provider 和 fallback Provider（仅返回已登录的）"""
         return await self._manager.get_provider_selection(self.config)
@@ -346,11 +430,10 @@ class Plugin:
 
     async def switch_provider(self, provider_id: str) -> SwitchProviderResponse:
         try:
+            await self._manager.load_providers([provider_id])
             self._manager.switch(provider_id)
-            # 设置主 provider ID
-            await self.set_main_provider_id(provider_id)
-            # 同时更新 frontend settings 中的 lastProviderId
-            await self.set_last_provider_id(provider_id)
+            # 主 provider ID 与 frontend settings 中的 lastProviderId 一并写入
+            self._apply_settings({"mainProviderId": provider_id, "lastProviderId": provider_id})
             return {"success": True}
         except ValueError as e:
             return {"success": False, "error": str(e)}
@@ -365,18 +448,22 @@ class Plugin:
     async def check_qr_status(self) -> QrStatusResponse:
         # 装饰器已确保 _provider 不为 None
         provider = cast(MusicProvider, self._provider)
-        return await provider.check_qr_status()
+        result = await provider.check_qr_status()
+        if result.get("logged_in"):
+            self._manager.invalidate_song_urls(provider.id)
+        return result
 
     @require_provider(logged_in=False)
     async def get_login_status(self) -> LoginStatusResponse:
         # 装饰器已确保 _provider 不为 None
         provider = cast(MusicProvider, self._provider)
-        return await provider.get_login_status()
+        return await self._manager.get_login_status(provider)
 
     @require_provider()
     async def logout(self) -> OperationResult:
         # 装饰器已确保 _provider 不为 None
         provider = cast(MusicProvider, self._provider)
+        self._manager.invalidate_song_urls(provider.id)
         return provider.logout()
 
     async def clear_all_settings(self) -> OperationResult:
@@ -385,6 +472,10 @@ class Plugin:
                 self._provider.logout()
 
             self.config.clear_all()
+            await self._queue_store.clear()
+            self._manager.invalidate_song_urls()
+            await asyncio.to_thread(self._lyric_cache.clear)
+            await self._match_index.clear()
 
             decky.logger.info("已清除插件数据")
             return {"success": True}
@@ -398,6 +489,10 @@ class Plugin:
         provider = cast(MusicProvider, self._provider)
         return await provider.search_songs(keyword, page, num)
 
+    async def search_all(self, keyword: str, page: int = 1, num: int = 20) -> SearchAllResponse:
+        """同时搜索所有已登录的 provider，合并去重后返回（慢的 provider 超时后返回部分结果）"""
+        return await self._manager.search_all(keyword, page, num)
+
     @require_provider(hotkeys=[])
     async def get_hot_search(self) -> HotSearchResponse:
         # 装饰器已确保 _provider 不为 None
@@ -434,19 +529,34 @@ class Plugin:
         provider = cast(MusicProvider, self._provider)
         return await provider.get_fav_songs(page, num)
 
+    @require_provider(liked={})
+    async def is_liked(self, mids: list[str]) -> LikedStatusResponse:
+        # 装饰器已确保 _provider 不为 None
+        provider = cast(MusicProvider, self._provider)
+        return await provider.is_liked(mids)
+
+    @single_flight()
     async def get_song_url(
         self,
         mid: str,
         preferred_quality: PreferredQuality | None = None,
         song_name: str | None = None,
         singer: str | None = None,
+        refresh: bool = False,
+        duration: float | None = None,
     ) -> SongUrlResponse:
+        """获取播放链接，链接过期前直接返回缓存；refresh 为 True 时强制重新获取（如播放失败重试）
+
+        提供歌名和歌手时启用 fallback，duration（秒）用于跨 provider 匹配同一首歌。
+        """
         if not self._provider:
             return {"success": False, "error": "No active provider", "url": "", "mid": mid}
 
         if song_name and singer:
-            return await self._manager.get_song_url_with_fallback(mid, song_name, singer, preferred_quality)
-        return await self._provider.get_song_url(mid, preferred_quality)
+            return await self._manager.get_song_url_with_fallback(
+                mid, song_name, singer, preferred_quality, refresh, duration
+            )
+        return await self._manager.resolve_song_url(self._provider, mid, preferred_quality, refresh)
 
     @require_provider(urls={})
     async def get_song_urls_batch(self, mids: list[str]) -> SongUrlBatchResponse:
@@ -454,6 +564,7 @@ class Plugin:
         provider = cast(MusicProvider, self._provider)
         return await provider.get_song_urls_batch(mids)
 
+    @single_flight()
     async def get_song_lyric(
         self,
         mid: str,
@@ -468,6 +579,12 @@ class Plugin:
                 "parsed": {"lines": [], "isQrc": False},
             }
 
+        # 优先读取磁盘缓存，命中时无需请求网络和重新解析
+        provider_id = self._provider.id
+        cached = await asyncio.to_thread(self._lyric_cache.get, provider_id, mid, qrc)
+        if cached and cached.get("success"):
+            return cached
+
         # Get raw lyric from provider
         if song_name and singer:
             result = await self._manager.get_song_lyric_with_fallback(mid, song_name, singer, qrc)
@@ -480,8 +597,7 @@ class Plugin:
             trans_text = result.get("trans", "")
             parsed = parse_lyric(lyric_text, trans_text)
 
-            # Return parsed response
-            return {
+            response: SongLyricResponse = {
                 "success": True,
                 "parsed": parsed,
                 "mid": result.get("mid"),
@@ -489,6 +605,11 @@ class Plugin:
                 "original_provider": result.get("original_provider"),
                 "qrc": result.get("qrc"),
             }
+            # 空歌词不缓存，以便上游之后补上歌词时能显示；fallback 的模糊匹配结果只短期缓存
+            if lyric_text:
+                ttl = FALLBACK_LYRIC_TTL if result.get("fallback_provider") else None
+                await asyncio.to_thread(self._lyric_cache.put, provider_id, mid, qrc, response, ttl)
+            return response
         else:
             # Return error with empty parsed structure
             return {
@@ -497,6 +618,29 @@ class Plugin:
                 "parsed": {"lines": [], "isQrc": False},
             }
 
+    async def _prefetch_song_url(self, song: SongInfo) -> SongUrlResponse:
+        # 参数与前端播放时一致，预取进行中时播放请求可直接合并
+        return await self.get_song_url(
+            song["mid"], self._preferred_quality(), song.get("name"), song.get("singer"), False, song.get("duration")
+        )
+
+    async def _prefetch_song_lyric(self, song: SongInfo) -> SongLyricResponse:
+        return await self.get_song_lyric(song["mid"], True, song.get("name"), song.get("singer"))
+
+    @require_provider(depth=0, mids=[])
+    async def prefetch_queue(self, items: list[SongInfo], depth: int = PREFETCH_DEFAULT_DEPTH) -> PrefetchQueueResponse:
+        """在后台预取队列中接下来的歌曲的播放链接和歌词
+
+        Args:
+            items: 当前正在播放的歌曲及其后的队列条目
+            depth: 预取深度上限，实际深度随跳过频率自适应
+
+        Returns:
+            本次预取的深度和歌曲 mid
+        """
+        mids = self._prefetcher.schedule(items or [], depth)
+        return {"success": True, "depth": self._prefetcher.depth, "mids": mids}
+
     @require_provider(info={})
     async def get_song_info(self, mid: str) -> SongInfoResponse:
         # 装饰器已确保 _provider 不为 None
@@ -504,17 +648,26 @@ class Plugin:
         return await provider.get_song_info(mid)
 
     @require_provider(created=[], collected=[])
+    @single_flight()
     async def get_user_playlists(self) -> UserPlaylistsResponse:
         # 装饰器已确保 _provider 不为 None
         provider = cast(MusicProvider, self._provider)
         return await provider.get_user_playlists()
 
     @require_provider(songs=[])
+    @single_flight()
     async def get_playlist_songs(self, playlist_id: int, dirid: int = 0) -> PlaylistSongsResponse:
         # 装饰器已确保 _provider 不为 None
         provider = cast(MusicProvider, self._provider)
         return await provider.get_playlist_songs(playlist_id, dirid)
 
+    @require_provider(songs=[], total=0)
+    async def get_playlist_songs_window(
+        self, playlist_id: int, offset: int = 0, limit: int = 50, dirid: int = 0, refresh: bool = False
+    ) -> PlaylistWindowResponse:
+        """按窗口分段获取歌单歌曲，供前端虚拟列表按需加载"""
+        return await self._manager.get_playlist_songs_window(playlist_id, offset, limit, dirid, refresh)
+
     async def log_from_frontend(
         self, level: str, message: str, data: dict[str, object] | None = None
     ) -> OperationResult:
@@ -530,18 +683,44 @@ class Plugin:
         """
         return log_from_frontend(level, message, data)
 
+    async def get_backend_stats(self) -> BackendStatsResponse:
+        """获取后端运行统计（阻塞 I/O 执行器、缓存命中率等）"""
+        return {
+            "success": True,
+            "executor": provider_executor.get_stats(),
+            "songCache": song_metadata.stats(),
+            "lyricCache": await asyncio.to_thread(self._lyric_cache.stats),
+            "matchIndex": self._match_index.stats(),
+            "providerHealth": self._manager.get_health_stats(),
+            "singleFlight": self._flight.stats(),
+            "prefetch": self._prefetcher.stats(),
+            "configWrites": self.config.write_stats(),
+            "queueStore": self._queue_store.stats(),
+            "pluginImportMs": round(PLUGIN_IMPORT_MS, 1),
+            "providerLoads": self._manager.get_load_stats(),
+        }
+
     async def _main(self):
-        decky.logger.info("Decky Music 插件已加载")
+        decky.logger.info(f"Decky Music 插件已加载（模块导入 {PLUGIN_IMPORT_MS:.0f}ms）")
+        await asyncio.to_thread(self._match_index.load)
+        # 队列迁移与初始 provider ID 的写入由 write-behind 合并，不用事务包住下面的 await
+        await self._queue_store.migrate_from_settings(self.config)
         await self._manager.apply_provider_config(self.config)
+        self._manager.start_background_tasks()
         if self._provider:
             decky.logger.info(f"当前 Provider: {self._provider.name}")
             # 保存初始 provider ID 到 frontend settings
-            last_provider_res = await self.get_last_provider_id()
-            if not (last_provider_res.get("success") and last_provider_res.get("lastProviderId")):
-                await self.set_last_provider_id(self._provider.id)
+            if not self._read_setting("lastProviderId"):
+                self._apply_settings({"lastProviderId": self._provider.id})
 
     async def _unload(self):
         decky.logger.info("Decky Music 插件正在卸载")
+        await self._prefetcher.shutdown()
+        await self._manager.shutdown()
+        await self._match_index.flush()
+        # 确保合并写入中尚未落盘的配置被写入
+        await self.config.flush()
+        provider_executor.shutdown()
 
     async def _uninstall(self):
         decky.logger.info("Decky Music 插件已删除")
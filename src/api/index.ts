@@ -9,18 +9,24 @@ import type {
   QrCodeResponse,
   QrStatusResponse,
   SearchResponse,
+  SearchAllResponse,
   HotSearchResponse,
   SongUrlResponse,
   SongLyricResponse,
+  PrefetchQueueResponse,
   RecommendResponse,
   DailyRecommendResponse,
   RecommendPlaylistResponse,
   UserPlaylistsResponse,
   PlaylistSongsResponse,
+  PlaylistWindowResponse,
+  LikedStatusResponse,
   FrontendSettingsResponse,
   LastProviderIdResponse,
   MainProviderIdResponse,
   FallbackProviderIdsResponse,
+  PluginSettings,
+  SettingsResponse,
   PlayModeResponse,
   VolumeResponse,
   PreferredQualityResponse,
@@ -54,6 +60,11 @@ export const searchSongs = callable<[keyword: string, page: number, num: number]
   "search_songs"
 );
 
+/** 同时搜索所有已登录的音源，合并去重（歌曲的 provider 字段标明来源） */
+export const searchAll = callable<[keyword: string, page: number, num: number], SearchAllResponse>(
+  "search_all"
+);
+
 /** 获取热门搜索 */
 export const getHotSearch = callable<[], HotSearchResponse>("get_hot_search");
 
@@ -74,7 +85,14 @@ export const getSearchSuggest = callable<
 // ==================== 播放相关 ====================
 
 export const getSongUrl = callable<
-  [mid: string, preferredQuality?: PreferredQuality, songName?: string, singer?: string],
+  [
+    mid: string,
+    preferredQuality?: PreferredQuality,
+    songName?: string,
+    singer?: string,
+    refresh?: boolean,
+    duration?: number,
+  ],
   SongUrlResponse
 >("get_song_url");
 
@@ -83,6 +101,11 @@ export const getSongLyric = callable<
   SongLyricResponse
 >("get_song_lyric");
 
+/** 在后台预取队列中接下来的歌曲（items 以当前歌曲开头） */
+export const prefetchQueue = callable<[items: SongInfo[], depth?: number], PrefetchQueueResponse>(
+  "prefetch_queue"
+);
+
 // ==================== 推荐相关 ====================
 
 /** 获取猜你喜欢 */
@@ -107,6 +130,9 @@ export const getFavSongs = callable<
   }
 >("get_fav_songs");
 
+/** 批量查询歌曲是否已喜欢（后端内存缓存，无网络请求） */
+export const isLiked = callable<[mids: string[]], LikedStatusResponse>("is_liked");
+
 // ==================== 歌单相关 ====================
 
 /** 获取用户歌单（创建的和收藏的） */
@@ -118,6 +144,12 @@ export const getPlaylistSongs = callable<
   PlaylistSongsResponse
 >("get_playlist_songs");
 
+/** 按窗口分段获取歌单中的歌曲（配合虚拟列表按需加载） */
+export const getPlaylistSongsWindow = callable<
+  [playlist_id: number, offset: number, limit: number, dirid?: number, refresh?: boolean],
+  PlaylistWindowResponse
+>("get_playlist_songs_window");
+
 // ==================== 设置相关 ====================
 
 /** 获取前端持久化设置 */
@@ -129,6 +161,16 @@ export const saveFrontendSettings = callable<
   { success: boolean }
 >("save_frontend_settings");
 
+/** 一次读取多项设置，不传 keys 时读取全部 */
+export const getSettings = callable<[keys?: Array<keyof PluginSettings>], SettingsResponse>(
+  "get_settings"
+);
+
+/** 一次写入多项设置（合并为一次持久化），任一项无效时不做任何修改 */
+export const updateSettings = callable<[patch: PluginSettings], SettingsResponse>(
+  "update_settings"
+);
+
 /** 获取上次使用的 Provider ID */
 export const getLastProviderId = callable<[], LastProviderIdResponse>("get_last_provider_id");
 
@@ -192,6 +234,12 @@ export const saveProviderQueue = callable<
   { success: boolean; error?: string }
 >("save_provider_queue");
 
+/** 只更新指定 Provider 队列的播放位置（不重写队列内容） */
+export const updateQueuePosition = callable<
+  [providerId: string, index: number, mid?: string],
+  { success: boolean; error?: string }
+>("update_queue_position");
+
 /** 手动清除插件数据（凭证与前端设置） */
 export const clearAllData = callable<[], { success: boolean; error?: string }>(
   "clear_all_settings"
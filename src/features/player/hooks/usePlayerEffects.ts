@@ -3,12 +3,11 @@
  */
 
 import { useEffect } from "react";
-import { getProviderInfo, getLastProviderId } from "../../../api";
+import { getProviderInfo } from "../../../api";
 import { usePlayerStore, getPlayerState } from "../../../stores";
 import { getGlobalAudio, setGlobalVolume } from "../services/audioService";
 import {
-  loadPlayModeFromBackend,
-  loadVolumeFromBackend,
+  loadPlayerSettingsFromBackend,
   loadProviderQueueFromBackend,
 } from "../services/persistenceService";
 import { fetchLyricWithCache } from "../services/lyricService";
@@ -22,9 +21,9 @@ export function useSettingsRestoration(): void {
     let cancelled = false;
 
     void (async () => {
-      // 获取上次使用的 provider ID（用于日志或验证）
-      const lastProviderRes = await getLastProviderId();
-      const lastProviderId = lastProviderRes.success ? lastProviderRes.lastProviderId : null;
+      // 一次读取播放模式、音量、首选音质和上次使用的 provider ID
+      const restored = await loadPlayerSettingsFromBackend();
+      const { lastProviderId } = restored;
 
       const providerRes = await getProviderInfo();
       if (!providerRes.success || !providerRes.provider) {
@@ -56,18 +55,15 @@ export function useSettingsRestoration(): void {
         }
       }
 
-      const restoredPlayMode = await loadPlayModeFromBackend();
       if (cancelled) return;
-      store.setPlayMode(restoredPlayMode);
+      store.setPlayMode(restored.playMode);
 
-      const restoredVolume = await loadVolumeFromBackend();
-      if (cancelled) return;
-      setGlobalVolume(restoredVolume);
-      getGlobalAudio().volume = restoredVolume;
-      store.setVolume(restoredVolume);
+      setGlobalVolume(restored.volume);
+      getGlobalAudio().volume = restored.volume;
+      store.setVolume(restored.volume);
 
       // 初始化首选音质
-      await initializePreferredQuality();
+      await initializePreferredQuality(restored.preferredQuality);
       if (cancelled) return;
 
       store.setSettingsRestored(true);
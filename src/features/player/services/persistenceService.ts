@@ -3,18 +3,75 @@
  */
 
 import {
-  getPlayMode as getPlayModeApi,
+  getSettings as getSettingsApi,
   setPlayMode as setPlayModeApi,
-  getVolume as getVolumeApi,
   setVolume as setVolumeApi,
   getPreferredQuality as getPreferredQualityApi,
   setPreferredQuality as setPreferredQualityApi,
   getProviderQueue as getProviderQueueApi,
   saveProviderQueue as saveProviderQueueApi,
+  updateQueuePosition as updateQueuePositionApi,
 } from "../../../api";
 import type { PlayMode, PreferredQuality, StoredQueueState, SongInfo } from "../../../types";
 
 const DEFAULT_PREFERRED_QUALITY: PreferredQuality = "auto";
+// 恢复时低于该值（< 5%）的音量使用默认值，避免用户困惑
+const MIN_RESTORE_VOLUME = 0.05;
+
+export interface RestoredPlayerSettings {
+  playMode: PlayMode;
+  volume: number;
+  preferredQuality: PreferredQuality;
+  lastProviderId: string | null;
+}
+
+// 每个 Provider 尚未完成的队列写入，后发起的写入排在其后
+const pendingQueueWrites = new Map<string, Promise<unknown>>();
+
+/**
+ * 按调用顺序串行发送同一 Provider 的队列写入，保证播放位置更新不会先于队列内容到达后端
+ */
+function enqueueQueueWrite<T>(providerId: string, write: () => Promise<T>): Promise<T> {
+  const previous = pendingQueueWrites.get(providerId) ?? Promise.resolve();
+  const result = previous.then(write);
+  const tail = result.catch(() => undefined);
+  pendingQueueWrites.set(providerId, tail);
+  void tail.then(() => {
+    if (pendingQueueWrites.get(providerId) === tail) {
+      pendingQueueWrites.delete(providerId);
+    }
+  });
+  return result;
+}
+
+function normalizeRestoredVolume(volume: number): number {
+  return volume < MIN_RESTORE_VOLUME ? 1.0 : volume;
+}
+
+/**
+ * 从后端一次性加载启动时需要恢复的播放器设置
+ */
+export async function loadPlayerSettingsFromBackend(): Promise<RestoredPlayerSettings> {
+  const restored: RestoredPlayerSettings = {
+    playMode: "order",
+    volume: 1.0,
+    preferredQuality: DEFAULT_PREFERRED_QUALITY,
+    lastProviderId: null,
+  };
+  try {
+    const res = await getSettingsApi(["playMode", "volume", "preferredQuality", "lastProviderId"]);
+    if (res.success && res.settings) {
+      const { playMode, volume, preferredQuality, lastProviderId } = res.settings;
+      if (playMode) restored.playMode = playMode;
+      if (typeof volume === "number") restored.volume = normalizeRestoredVolume(volume);
+      if (preferredQuality) restored.preferredQuality = preferredQuality;
+      restored.lastProviderId = lastProviderId ?? null;
+    }
+  } catch (error) {
+    console.error("Failed to load player settings from backend:", error);
+  }
+  return restored;
+}
 
 /**
  * 从后端 API 加载首选音质
@@ -44,21 +101,6 @@ export async function savePreferredQualityToBackend(quality: PreferredQuality):
   }
 }
 
-/**
- * 从后端 API 加载播放模式
- */
-export async function loadPlayModeFromBackend(): Promise<PlayMode> {
-  try {
-    const res = await getPlayModeApi();
-    if (res.success && res.playMode) {
-      return res.playMode;
-    }
-  } catch (error) {
-    console.error("Failed to load play mode from backend:", error);
-  }
-  return "order";
-}
-
 /**
  * 保存播放模式到后端 API
  */
@@ -72,23 +114,6 @@ export async function savePlayModeToBackend(mode: PlayMode): Promise<boolean> {
   }
 }
 
-/**
- * 从后端 API 加载音量
- */
-export async function loadVolumeFromBackend(): Promise<number> {
-  try {
-    const res = await getVolumeApi();
-    if (res.success && typeof res.volume === "number") {
-      // 如果音量过低（< 5%），使用默认值避免用户困惑
-      const MIN_VOLUME = 0.05;
-      return res.volume < MIN_VOLUME ? 1.0 : res.volume;
-    }
-  } catch (error) {
-    console.error("Failed to load volume from backend:", error);
-  }
-  return 1.0;
-}
-
 /**
  * 保存音量到后端 API
  */
@@ -140,11 +165,13 @@ export async function saveProviderQueueToBackend(
   currentMid?: string
 ): Promise<boolean> {
   try {
-    const res = await saveProviderQueueApi(
-      providerId,
-      playlist as unknown as Array<Record<string, unknown>>,
-      currentIndex,
-      currentMid
+    const res = await enqueueQueueWrite(providerId, () =>
+      saveProviderQueueApi(
+        providerId,
+        playlist as unknown as Array<Record<string, unknown>>,
+        currentIndex,
+        currentMid
+      )
     );
     return res.success;
   } catch (error) {
@@ -152,3 +179,22 @@ export async function saveProviderQueueToBackend(
     return false;
   }
 }
+
+/**
+ * 只更新指定 Provider 队列的播放位置（队列内容未变化时使用）
+ */
+export async function saveQueuePositionToBackend(
+  providerId: string,
+  currentIndex: number,
+  currentMid?: string
+): Promise<boolean> {
+  try {
+    const res = await enqueueQueueWrite(providerId, () =>
+      updateQueuePositionApi(providerId, currentIndex, currentMid)
+    );
+    return res.success;
+  } catch (error) {
+    console.error("Failed to save queue position to backend:", error);
+    return false;
+  }
+}
@@ -3,7 +3,7 @@
  */
 
 import { toaster } from "@decky/api";
-import { getSongUrl } from "../../../api";
+import { getSongUrl, prefetchQueue } from "../../../api";
 import type { SongInfo, PlayMode, PreferredQuality } from "../../../types";
 import { usePlayerStore, getPlayerState } from "../../../stores";
 import {
@@ -16,6 +16,7 @@ import {
   savePlayModeToBackend,
   saveVolumeToBackend,
   saveProviderQueueToBackend,
+  saveQueuePositionToBackend,
   loadPreferredQualityFromBackend,
 } from "./persistenceService";
 import { fetchLyricWithCache } from "./lyricService";
@@ -36,13 +37,25 @@ let onPlayNextCallback: (() => void) | null = null;
 let preferredQuality: PreferredQuality = "auto";
 
 const AUDIO_LOAD_TIMEOUT = 15000; // 15秒超时
+const PREFETCH_DEPTH = 3; // 预取深度上限，后端按跳过频率自适应
 
 export function getPreferredQuality(): PreferredQuality {
   return preferredQuality;
 }
 
-export async function initializePreferredQuality(): Promise<void> {
-  preferredQuality = await loadPreferredQualityFromBackend();
+/** 初始化首选音质；未传入已读取的值时从后端加载 */
+export async function initializePreferredQuality(quality?: PreferredQuality): Promise<void> {
+  preferredQuality = quality ?? (await loadPreferredQualityFromBackend());
+}
+
+/** 让后端预取接下来的歌曲；随机和单曲循环模式下只上报当前歌曲 */
+function prefetchUpcoming(song: SongInfo, playlist: SongInfo[], currentIndex: number): void {
+  const { playMode } = getPlayerState();
+  const upcoming =
+    playMode === "shuffle" || playMode === "single"
+      ? []
+      : playlist.slice(currentIndex + 1, currentIndex + 1 + PREFETCH_DEPTH);
+  void prefetchQueue([song, ...upcoming], PREFETCH_DEPTH).catch(() => undefined);
 }
 
 function clearSkipTimeout(): void {
@@ -111,8 +124,9 @@ async function playSongInternal(
 
   const { playlist, currentIndex, currentProviderId } = getPlayerState();
   if (currentProviderId) {
+    // 修改队列的调用方已保存队列内容，这里只需更新播放位置（后端按调用顺序收到两者）
     const currentMid = playlist[currentIndex]?.mid;
-    void saveProviderQueueToBackend(currentProviderId, playlist, currentIndex, currentMid);
+    void saveQueuePositionToBackend(currentProviderId, currentIndex, currentMid);
   }
 
   // 设置音频错误处理器
@@ -128,7 +142,14 @@ async function playSongInternal(
   });
 
   try {
-    const urlResult = await getSongUrl(song.mid, getPreferredQuality(), song.name, song.singer);
+    const urlResult = await getSongUrl(
+      song.mid,
+      getPreferredQuality(),
+      song.name,
+      song.singer,
+      false,
+      song.duration
+    );
 
     if (!urlResult.success || !urlResult.url) {
       const errorMsg = urlResult.error || "该歌曲暂时无法播放";
@@ -182,6 +203,7 @@ async function playSongInternal(
       void fetchLyricWithCache(song.mid, song.name, song.singer, (parsed) => {
         store.setLyric(parsed);
       });
+      prefetchUpcoming(song, playlist, currentIndex);
     }
 
     return true;
@@ -340,7 +362,7 @@ export function removeFromQueue(index: number): void {
 
 export async function playAtIndex(index: number): Promise<void> {
   const store = usePlayerStore.getState();
-  const { playlist, playMode, currentProviderId } = getPlayerState();
+  const { playlist, playMode } = getPlayerState();
   if (index < 0 || index >= playlist.length) return;
 
   const audio = getGlobalAudio();
@@ -353,7 +375,6 @@ export async function playAtIndex(index: number): Promise<void> {
   store.setCurrentIndex(index);
   const song = playlist[index];
   await playSongInternal(song, index, true);
-  void saveQueueState(currentProviderId);
 }
 
 export function togglePlay(): void {
@@ -409,7 +430,7 @@ export function stop(): void {
 }
 
 export async function playNext(): Promise<void> {
-  const { playlist, currentIndex, playMode, currentProviderId } = getPlayerState();
+  const { playlist, currentIndex, playMode } = getPlayerState();
   if (playlist.length === 0) return;
 
   const audio = getGlobalAudio();
@@ -434,12 +455,11 @@ export async function playNext(): Promise<void> {
   }
   if (nextSong) {
     await playSongInternal(nextSong, targetIndex, true);
-    void saveQueueState(currentProviderId);
   }
 }
 
 export function playPrev(): void {
-  const { playlist, currentIndex, playMode, currentProviderId } = getPlayerState();
+  const { playlist, currentIndex, playMode } = getPlayerState();
   if (playlist.length === 0) return;
 
   const audio = getGlobalAudio();
@@ -465,7 +485,6 @@ export function playPrev(): void {
   const prevSong = playlist[targetIndex];
   if (prevSong) {
     void playSongInternal(prevSong, targetIndex, true);
-    void saveQueueState(currentProviderId);
   }
 }
 
@@ -1,18 +1,37 @@
 /**
  * 歌单详情页面
+ * 按窗口分段加载歌曲，并使用虚拟列表只渲染可见区域
  */
 
 import { FC, useState, useEffect, useCallback, memo, useRef } from "react";
-import { PanelSection, PanelSectionRow, ButtonItem } from "@decky/ui";
+import {
+  PanelSection,
+  PanelSectionRow,
+  ButtonItem,
+  Focusable,
+  NavEntryPositionPreferences,
+} from "@decky/ui";
+import { toaster } from "@decky/api";
 import { FaPlus } from "react-icons/fa";
-import { getPlaylistSongs } from "../../api";
+import { getPlaylistSongsWindow } from "../../api";
 import type { PlaylistInfo, SongInfo } from "../../types";
-import { BackButton, SafeImage } from "../../components/common";
-import { SongList } from "../../components/song";
+import { BackButton, SafeImage, LoadingSpinner, EmptyState } from "../../components/common";
+import { SongItem } from "../../components/song";
 import { PlayAllButton } from "../../components/layout";
 import { useMountedRef } from "../../hooks/useMountedRef";
+import { useVirtualList } from "../../hooks/useVirtualList";
 import { TEXT_ELLIPSIS_2_LINES, COLORS } from "../../utils/styles";
 
+// 每次向后端请求的歌曲数（后端单次窗口上限为 200）
+const WINDOW_SIZE = 100;
+// 与播放队列页一致：SongItem 含边距的高度
+const ITEM_HEIGHT = 64;
+// 容器高度（70vh 约等于 504px @ 720p）
+const CONTAINER_HEIGHT = 500;
+
+// 尚未加载的位置用 null 占位，保持列表总高度不变
+type SongSlot = SongInfo | null;
+
 interface PlaylistDetailPageProps {
   playlist: PlaylistInfo;
   onSelectSong: (song: SongInfo, playlist?: SongInfo[], source?: string) => void;
@@ -30,45 +49,125 @@ const PlaylistDetailPageComponent: FC<PlaylistDetailPageProps> = ({
   onBack,
   currentPlayingMid,
 }) => {
-  const [songs, setSongs] = useState<SongInfo[]>([]);
+  const [slots, setSlots] = useState<SongSlot[]>([]);
   const [loading, setLoading] = useState(true);
   const mountedRef = useMountedRef();
   const requestIdRef = useRef(0);
+  const slotsRef = useRef<SongSlot[]>([]);
+  // 窗口序号 -> 加载中或已完成的请求，避免重复请求同一窗口
+  const windowsRef = useRef(new Map<number, Promise<boolean>>());
 
-  const loadSongs = useCallback(async () => {
-    setLoading(true);
+  const loadWindow = useCallback(
+    (index: number): Promise<boolean> => {
+      const windows = windowsRef.current;
+      const pending = windows.get(index);
+      if (pending) return pending;
+
+      const requestId = requestIdRef.current;
+      const offset = index * WINDOW_SIZE;
+      const promise = getPlaylistSongsWindow(playlist.id, offset, WINDOW_SIZE, playlist.dirid || 0)
+        .then((result) => {
+          if (!mountedRef.current || requestId !== requestIdRef.current) return false;
+          if (!result.success) {
+            windows.delete(index);
+            return false;
+          }
+
+          const total = result.total ?? slotsRef.current.length;
+          const next = Array.from({ length: total }, (_, i) => slotsRef.current[i] ?? null);
+          result.songs.forEach((song, i) => {
+            next[offset + i] = song;
+          });
+          slotsRef.current = next;
+          setSlots(next);
+          return true;
+        })
+        .catch(() => {
+          windows.delete(index);
+          return false;
+        });
+      windows.set(index, promise);
+      return promise;
+    },
+    [mountedRef, playlist.id, playlist.dirid]
+  );
+
+  useEffect(() => {
     const requestId = ++requestIdRef.current;
-    const result = await getPlaylistSongs(playlist.id, playlist.dirid || 0);
-    if (!mountedRef.current || requestId !== requestIdRef.current) return;
+    windowsRef.current = new Map();
+    slotsRef.current = [];
+    setSlots([]);
+    setLoading(true);
+    loadWindow(0).then(() => {
+      if (mountedRef.current && requestId === requestIdRef.current) {
+        setLoading(false);
+      }
+    });
+  }, [loadWindow, mountedRef]);
 
-    if (result.success) {
-      setSongs(result.songs);
-    }
-    setLoading(false);
-  }, [mountedRef, playlist.id, playlist.dirid]);
+  const {
+    virtualItems,
+    startIndex,
+    endIndex,
+    topSpacerHeight,
+    bottomSpacerHeight,
+    onScroll,
+    containerRef,
+  } = useVirtualList({
+    items: slots,
+    itemHeight: ITEM_HEIGHT,
+    containerHeight: CONTAINER_HEIGHT,
+    overscan: 8,
+  });
 
+  // 滚动到的区域按窗口补齐
   useEffect(() => {
-    loadSongs();
-  }, [loadSongs]);
+    if (endIndex < 0) return;
+    for (let i = Math.floor(startIndex / WINDOW_SIZE); i <= Math.floor(endIndex / WINDOW_SIZE); i++) {
+      loadWindow(i);
+    }
+  }, [startIndex, endIndex, loadWindow]);
 
-  const handlePlayAll = useCallback(() => {
+  // 播放全部、加入队列等需要完整歌单，先补齐所有窗口
+  const loadAllSongs = useCallback(async (): Promise<SongInfo[]> => {
+    const requestId = requestIdRef.current;
+    const windowCount = Math.ceil(slotsRef.current.length / WINDOW_SIZE);
+    const results = await Promise.all(Array.from({ length: windowCount }, (_, i) => loadWindow(i)));
+    if (!mountedRef.current || requestId !== requestIdRef.current) return [];
+
+    if (results.some((ok) => !ok)) {
+      toaster.toast({ title: "部分歌曲加载失败", body: "仅使用已加载的歌曲" });
+    }
+    return slotsRef.current.filter((song): song is SongInfo => song !== null);
+  }, [loadWindow, mountedRef]);
+
+  const handlePlayAll = useCallback(async () => {
+    const songs = await loadAllSongs();
     if (songs.length > 0) {
       onSelectSong(songs[0], songs);
     }
-  }, [songs, onSelectSong]);
+  }, [loadAllSongs, onSelectSong]);
 
-  const handleAddToQueue = useCallback(() => {
-    if (!onAddPlaylistToQueue || songs.length === 0) return;
-    onAddPlaylistToQueue(songs);
-  }, [onAddPlaylistToQueue, songs]);
+  const handleAddToQueue = useCallback(async () => {
+    if (!onAddPlaylistToQueue) return;
+    const songs = await loadAllSongs();
+    if (songs.length > 0) {
+      onAddPlaylistToQueue(songs);
+    }
+  }, [onAddPlaylistToQueue, loadAllSongs]);
 
   const handleSongSelect = useCallback(
-    (song: SongInfo) => {
-      onSelectSong(song, songs);
+    async (song: SongInfo) => {
+      const songs = await loadAllSongs();
+      if (songs.length > 0) {
+        onSelectSong(song, songs);
+      }
     },
-    [songs, onSelectSong]
+    [loadAllSongs, onSelectSong]
   );
 
+  const total = slots.length;
+
   return (
     <>
       <BackButton onClick={onBack} label="返回歌单列表" />
@@ -110,10 +209,10 @@ const PlaylistDetailPageComponent: FC<PlaylistDetailPageProps> = ({
         </PanelSectionRow>
 
         {/* 播放全部按钮 */}
-        <PlayAllButton onClick={handlePlayAll} show={!loading && songs.length > 0} />
+        <PlayAllButton onClick={handlePlayAll} show={!loading && total > 0} />
 
         {/* 添加到队列 */}
-        {!loading && songs.length > 0 && onAddPlaylistToQueue && (
+        {!loading && total > 0 && onAddPlaylistToQueue && (
           <PanelSectionRow>
             <ButtonItem layout="below" onClick={handleAddToQueue}>
               <FaPlus style={{ marginRight: "8px" }} />
@@ -124,19 +223,44 @@ const PlaylistDetailPageComponent: FC<PlaylistDetailPageProps> = ({
       </PanelSection>
 
       {/* 歌曲列表 */}
-      <SongList
-        title={`歌曲列表${songs.length > 0 ? ` (${songs.length})` : ""}`}
-        songs={songs}
-        loading={loading}
-        currentPlayingMid={currentPlayingMid}
-        emptyText="歌单暂无歌曲"
-        onSelectSong={handleSongSelect}
-        onAddToQueue={onAddSongToQueue}
-        progressiveRender={songs.length >= 120}
-        initialRenderCount={80}
-        renderChunkSize={50}
-        renderChunkDelay={30}
-      />
+      <PanelSection title={`歌曲列表${total > 0 ? ` (${total})` : ""}`}>
+        {loading ? (
+          <LoadingSpinner />
+        ) : total === 0 ? (
+          <EmptyState message="歌单暂无歌曲" />
+        ) : (
+          <div
+            ref={containerRef}
+            onScroll={onScroll}
+            style={{ maxHeight: "70vh", overflow: "auto", paddingRight: "6px" }}
+          >
+            <Focusable
+              navEntryPreferPosition={NavEntryPositionPreferences.PREFERRED_CHILD}
+              flow-children="column"
+            >
+              {/* 顶部占位 */}
+              {topSpacerHeight > 0 && <div style={{ height: topSpacerHeight }} />}
+
+              {/* 可见项，未加载的窗口先显示空行 */}
+              {virtualItems.map(({ item: song, index }) => (
+                <div key={song?.mid || `slot-${index}`} style={{ height: ITEM_HEIGHT }}>
+                  {song && (
+                    <SongItem
+                      song={song}
+                      isPlaying={currentPlayingMid === song.mid}
+                      onClick={handleSongSelect}
+                      onAddToQueue={onAddSongToQueue}
+                    />
+                  )}
+                </div>
+              ))}
+
+              {/* 底部占位 */}
+              {bottomSpacerHeight > 0 && <div style={{ height: bottomSpacerHeight }} />}
+            </Focusable>
+          </div>
+        )}
+      </PanelSection>
     </>
   );
 };
@@ -2,7 +2,14 @@
  * API 响应相关类型定义
  */
 
-import type { SongInfo, PlaylistInfo, FrontendSettings, ParsedLyric } from "./player";
+import type {
+  SongInfo,
+  PlaylistInfo,
+  FrontendSettings,
+  ParsedLyric,
+  PlayMode,
+  PreferredQuality,
+} from "./player";
 import type { Capability, ProviderBasicInfo, ProviderFullInfo } from "./provider";
 
 // ==================== 登录相关 ====================
@@ -43,6 +50,15 @@ export interface SearchResponse {
   error?: string;
 }
 
+export interface SearchAllResponse extends SearchResponse {
+  /** 返回了结果的 provider */
+  providers: string[];
+  /** 超过等待上限的 provider */
+  timedOut: string[];
+  /** 搜索失败的 provider */
+  failed: string[];
+}
+
 export interface HotSearchResponse {
   success: boolean;
   hotkeys: Array<{
@@ -79,6 +95,15 @@ export interface SongLyricResponse {
   error?: string;
 }
 
+export interface PrefetchQueueResponse {
+  success: boolean;
+  /** 本次实际预取深度（随跳过频率自适应） */
+  depth: number;
+  /** 本次预取的歌曲 */
+  mids: string[];
+  error?: string;
+}
+
 // ==================== 推荐相关 ====================
 
 export interface RecommendResponse {
@@ -116,12 +141,29 @@ export interface PlaylistSongsResponse {
   error?: string;
 }
 
+export interface LikedStatusResponse {
+  success: boolean;
+  liked: Record<string, boolean>;
+  error?: string;
+}
+
+export interface PlaylistWindowResponse {
+  success: boolean;
+  songs: SongInfo[];
+  playlist_id: number;
+  offset?: number;
+  total?: number;
+  error?: string;
+}
+
 // ==================== Provider 相关 ====================
 
 export interface ProviderSelectionResponse {
   success: boolean;
   mainProvider: string | null;
   fallbackProviders: string[];
+  /** 登录检查尚未完成的 provider */
+  pendingProviders?: string[];
   error?: string;
 }
 
@@ -168,6 +210,22 @@ export interface FallbackProviderIdsResponse {
   error?: string;
 }
 
+/** get_settings / update_settings 支持的设置项 */
+export interface PluginSettings {
+  playMode?: PlayMode;
+  volume?: number;
+  preferredQuality?: PreferredQuality;
+  lastProviderId?: string | null;
+  mainProviderId?: string | null;
+  fallbackProviderIds?: string[];
+}
+
+export interface SettingsResponse {
+  success: boolean;
+  settings?: PluginSettings;
+  error?: string;
+}
+
 export interface PlayModeResponse {
   success: boolean;
   playMode: "order" | "single" | "shuffle";
@@ -31,15 +31,19 @@ export type {
   QrStatusResponse,
   LoginStatusResponse,
   SearchResponse,
+  SearchAllResponse,
   HotSearchResponse,
   SearchSuggestResponse,
   SongUrlResponse,
   SongLyricResponse,
+  PrefetchQueueResponse,
   RecommendResponse,
   DailyRecommendResponse,
   RecommendPlaylistResponse,
   UserPlaylistsResponse,
   PlaylistSongsResponse,
+  PlaylistWindowResponse,
+  LikedStatusResponse,
   ProviderSelectionResponse,
   ProviderInfoResponse,
   ListProvidersResponse,
@@ -48,6 +52,8 @@ export type {
   LastProviderIdResponse,
   MainProviderIdResponse,
   FallbackProviderIdsResponse,
+  PluginSettings,
+  SettingsResponse,
   PlayModeResponse,
   VolumeResponse,
   PreferredQualityResponse,